@@ -0,0 +1,302 @@
+import itertools
+import os
+import tempfile
+import uuid
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from indicators import SETTINGS, macd, rsi
+from workers import process_pool
+
+# Rule-based strategies backtested on many tickers at once. Prices are one
+# aligned (date x ticker) close matrix; a strategy turns it into a matrix of
+# position weights with array operations only, and a parameter sweep runs
+# every parameter set over every ticker, spread across the shared worker
+# processes.
+
+TRADING_DAYS = 252
+# Sweeps with at least this many price cells (dates x tickers x parameter
+# sets) are spread across worker processes when there is more than one CPU;
+# smaller ones run in-process
+PROCESS_POOL_THRESHOLD = 20_000_000
+# Parameter sets handed to a worker at a time
+CHUNK_SIZE = 8
+# Equity curves returned for the best rows of a sweep
+TOP_CURVES = 10
+# Rolling statistics a process keeps around; each is one full price matrix
+MAX_CACHED_WINDOWS = 16
+
+STAT_COLUMNS = ["totalReturn", "cagr", "volatility", "sharpe", "maxDrawdown", "trades", "exposure", "buyHold"]
+
+# The sweep a worker process last loaded, so parameter sets are all a task
+# carries after its first
+_matrix = None
+_prices = None
+_columns = None
+
+
+def price_matrix(histories):
+    # Aligned close matrix from per-ticker OHLCV frames. Dates are calendar
+    # days in each exchange's time, so tickers from one market line up; a
+    # ticker's gaps are filled with its last close, days before it listed
+    # stay NaN.
+    closes = {}
+    for tickerSymbol, history in histories.items():
+        if history is None or history.empty:
+            continue
+        close = history["Close"]
+        if close.index.tz is not None:
+            close = close.tz_localize(None)
+        closes[tickerSymbol] = close.groupby(close.index.normalize()).last()
+    if not closes:
+        return pd.DataFrame()
+    return pd.DataFrame(closes).sort_index().ffill()
+
+
+def rescaled(close):
+    # Each column divided by its first price, which keeps the running sums
+    # behind rolling statistics small and accurate
+    first = np.argmax(~np.isnan(close), axis=0)
+    return close / close[first, np.arange(close.shape[1])]
+
+
+class PriceWindows:
+    # A close matrix plus the running sums every rolling statistic is cut
+    # from. One instance serves all the parameter sets a process evaluates,
+    # so each window length is computed once however many sets use it.
+    def __init__(self, close):
+        self.close = close
+        scaled = rescaled(close)
+        valid = ~np.isnan(scaled)
+        scaled = np.where(valid, scaled, 0.0)
+        self.counts = np.cumsum(valid, axis=0)
+        self.sums = np.cumsum(scaled, axis=0)
+        self.squares = np.cumsum(scaled * scaled, axis=0)
+        self.scaled = np.where(valid, scaled, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.daily = np.nan_to_num(close[1:] / close[:-1] - 1)
+        self.cache = {}
+
+    def window(self, totals, window):
+        sums = totals.copy()
+        sums[window:] -= totals[:-window]
+        return sums
+
+    def cached(self, key, compute):
+        if key not in self.cache:
+            if len(self.cache) >= MAX_CACHED_WINDOWS:
+                del self.cache[next(iter(self.cache))]
+            self.cache[key] = compute()
+        return self.cache[key]
+
+    def mean(self, window):
+        # Trailing mean per column, NaN until a full window of prices exists
+        def compute():
+            full = self.window(self.counts, window) == window
+            return np.where(full, self.window(self.sums, window) / window, np.nan)
+
+        return self.cached(("mean", window), compute)
+
+    def std(self, window):
+        def compute():
+            mean = self.mean(window)
+            variance = self.window(self.squares, window) / window - mean * mean
+            return np.sqrt(np.maximum(variance, 0))
+
+        return self.cached(("std", window), compute)
+
+
+def ma_crossover(prices, fast, slow):
+    # Long while the fast moving average is above the slow one
+    with np.errstate(invalid="ignore"):
+        return (prices.mean(fast) > prices.mean(slow)).astype(float)
+
+
+def mean_reversion(prices, lookback, entry):
+    # Long while the price is more than `entry` standard deviations below
+    # its moving average
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = (prices.scaled - prices.mean(lookback)) / prices.std(lookback)
+        return (z < -entry).astype(float)
+
+
+def rsi_reversion(prices, period, entry):
+    # Long while the RSI is below `entry`
+    values = prices.cached(("rsi", period), lambda: rsi(pd.DataFrame(prices.close), period).to_numpy())
+    with np.errstate(invalid="ignore"):
+        return (values < entry).astype(float)
+
+
+def macd_trend(prices, fast, slow):
+    # Long while the MACD line is above its signal line
+    line, signal_line, _ = macd(pd.DataFrame(prices.close), fast, slow, SETTINGS["macd"][2])
+    return (line > signal_line).to_numpy(dtype=float)
+
+
+def momentum(prices, lookback, top):
+    # Equal weights in the `top` tickers with the best trailing return,
+    # rebalanced daily
+    close = prices.close
+    trailing = np.full_like(close, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        trailing[lookback:] = close[lookback:] / close[:-lookback] - 1
+    ranked = np.where(np.isnan(trailing), -np.inf, trailing)
+    top = min(top, close.shape[1])
+    best = np.argpartition(-ranked, top - 1, axis=1)[:, :top]
+
+    weights = np.zeros_like(close)
+    rows = np.arange(len(close))[:, None]
+    weights[rows, best] = 1.0
+    weights[np.isinf(ranked)] = 0.0
+    held = weights.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(held > 0, weights / held, 0.0)
+
+
+# name: (function, {parameter: (min, max, default range, step)}, whether the
+# positions form one portfolio rather than one book per ticker)
+STRATEGIES = {
+    "Moving-average crossover": (ma_crossover, {
+        "fast": (5, 100, (5, 50), 5),
+        "slow": (20, 300, (20, 200), 10),
+    }, False),
+    "Mean reversion": (mean_reversion, {
+        "lookback": (5, 100, (10, 50), 5),
+        "entry": (0.5, 3.0, (1.0, 2.5), 0.25),
+    }, False),
+    "RSI reversion": (rsi_reversion, {
+        "period": (2, 30, (6, 20), 2),
+        "entry": (10, 50, (20, 40), 5),
+    }, False),
+    "MACD trend": (macd_trend, {
+        "fast": (4, 30, (8, 16), 2),
+        "slow": (10, 60, (20, 40), 5),
+    }, False),
+    "Momentum ranking": (momentum, {
+        "lookback": (20, 260, (20, 240), 20),
+        "top": (1, 50, (5, 20), 5),
+    }, True),
+}
+
+
+def parameter_values(low, high, step):
+    # Inclusive range; stays integer when the bounds and step are
+    values = np.arange(low, high + step / 2, step)
+    if all(isinstance(value, int) for value in (low, high, step)):
+        return tuple(int(value) for value in values)
+    return tuple(round(float(value), 6) for value in values)
+
+
+def parameter_grid(strategy, ranges):
+    # Every combination of the given parameter values; crossovers need the
+    # fast average to be shorter than the slow one
+    names = list(STRATEGIES[strategy][1])
+    grid = [dict(zip(names, values)) for values in itertools.product(*(ranges[name] for name in names))]
+    if "fast" in names and "slow" in names:
+        grid = [params for params in grid if params["fast"] < params["slow"]]
+    return grid
+
+
+def strategy_returns(prices, strategy, params, cost_bps=0.0):
+    # Daily returns of the strategy: positions decided at a close earn the
+    # next day's return, and every change in position pays cost_bps. Returns
+    # (returns, turnover, invested), one column per ticker, or a single
+    # column for portfolio strategies.
+    function, _, portfolio = STRATEGIES[strategy]
+    weights = function(prices, **params)
+    turnover = np.abs(np.diff(weights, axis=0, prepend=0.0))[:-1]
+    returns = weights[:-1] * prices.daily - turnover * cost_bps / 10_000
+    invested = weights[:-1] != 0
+    if portfolio:
+        return (returns.sum(axis=1, keepdims=True), turnover.sum(axis=1, keepdims=True),
+                invested.any(axis=1, keepdims=True))
+    return returns, turnover, invested
+
+
+def summarize(returns, turnover, invested, active):
+    # Performance statistics per column; `active` marks the days a column
+    # could trade
+    days = np.maximum(active.sum(axis=0), 1)
+    equity = np.cumprod(1 + returns, axis=0)
+    total = equity[-1] - 1
+    mean = returns.sum(axis=0) / days
+    std = np.sqrt(np.maximum((returns * returns).sum(axis=0) / days - mean * mean, 0))
+    drawdown = (equity / np.maximum.accumulate(equity, axis=0) - 1).min(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {
+            "totalReturn": total * 100,
+            "cagr": (np.maximum(1 + total, 0) ** (TRADING_DAYS / days) - 1) * 100,
+            "volatility": std * np.sqrt(TRADING_DAYS) * 100,
+            "sharpe": np.where(std > 0, mean / std * np.sqrt(TRADING_DAYS), np.nan),
+            "maxDrawdown": drawdown * 100,
+            "trades": (turnover > 0).sum(axis=0),
+            "exposure": invested.sum(axis=0) / days * 100,
+        }
+
+
+def buy_and_hold(close):
+    # Total return of holding each ticker over the backtest, in percent
+    first = np.argmax(~np.isnan(close), axis=0)
+    return (close[-1] / close[first, np.arange(close.shape[1])] - 1) * 100
+
+
+def evaluate(prices, strategy, grid, cost_bps, columns):
+    # One stats row per (parameter set, ticker), or per parameter set for
+    # portfolio strategies
+    portfolio = STRATEGIES[strategy][2]
+    close = prices.close
+    listed = ~np.isnan(close[1:])
+    active = listed.any(axis=1, keepdims=True) if portfolio else listed
+    hold = buy_and_hold(close)
+    labels = ["Portfolio"] if portfolio else columns
+    frames = []
+    for params in grid:
+        stats = summarize(*strategy_returns(prices, strategy, params, cost_bps), active)
+        stats["buyHold"] = [np.nanmean(hold)] if portfolio else hold
+        frames.append(pd.DataFrame({**params, "ticker": labels, **stats}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def evaluate_chunk(matrix, columns, strategy, cost_bps, grid):
+    # matrix: the .npy file holding the sweep's close matrix
+    global _matrix, _prices, _columns
+    if _matrix != matrix:
+        _matrix, _prices, _columns = matrix, PriceWindows(np.load(matrix)), columns
+    return evaluate(_prices, strategy, grid, cost_bps, _columns)
+
+
+def sweep(prices, strategy, grid, cost_bps=0.0):
+    # Stats for every parameter set on every ticker. The close matrix goes to
+    # the workers as a file each of them reads once; tasks only carry their
+    # parameter sets.
+    close = prices.to_numpy(dtype=float)
+    columns = list(prices.columns)
+    if not grid or close.size == 0:
+        return pd.DataFrame(columns=["ticker"] + STAT_COLUMNS)
+
+    if close.size * len(grid) < PROCESS_POOL_THRESHOLD or (os.cpu_count() or 1) < 2:
+        return evaluate(PriceWindows(close), strategy, grid, cost_bps, columns)
+    chunks = [grid[i:i + CHUNK_SIZE] for i in range(0, len(grid), CHUNK_SIZE)]
+    with tempfile.NamedTemporaryFile(prefix=f"sweep-{uuid.uuid4().hex}-", suffix=".npy", delete=False) as matrix:
+        np.save(matrix, close)
+    try:
+        evaluate_sweep = partial(evaluate_chunk, matrix.name, columns, strategy, cost_bps)
+        return pd.concat(process_pool().map(evaluate_sweep, chunks), ignore_index=True)
+    finally:
+        os.unlink(matrix.name)
+
+
+def equity_curves(prices, strategy, rows, cost_bps=0.0):
+    # Growth of $1 for the given sweep rows, one column per row
+    windows = PriceWindows(prices.to_numpy(dtype=float))
+    names = list(STRATEGIES[strategy][1])
+    curves = {}
+    for row in rows.to_dict("records"):
+        params = {name: row[name] for name in names}
+        returns, _, _ = strategy_returns(windows, strategy, params, cost_bps)
+        column = 0 if row["ticker"] == "Portfolio" else prices.columns.get_loc(row["ticker"])
+        label = f"{row['ticker']} " + " ".join(f"{name}={params[name]:g}" for name in names)
+        curves[label] = np.concatenate([[1.0], np.cumprod(1 + returns[:, column])])
+    return pd.DataFrame(curves, index=prices.index)
@@ -0,0 +1,86 @@
+import argparse
+import ast
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+# Cold-start import check. Runs the app's module-level imports in a fresh
+# interpreter under `-X importtime` and fails if they take longer than the
+# budget or pull in a library that should only load with the page using it.
+#
+#   python benchmarks/import_time.py [--budget-ms 1000] [--runs 3]
+ROOT = Path(__file__).resolve().parents[1]
+APP = ROOT / "invincibull_app.py"
+
+IMPORT_BUDGET_MS = 1000
+LAZY_MODULES = [
+    "yfinance",
+    "pandas",
+    "numpy",
+    "scipy",
+    "pyarrow",
+    "nltk",
+    "textblob",
+    "langchain_ollama",
+    "requests",
+    # streamlit itself imports plotly and plotly.graph_objects (a lazy
+    # shell); plotly.express pulls in the rest and must wait for a page
+    "plotly.express",
+]
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def startup_imports():
+    # The import statements the app runs before any page is picked
+    tree = ast.parse(APP.read_text(encoding="utf-8"))
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(node) for node in imports)
+
+
+def measure():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", startup_imports()],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    total_us = 0
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, _, module = match.groups()
+            total_us += int(self_us)
+            cumulative[module] = int(cumulative_us)
+    return total_us / 1000, cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the app's cold-start import time.")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="report the fastest of this many runs")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    total_ms, cumulative = min(runs, key=lambda run: run[0])
+
+    print(f"startup imports: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    for module, us in slowest:
+        print(f"  {us / 1000:8.1f} ms  {module}")
+
+    failed = False
+    if total_ms > args.budget_ms:
+        print(f"FAIL: startup imports exceed the {args.budget_ms:.0f} ms budget")
+        failed = True
+    eager = sorted({lazy for lazy in LAZY_MODULES for module in cumulative
+                    if module == lazy or module.startswith(lazy + ".")})
+    if eager:
+        print(f"FAIL: imported at startup but should load lazily: {', '.join(eager)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
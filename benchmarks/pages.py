@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Offline page benchmarks. Each page is driven through Streamlit's AppTest
+# against recorded fixtures (see replay.py) in a fresh interpreter with an
+# empty data directory, so the first run is a true cold start and later runs
+# are reruns against warm caches. Wall time, upstream calls and peak Python
+# memory are reported for every run and checked against baseline.json.
+# Tracing allocations slows allocation-heavy runs several times over, so
+# time and memory come from separate processes: wall time is measured with
+# tracemalloc off, peak memory in a traced pass of its own.
+#
+#   python benchmarks/pages.py [--page options_page] [--repeat 3] [--update-baseline]
+ROOT = Path(__file__).resolve().parents[1]
+APP = ROOT / "invincibull_app.py"
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# Allowed slowdown before a run counts as a regression; upstream calls may never grow
+TIME_TOLERANCE = 0.5
+TIME_SLACK_MS = 25
+MEMORY_TOLERANCE = 0.25
+MEMORY_SLACK_KB = 512
+
+# What happens before each run of a page: (run name, widget change or None)
+SCENARIOS = {
+    "home_page": [
+        ("cold", None),
+        ("rerun", None),
+        ("ticker MSFT", lambda at: at.text_input[0].set_value("MSFT")),
+        ("ticker AAPL", lambda at: at.text_input[0].set_value("AAPL")),
+        ("indicators", lambda at: at.radio[0].set_value("Indicators")),
+        ("intraday", lambda at: at.radio[0].set_value("Intraday")),
+    ],
+    "options_page": [
+        ("cold", None),
+        ("rerun", None),
+        ("all expiries", lambda at: at.multiselect[0].set_value(list(at.multiselect[0].options))),
+        ("sort", lambda at: at.selectbox[0].set_value("Volume")),
+        ("visualizations", lambda at: at.radio[0].set_value("Visualizations")),
+        ("next expiry", lambda at: at.selectbox[0].set_value(at.selectbox[0].options[1])),
+    ],
+    "sentiment_page": [
+        ("cold", None),
+        ("rerun", None),
+    ],
+    "screener_page": [
+        ("cold", None),
+        ("rerun", None),
+        ("filter", lambda at: at.multiselect[0].set_value(["1yr"])),
+        ("rsi", lambda at: at.slider[0].set_value((30, 70))),
+    ],
+    "backtest_page": [
+        ("cold", None),
+        ("rerun", None),
+        ("strategy", lambda at: at.selectbox[0].set_value("Momentum ranking")),
+    ],
+    "Futures_page": [
+        ("cold", None),
+        ("rerun", None),
+        ("symbol", lambda at: at.selectbox[0].set_value(at.selectbox[0].options[1])),
+        ("term structure", lambda at: at.radio[0].set_value("Term structure")),
+        ("term structure symbol", lambda at: at.selectbox[0].set_value(at.selectbox[0].options[2])),
+    ],
+}
+
+
+def run_page(page, trace=False):
+    # Runs inside the child interpreter; returns one measurement per scenario
+    # step. With trace, peak memory is measured and wall time is not
+    # comparable; without it, peak_kb is None.
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import replay
+
+    sec_url = replay.start_sec_server()
+    os.environ["SEC_WWW_URL"] = sec_url
+    os.environ["SEC_DATA_URL"] = sec_url
+    replay.install()
+
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import AppTest, local_script_runner
+    from streamlit.util import calc_hash
+
+    # AppTest compiles the script afresh for every run, where a server
+    # compiles it once; parsing the whole app would then dominate each
+    # rerun's time and peak memory and grow with every page added
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+
+    at = AppTest.from_file(str(APP), default_timeout=120)
+    # AppTest.switch_page only knows file-based pages, so the page to open is
+    # picked the way st.navigation remembers it between reruns
+    at._page_hash = calc_hash(page)
+
+    runs = []
+    if trace:
+        tracemalloc.start()
+    for name, action in SCENARIOS[page]:
+        if action is not None:
+            action(at)
+        calls_before = sum(replay.CALLS.values())
+        if trace:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        at.run()
+        wall_ms = (time.perf_counter() - start) * 1000
+        runs.append({
+            "run": name,
+            "wall_ms": round(wall_ms, 1),
+            "calls": sum(replay.CALLS.values()) - calls_before,
+            "peak_kb": round(tracemalloc.get_traced_memory()[1] / 1024) if trace else None,
+            "errors": [exception.message for exception in at.exception],
+        })
+    return runs
+
+
+def run_child(page, trace):
+    # One fresh process with its own empty data directory
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = dict(os.environ, INVINCIBULL_DATA_DIR=data_dir)
+        command = [sys.executable, __file__, "--child", page] + (["--trace"] if trace else [])
+        result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{page} benchmark crashed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(page, repeat):
+    # Best of `repeat` untraced processes for time and calls, and of as many
+    # traced ones for peak memory
+    timed = [run_child(page, trace=False) for _ in range(repeat)]
+    traced = [run_child(page, trace=True) for _ in range(repeat)]
+
+    runs = []
+    for steps, traced_steps in zip(zip(*timed), zip(*traced)):
+        runs.append({
+            "run": steps[0]["run"],
+            "wall_ms": min(step["wall_ms"] for step in steps),
+            "calls": min(step["calls"] for step in steps),
+            "peak_kb": min(step["peak_kb"] for step in traced_steps),
+            "errors": sorted({error for step in steps + traced_steps for error in step["errors"]}),
+        })
+    return runs
+
+
+def regressions(page, runs, baseline):
+    problems = []
+    expected = {run["run"]: run for run in baseline.get(page, [])}
+    for run in runs:
+        label = f"{page} [{run['run']}]"
+        if run["errors"]:
+            problems.append(f"{label}: raised {'; '.join(run['errors'])}")
+        before = expected.get(run["run"])
+        if before is None:
+            continue
+        if run["calls"] > before["calls"]:
+            problems.append(f"{label}: {run['calls']} upstream calls, baseline {before['calls']}")
+        if run["wall_ms"] > before["wall_ms"] * (1 + TIME_TOLERANCE) + TIME_SLACK_MS:
+            problems.append(f"{label}: {run['wall_ms']:.0f} ms, baseline {before['wall_ms']:.0f} ms")
+        if run["peak_kb"] > before["peak_kb"] * (1 + MEMORY_TOLERANCE) + MEMORY_SLACK_KB:
+            problems.append(f"{label}: peak {run['peak_kb']} KB, baseline {before['peak_kb']} KB")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the app's pages against recorded fixtures.")
+    parser.add_argument("--page", action="append", choices=list(SCENARIOS), help="page to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="report the best of this many cold processes")
+    parser.add_argument("--update-baseline", action="store_true", help=f"write the results to {BASELINE.name}")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_page(args.child, args.trace)))
+        return 0
+
+    baseline = json.loads(BASELINE.read_text(encoding="utf-8")) if BASELINE.exists() else {}
+    results = {}
+    problems = []
+    for page in args.page or list(SCENARIOS):
+        runs = results[page] = measure(page, args.repeat)
+        print(page)
+        for run in runs:
+            print(f"  {run['run']:<16} {run['wall_ms']:8.0f} ms  {run['calls']:4d} calls  {run['peak_kb']:8d} KB peak")
+        problems += regressions(page, runs, {} if args.update_baseline else baseline)
+
+    if args.update_baseline:
+        baseline.update(results)
+        BASELINE.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline written to {BASELINE.name}")
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
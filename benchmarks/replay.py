@@ -0,0 +1,273 @@
+import argparse
+import hashlib
+import json
+import socket
+import sys
+import threading
+import types
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+
+# Offline replay of every upstream the app talks to. yfinance is replaced by
+# ReplayTicker/replay_download reading recorded fixtures, SEC EDGAR is served
+# from fixtures by a local HTTP stand-in, and any other connection leaving
+# the machine is refused. Every upstream call is counted in CALLS.
+#
+#   python benchmarks/replay.py record AAPL MSFT   # refresh fixtures (needs network)
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+YF_FIXTURES = FIXTURES / "yfinance"
+SEC_FIXTURES = FIXTURES / "sec"
+
+# Recorded history window and number of option expiries per ticker
+RECORD_PERIOD = "5y"
+RECORD_EXPIRIES = 6
+
+CALLS = Counter()
+_calls_lock = threading.Lock()
+
+
+def count(kind):
+    with _calls_lock:
+        CALLS[kind] += 1
+
+
+def read_json(path, default=None):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return default
+
+
+def read_history(tickerSymbol):
+    directory = YF_FIXTURES / tickerSymbol
+    path = directory / "history.csv"
+    if not path.exists():
+        return pd.DataFrame()
+    history = pd.read_csv(path, index_col="Date")
+    timezone = read_json(directory / "fast_info.json", {}).get("timezone", "America/New_York")
+    history.index = pd.to_datetime(history.index, utc=True).tz_convert(timezone)
+    return history
+
+
+class ReplayTicker:
+    # Stands in for yf.Ticker with the subset of its API the app uses
+    def __init__(self, ticker, session=None):
+        self.ticker = ticker.upper()
+        self.directory = YF_FIXTURES / self.ticker
+
+    def history(self, period=None, interval="1d", start=None, end=None, **kwargs):
+        count("yfinance.history")
+        history = read_history(self.ticker)
+        if history.empty:
+            return history
+        if start is not None:
+            start = pd.Timestamp(start)
+            start = start.tz_localize(history.index.tz) if start.tz is None else start
+            history = history[history.index >= start]
+        if end is not None:
+            end = pd.Timestamp(end)
+            end = end.tz_localize(history.index.tz) if end.tz is None else end
+            history = history[history.index < end]
+        return history
+
+    @property
+    def fast_info(self):
+        count("yfinance.fast_info")
+        values = read_json(self.directory / "fast_info.json")
+        if values is None:
+            raise KeyError(f"no fast_info fixture for {self.ticker}")
+        return types.SimpleNamespace(**values)
+
+    @property
+    def info(self):
+        count("yfinance.info")
+        return read_json(self.directory / "info.json", {})
+
+    @property
+    def news(self):
+        count("yfinance.news")
+        return read_json(self.directory / "news.json", [])
+
+    @property
+    def major_holders(self):
+        count("yfinance.major_holders")
+        path = self.directory / "major_holders.csv"
+        return pd.read_csv(path, index_col=0) if path.exists() else pd.DataFrame()
+
+    @property
+    def recommendations(self):
+        count("yfinance.recommendations")
+        path = self.directory / "recommendations.csv"
+        return pd.read_csv(path) if path.exists() else pd.DataFrame()
+
+    @property
+    def options(self):
+        count("yfinance.options")
+        return tuple(read_json(self.directory / "options.json", {}).get("expiries", []))
+
+    def option_chain(self, date=None):
+        count("yfinance.option_chain")
+        options = read_json(self.directory / "options.json", {})
+        date = date or options["expiries"][0]
+        chain = read_json(self.directory / "option_chain" / f"{date}.json")
+        frames = {side: pd.DataFrame(chain[side]) for side in ("calls", "puts")}
+        for frame in frames.values():
+            frame["lastTradeDate"] = pd.to_datetime(frame["lastTradeDate"], utc=True)
+        return types.SimpleNamespace(calls=frames["calls"], puts=frames["puts"], underlying=options.get("underlying", {}))
+
+
+def replay_download(tickers, period="1y", interval="1d", **kwargs):
+    # yf.download for a list of tickers: (field, ticker) columns, tz-naive dates
+    count("yfinance.download")
+    if isinstance(tickers, str):
+        tickers = tickers.replace(",", " ").split()
+    histories = {}
+    for tickerSymbol in tickers:
+        history = read_history(tickerSymbol.upper())
+        if not history.empty:
+            history.index = history.index.tz_localize(None).normalize()
+            histories[tickerSymbol] = history
+    if not histories:
+        return pd.DataFrame()
+    frame = pd.concat(histories, axis=1)
+    frame = frame.swaplevel(0, 1, axis=1).sort_index(axis=1)
+    frame.columns.names = ["Price", "Ticker"]
+    return frame
+
+
+class SecHandler(BaseHTTPRequestHandler):
+    # Serves fixtures/sec/<path> with an ETag so conditional GETs work
+    def do_GET(self):
+        count("sec")
+        path = (SEC_FIXTURES / self.path.lstrip("/").split("?")[0]).resolve()
+        if SEC_FIXTURES.resolve() not in path.parents or not path.is_file():
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = path.read_bytes()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json" if path.suffix == ".json" else "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_sec_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SecHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def block_network():
+    # Anything that is not loopback would be a real outbound call
+    connect = socket.socket.connect
+
+    def guarded(self, address):
+        host = address[0] if isinstance(address, tuple) else address
+        if host not in ("127.0.0.1", "::1", "localhost"):
+            count("blocked")
+            raise ConnectionRefusedError(f"benchmark replay blocked a connection to {host}")
+        return connect(self, address)
+
+    socket.socket.connect = guarded
+
+
+def install():
+    import yfinance
+
+    yfinance.Ticker = ReplayTicker
+    yfinance.download = replay_download
+    block_network()
+
+
+def record(tickers):
+    # Capture live responses for the given tickers into fixtures/
+    import requests
+    import yfinance as yf
+
+    sec_headers = {"User-Agent": "InvinciBull benchmarks (your.email@example.com)"}
+    companies = requests.get("https://www.sec.gov/files/company_tickers.json", headers=sec_headers, timeout=30).json()
+    wanted = {t.upper() for t in tickers}
+    subset = {key: company for key, company in companies.items() if company["ticker"].upper() in wanted}
+    SEC_FIXTURES.mkdir(parents=True, exist_ok=True)
+    (SEC_FIXTURES / "files").mkdir(exist_ok=True)
+    (SEC_FIXTURES / "files" / "company_tickers.json").write_text(json.dumps(subset, indent=1), encoding="utf-8")
+    exchange = requests.get("https://www.sec.gov/files/company_tickers_exchange.json", headers=sec_headers, timeout=30).json()
+    ticker_field = exchange["fields"].index("ticker")
+    exchange["data"] = [row for row in exchange["data"] if row[ticker_field].upper() in wanted]
+    (SEC_FIXTURES / "files" / "company_tickers_exchange.json").write_text(json.dumps(exchange), encoding="utf-8")
+
+    for company in subset.values():
+        cik = f"{int(company['cik_str']):010d}"
+        submissions = requests.get(f"https://data.sec.gov/submissions/CIK{cik}.json", headers=sec_headers, timeout=30).json()
+        recent = {key: values[:40] for key, values in submissions["filings"]["recent"].items()}
+        (SEC_FIXTURES / "submissions").mkdir(exist_ok=True)
+        (SEC_FIXTURES / "submissions" / f"CIK{cik}.json").write_text(
+            json.dumps({"cik": submissions.get("cik"), "name": submissions.get("name"), "filings": {"recent": recent}}),
+            encoding="utf-8",
+        )
+
+    for tickerSymbol in tickers:
+        ticker = yf.Ticker(tickerSymbol)
+        directory = YF_FIXTURES / tickerSymbol.upper()
+        (directory / "option_chain").mkdir(parents=True, exist_ok=True)
+
+        history = ticker.history(period=RECORD_PERIOD)
+        timezone = str(history.index.tz)
+        history.index = history.index.tz_convert("UTC")
+        history.to_csv(directory / "history.csv", index_label="Date")
+
+        fast_info = ticker.fast_info
+        (directory / "fast_info.json").write_text(json.dumps({
+            "last_price": fast_info.last_price,
+            "shares": fast_info.shares,
+            "market_cap": fast_info.market_cap,
+            "timezone": timezone,
+        }, indent=1), encoding="utf-8")
+        (directory / "info.json").write_text(json.dumps(ticker.info, indent=1), encoding="utf-8")
+        (directory / "news.json").write_text(json.dumps(ticker.news, indent=1), encoding="utf-8")
+        ticker.major_holders.to_csv(directory / "major_holders.csv")
+        ticker.recommendations.to_csv(directory / "recommendations.csv", index=False)
+
+        expiries = list(ticker.options[:RECORD_EXPIRIES])
+        underlying = {}
+        for expiry in expiries:
+            chain = ticker.option_chain(expiry)
+            underlying = chain.underlying or underlying
+            (directory / "option_chain" / f"{expiry}.json").write_text(json.dumps({
+                side: json.loads(getattr(chain, side).to_json(orient="records", date_format="iso"))
+                for side in ("calls", "puts")
+            }), encoding="utf-8")
+        (directory / "options.json").write_text(json.dumps({
+            "expiries": expiries,
+            "underlying": {"regularMarketPrice": underlying.get("regularMarketPrice")},
+        }, indent=1), encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the benchmark replay fixtures.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="record live responses (needs network)")
+    record_parser.add_argument("tickers", nargs="+")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record([t.upper() for t in args.tickers])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+import os
+from pathlib import Path
+
+# Root directory for everything InvinciBull persists between runs (price
+# store, HTTP caches, ...). Override with INVINCIBULL_DATA_DIR.
+DATA_DIR = Path(os.environ.get("INVINCIBULL_DATA_DIR", ".invincibull"))
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+# Downsampling for price charts over long high-resolution histories. Only
+# the visible range is cut out of the full-resolution frame (a binary
+# search, no copy), then reduced to about as many points as a chart can
+# show: candles are merged into equal-count buckets keeping each bucket's
+# open, high, low and close, and line charts keep the points
+# Largest-Triangle-Three-Buckets picks, so peaks and drops survive.
+
+# Points sent to the browser for a line (WebGL) and for candles
+MAX_LINE_POINTS = 4000
+MAX_CANDLES = 1000
+
+
+def visible_slice(history, start=None, end=None):
+    # Rows between start and end (inclusive) of a time-sorted frame
+    index = history.index
+    lo = 0 if start is None else index.searchsorted(start, side="left")
+    hi = len(index) if end is None else index.searchsorted(end, side="right")
+    return history.iloc[lo:hi]
+
+
+def bucket_edges(n, buckets):
+    return np.unique(np.linspace(0, n, buckets + 1).astype(np.int64))
+
+
+def ohlc_buckets(history, buckets=MAX_CANDLES):
+    # Consecutive bars merged into at most `buckets` bars: first open, max
+    # high, min low, last close and total volume, stamped with the first
+    # bar's time. Frames that already fit are returned as they are.
+    if len(history) <= buckets:
+        return history
+    edges = bucket_edges(len(history), buckets)
+    starts, ends = edges[:-1], edges[1:] - 1
+    merged = {
+        "Open": history["Open"].to_numpy()[starts],
+        "High": np.fmax.reduceat(history["High"].to_numpy(dtype=float), starts),
+        "Low": np.fmin.reduceat(history["Low"].to_numpy(dtype=float), starts),
+        "Close": history["Close"].to_numpy()[ends],
+    }
+    if "Volume" in history:
+        merged["Volume"] = np.add.reduceat(np.nan_to_num(history["Volume"].to_numpy(dtype=float)), starts)
+    return pd.DataFrame(merged, index=history.index[starts])
+
+
+def lttb(x, y, threshold):
+    # Positions of the `threshold` points Largest-Triangle-Three-Buckets
+    # keeps. The first and last points always stay; every bucket in between
+    # keeps the point forming the largest triangle with the point kept
+    # before it and the average of the next bucket.
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    # Averages of every bucket, and of the last point as the final "next" bucket
+    sizes = np.diff(np.append(edges, n))
+    mean_x = np.add.reduceat(x, edges) / sizes
+    mean_y = np.add.reduceat(y, edges) / sizes
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        px, py = x[previous], y[previous]
+        area = np.abs((px - mean_x[bucket + 1]) * (y[start:end] - py) - (px - x[start:end]) * (mean_y[bucket + 1] - py))
+        previous = start + int(np.argmax(area))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def line_points(history, column="Close", points=MAX_LINE_POINTS):
+    # A column reduced to about `points` values with LTTB
+    series = history[column].dropna()
+    if len(series) <= points:
+        return series
+    kept = lttb(series.index.asi8, series.to_numpy(), points)
+    return series.iloc[kept]
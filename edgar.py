@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from html.parser import HTMLParser
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import DATA_DIR
+from upstream import coalesce, upstream_call
+
+# SEC EDGAR client. All traffic goes through one pooled session, is rate
+# limited below SEC's fair-access policy (10 requests/second), revalidated
+# with ETag/Last-Modified and cached on disk. Base URLs can be pointed at a
+# local stand-in server for offline runs.
+SEC_WWW_URL = os.environ.get("SEC_WWW_URL", "https://www.sec.gov")
+SEC_DATA_URL = os.environ.get("SEC_DATA_URL", "https://data.sec.gov")
+# SEC asks automated clients to identify themselves with a contact address
+SEC_USER_AGENT = os.environ.get("SEC_USER_AGENT", "InvinciBull (your.email@example.com)")
+
+CACHE_DIR = DATA_DIR / "edgar"
+TICKERS_TTL = 24 * 60 * 60
+SUBMISSIONS_TTL = 15 * 60
+# Filed documents never change
+DOCUMENT_TTL = 30 * 24 * 60 * 60
+
+
+class TokenBucket:
+    # Thread-safe token bucket: at most `rate` requests per second on average,
+    # with bursts of up to `capacity`
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class TextExtractor(HTMLParser):
+    # Visible text of an HTML filing, without scripts and styles
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self.skipping += 1
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style") and self.skipping:
+            self.skipping -= 1
+
+    def handle_data(self, data):
+        if not self.skipping and data.strip():
+            self.parts.append(data.strip())
+
+    def text(self):
+        return " ".join(self.parts)
+
+
+class DiskCache:
+    # One JSON file per URL holding the body and its validators
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, url):
+        return self.directory / f"{hashlib.sha1(url.encode()).hexdigest()}.json"
+
+    def get(self, url):
+        try:
+            with open(self.path(url), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url, entry):
+        path = self.path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+
+class EdgarClient:
+    def __init__(self, www_url=SEC_WWW_URL, data_url=SEC_DATA_URL, user_agent=SEC_USER_AGENT,
+                 cache_dir=CACHE_DIR, rate=8):
+        self.www_url = www_url.rstrip("/")
+        self.data_url = data_url.rstrip("/")
+        self.cache = DiskCache(cache_dir)
+        self.limiter = TokenBucket(rate)
+
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": user_agent, "Accept-Encoding": "gzip, deflate"})
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._cik_index = None
+        self._cik_fetched_at = 0
+        self._cik_lock = threading.Lock()
+
+    def get_json(self, url, ttl):
+        return self.get(url, ttl, lambda response: response.json())
+
+    def get_text(self, url, ttl):
+        return self.get(url, ttl, lambda response: response.text)
+
+    def get(self, url, ttl, decode):
+        entry = self.cache.get(url)
+        if entry and time.time() - entry["fetched_at"] < ttl:
+            return entry["body"]
+        # Sessions asking for the same URL at once share one request
+        return coalesce(("sec", url), self.revalidate, url, entry, decode)
+
+    def revalidate(self, url, entry, decode):
+        # Stale or missing: revalidate with whatever validators we have
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        self.limiter.acquire()
+        try:
+            with upstream_call("sec.get"):
+                response = self.session.get(url, headers=headers, timeout=10)
+        except requests.RequestException:
+            if entry:
+                return entry["body"]
+            raise
+
+        if response.status_code == 304 and entry:
+            entry["fetched_at"] = time.time()
+            self.cache.put(url, entry)
+            return entry["body"]
+
+        response.raise_for_status()
+        body = decode(response)
+        self.cache.put(url, {
+            "fetched_at": time.time(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "body": body,
+        })
+        return body
+
+    def cik_index(self):
+        # Ticker -> zero-padded CIK from SEC's company tickers file, rebuilt
+        # whenever the cached file is refreshed
+        url = f"{self.www_url}/files/company_tickers.json"
+        with self._cik_lock:
+            if self._cik_index is None or time.time() - self._cik_fetched_at >= TICKERS_TTL:
+                companies = self.get_json(url, TICKERS_TTL)
+                entry = self.cache.get(url)
+                self._cik_fetched_at = entry["fetched_at"] if entry else time.time()
+                self._cik_index = {
+                    company["ticker"].upper(): f"{int(company['cik_str']):010d}"
+                    for company in companies.values()
+                }
+            return self._cik_index
+
+    def lookup_cik(self, tickerSymbol):
+        return self.cik_index().get(tickerSymbol.upper().replace(".", "-"))
+
+    def document_text(self, url):
+        extractor = TextExtractor()
+        extractor.feed(self.get_text(url, DOCUMENT_TTL))
+        return extractor.text()
+
+    def recent_filings(self, tickerSymbol, count=40):
+        cik = self.lookup_cik(tickerSymbol)
+        if cik is None:
+            return []
+
+        submissions = self.get_json(f"{self.data_url}/submissions/CIK{cik}.json", SUBMISSIONS_TTL)
+        recent = submissions.get("filings", {}).get("recent", {})
+        forms = recent.get("form", [])[:count]
+
+        filings = []
+        for i, form in enumerate(forms):
+            accession = recent["accessionNumber"][i]
+            document = recent["primaryDocument"][i]
+            folder = f"{self.www_url}/Archives/edgar/data/{int(cik)}/{accession.replace('-', '')}"
+            filings.append({
+                "form": form,
+                "description": recent.get("primaryDocDescription", [""] * len(forms))[i] or form,
+                "date": recent["filingDate"][i],
+                "url": f"{folder}/{document}" if document else f"{folder}/",
+            })
+        return filings
@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+
+from price_store import PERIOD_OFFSETS
+from screener import download_prices
+
+# Futures term structures and continuous series built from individual
+# contract months. Every root's recently expired and listed contracts come
+# from one batched download; the curve is the latest price of each listed
+# month, and the continuous series follows the front month, rolling a fixed
+# number of business days before its last trade and back-adjusting earlier
+# prices so the rolls leave no gaps. Contracts Yahoo has no prices for are
+# left out. Last trade dates follow each exchange's rule on a Monday-Friday
+# calendar, so a holiday can put one a day off.
+
+MONTH_CODES = "FGHJKMNQUVXZ"
+QUARTERLY = "HMUZ"
+MONTHLY = MONTH_CODES
+
+# root: (name, Yahoo exchange suffix, listed months, listed contracts shown,
+# last trade rule, business days before the last trade to roll)
+ROOTS = {
+    "MES": ("Micro E-mini S&P 500", "CME", QUARTERLY, 4, "third_friday", 5),
+    "NQ": ("E-mini Nasdaq-100", "CME", QUARTERLY, 4, "third_friday", 5),
+    "YM": ("E-mini Dow", "CBT", QUARTERLY, 4, "third_friday", 5),
+    "RTY": ("E-mini Russell 2000", "CME", QUARTERLY, 4, "third_friday", 5),
+    "VX": ("Cboe VIX", "CBF", MONTHLY, 8, "vix", 5),
+    "NKD": ("Nikkei 225 (USD)", "CME", QUARTERLY, 4, "nikkei", 5),
+    "HSI": ("Hang Seng Index", "HKF", MONTHLY, 4, "hang_seng", 2),
+    "CL": ("WTI crude oil", "NYM", MONTHLY, 12, "crude", 3),
+    "GC": ("Gold", "CMX", "GJMQVZ", 6, "metal", 25),
+    "SI": ("Silver", "CMX", "HKNUZ", 5, "metal", 25),
+    "HG": ("Copper", "CMX", "HKNUZ", 5, "metal", 25),
+}
+# How far ahead contract months are generated before picking listed ones
+MONTHS_AHEAD = 60
+# Calendar days in a year, for annualizing carry
+YEAR_DAYS = 365
+
+CURVE_COLUMNS = ["contract", "month", "lastTrade", "daysToExpiry", "price", "volume", "spread", "carry"]
+
+
+def month_starts(months):
+    return months.astype("datetime64[D]")
+
+
+def nth_weekday(months, n, weekday):
+    # The nth given weekday ("Fri") of each month
+    return np.busday_offset(month_starts(months), n - 1, roll="forward", weekmask=weekday)
+
+
+def business_days_before(days, n):
+    return np.busday_offset(days, -n, roll="backward")
+
+
+def last_business_days(months, n):
+    # The nth-last business day of each month
+    return np.busday_offset(month_starts(months + 1), -n, roll="forward")
+
+
+def last_trade_dates(rule, months):
+    # Last trading day of each contract month (datetime64[M] array)
+    if rule == "third_friday":
+        return nth_weekday(months, 3, "Fri")
+    if rule == "nikkei":
+        # Business day before the second Friday
+        return business_days_before(nth_weekday(months, 2, "Fri"), 1)
+    if rule == "vix":
+        # Wednesday 30 days before the third Friday of the next month
+        return nth_weekday(months + 1, 3, "Fri") - np.timedelta64(30, "D")
+    if rule == "crude":
+        # Three business days before the 25th of the previous month, or
+        # before the business day preceding it
+        return business_days_before(np.busday_offset(month_starts(months - 1) + 24, 0, roll="backward"), 3)
+    if rule == "metal":
+        return last_business_days(months, 3)
+    if rule == "hang_seng":
+        return last_business_days(months, 2)
+    raise ValueError(f"unknown last trade rule {rule!r}")
+
+
+def contracts(root, start, today):
+    # The root's contract months whose last trade falls on or after start,
+    # up to its listed contracts after today: one row per Yahoo symbol with
+    # the contract's month, last trade and roll dates
+    name, exchange, listed, shown, rule, roll_days = ROOTS[root]
+    today = np.datetime64(today, "D")
+    months = np.arange(np.datetime64(start, "M"), np.datetime64(today, "M") + MONTHS_AHEAD)
+    months = months[np.isin(months.astype(int) % 12, [MONTH_CODES.index(code) for code in listed])]
+    last_trade = last_trade_dates(rule, months)
+    kept = last_trade >= np.datetime64(start, "D")
+    months, last_trade = months[kept], last_trade[kept]
+    live = np.flatnonzero(last_trade >= today)
+    months, last_trade = months[:live[shown - 1] + 1], last_trade[:live[shown - 1] + 1]
+
+    years = months.astype(int) // 12 + 1970
+    codes = [MONTH_CODES[month % 12] for month in months.astype(int)]
+    symbols = [f"{root}{code}{year % 100:02d}.{exchange}" for code, year in zip(codes, years)]
+    return pd.DataFrame({
+        "root": root,
+        "month": pd.to_datetime(months).strftime("%b %Y"),
+        "lastTrade": pd.to_datetime(last_trade),
+        "roll": pd.to_datetime(business_days_before(last_trade, roll_days)),
+    }, index=pd.Index(symbols, name="contract"))
+
+
+def download_board(period="2y", today=None):
+    # Contracts of every root, and their (date x contract) Close and Volume
+    # matrices from one batched download
+    today = pd.Timestamp.today().normalize() if today is None else pd.Timestamp(today)
+    start = today - PERIOD_OFFSETS[period]
+    board = pd.concat([contracts(root, start, today) for root in ROOTS])
+    close, volume = download_prices(list(board.index), period)
+    return board, close, volume
+
+
+def term_structure(board, close, volume, today=None):
+    # Latest price of every listed month with a price, nearest first. Spread
+    # is against the front month; carry annualizes it over the time between
+    # the two expiries.
+    today = pd.Timestamp.today().normalize() if today is None else pd.Timestamp(today)
+    listed = board[(board["lastTrade"] >= today) & board.index.isin(close.columns)]
+    if listed.empty:
+        return pd.DataFrame(columns=CURVE_COLUMNS)
+    prices = close[listed.index].ffill().iloc[-1]
+    curve = listed[["month", "lastTrade"]].assign(
+        daysToExpiry=(listed["lastTrade"] - today).dt.days,
+        price=prices,
+        volume=volume[listed.index].iloc[-1],
+    ).dropna(subset=["price"])
+    if curve.empty:
+        return pd.DataFrame(columns=CURVE_COLUMNS)
+    front = curve.iloc[0]
+    years = (curve["daysToExpiry"] - front["daysToExpiry"]) / YEAR_DAYS
+    with np.errstate(invalid="ignore", divide="ignore"):
+        curve["spread"] = curve["price"] - front["price"]
+        curve["carry"] = ((curve["price"] / front["price"]) ** (1 / years) - 1).where(years > 0) * 100
+    return curve.reset_index()[CURVE_COLUMNS]
+
+
+def continuous(board, close, method="difference"):
+    # Front-month series: each date takes the first contract whose roll date
+    # is after it. Earlier prices are shifted by every later roll's gap
+    # (difference) or scaled by its ratio (ratio), so returns across a roll
+    # are the held contract's. Columns: close (adjusted), raw and contract.
+    listed = board.index[board.index.isin(close.columns)]
+    listed = listed[close[listed].notna().any().to_numpy()]
+    if listed.empty:
+        return pd.DataFrame(columns=["close", "raw", "contract"])
+    rolls = board.loc[listed, "roll"].to_numpy("datetime64[ns]")
+    order = np.argsort(rolls, kind="stable")
+    listed, rolls = listed[order], rolls[order]
+
+    values = close[listed].ffill().to_numpy(dtype=float)
+    active = np.minimum(np.searchsorted(rolls, close.index.to_numpy("datetime64[ns]"), side="right"), len(listed) - 1)
+    rows = np.arange(len(values))
+    raw = values[rows, active]
+
+    # Rows where a newer contract takes over, and the prices of both then
+    switch = np.flatnonzero(np.diff(active)) + 1
+    new, old = values[switch, active[switch]], values[switch, active[switch - 1]]
+    if method == "ratio":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            steps = np.ones(len(values))
+            steps[switch - 1] = np.where(old > 0, new / old, np.nan)
+        steps = np.nan_to_num(steps, nan=1.0)
+        adjusted = raw * np.cumprod(steps[::-1])[::-1]
+    elif method == "difference":
+        gaps = np.zeros(len(values))
+        gaps[switch - 1] = np.nan_to_num(new - old)
+        adjusted = raw + np.cumsum(gaps[::-1])[::-1]
+    else:
+        raise ValueError(f"unknown adjustment {method!r}")
+
+    series = pd.DataFrame({"close": adjusted, "raw": raw, "contract": listed[active]}, index=close.index)
+    return series.dropna(subset=["raw"])
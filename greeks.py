@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+# Black-Scholes pricing, greeks and implied volatility over whole option
+# chains. Every function takes NumPy arrays (or scalars that broadcast) and
+# works on all contracts at once.
+RISK_FREE_RATE = 0.045
+SQRT_2PI = np.sqrt(2 * np.pi)
+
+# Implied volatility search bounds
+MIN_VOL = 1e-4
+MAX_VOL = 5.0
+
+
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
+
+def d1_d2(S, K, T, r, sigma, q=0.0):
+    vol_sqrt_t = sigma * np.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / vol_sqrt_t
+    return d1, d1 - vol_sqrt_t
+
+
+def black_scholes_price(S, K, T, r, sigma, is_call, q=0.0):
+    d1, d2 = d1_d2(S, K, T, r, sigma, q)
+    disc_s = S * np.exp(-q * T)
+    disc_k = K * np.exp(-r * T)
+    call = disc_s * ndtr(d1) - disc_k * ndtr(d2)
+    put = disc_k * ndtr(-d2) - disc_s * ndtr(-d1)
+    return np.where(is_call, call, put)
+
+
+def black_scholes_greeks(S, K, T, r, sigma, is_call, q=0.0):
+    # Vega and rho per 1 point of vol/rate, theta per calendar day
+    d1, d2 = d1_d2(S, K, T, r, sigma, q)
+    sqrt_t = np.sqrt(T)
+    disc_q = np.exp(-q * T)
+    disc_r = np.exp(-r * T)
+    pdf_d1 = norm_pdf(d1)
+    sign = np.where(is_call, 1.0, -1.0)
+
+    delta = sign * disc_q * ndtr(sign * d1)
+    gamma = disc_q * pdf_d1 / (S * sigma * sqrt_t)
+    vega = S * disc_q * pdf_d1 * sqrt_t / 100
+    theta = (
+        -S * disc_q * pdf_d1 * sigma / (2 * sqrt_t)
+        - sign * r * K * disc_r * ndtr(sign * d2)
+        + sign * q * S * disc_q * ndtr(sign * d1)
+    ) / 365
+    rho = sign * K * T * disc_r * ndtr(sign * d2) / 100
+    return {"delta": delta, "gamma": gamma, "vega": vega, "theta": theta, "rho": rho}
+
+
+def implied_volatility(price, S, K, T, r, is_call, q=0.0, tol=1e-6, max_iter=50):
+    # Safeguarded Newton: take the Newton step where it stays inside the
+    # current bracket, otherwise bisect. All contracts iterate together.
+    price, S, K, T = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (price, S, K, T)))
+    is_call = np.broadcast_to(is_call, price.shape)
+
+    # Prices outside the no-arbitrage bounds have no implied volatility
+    disc_s = S * np.exp(-q * T)
+    disc_k = K * np.exp(-r * T)
+    lower = np.where(is_call, np.maximum(disc_s - disc_k, 0), np.maximum(disc_k - disc_s, 0))
+    upper = np.where(is_call, disc_s, disc_k)
+    solvable = np.isfinite(price) & (T > 0) & (price > lower) & (price < upper)
+
+    lo = np.full(price.shape, MIN_VOL)
+    hi = np.full(price.shape, MAX_VOL)
+    # Brenner-Subrahmanyam starting guess
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma = np.clip(np.sqrt(2 * np.pi / T) * price / S, 0.05, 2.0)
+    sigma = np.where(solvable, sigma, np.nan)
+    active = solvable.copy()
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        s = sigma[active]
+        args = (S[active], K[active], T[active], r)
+        diff = black_scholes_price(*args, s, is_call[active], q) - price[active]
+        vega = black_scholes_greeks(*args, s, is_call[active], q)["vega"] * 100
+
+        a_lo = np.where(diff < 0, s, lo[active])
+        a_hi = np.where(diff > 0, s, hi[active])
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            step = s - diff / vega
+        bisect = ~np.isfinite(step) | (step <= a_lo) | (step >= a_hi)
+        new = np.where(bisect, 0.5 * (a_lo + a_hi), step)
+
+        priced = np.abs(diff) < tol
+        done = priced | (np.abs(new - s) < tol)
+        lo[active] = a_lo
+        hi[active] = a_hi
+        sigma[active] = np.where(priced, s, new)
+        active[np.flatnonzero(active)[done]] = False
+
+    # Anything still iterating did not converge
+    sigma[active] = np.nan
+    return sigma
+
+
+def years_to_expiry(expiries, now=None):
+    # US equity options stop trading at 16:00 New York time on expiry
+    now = now or pd.Timestamp.now(tz="America/New_York")
+    close = pd.to_datetime(expiries).tz_localize("America/New_York") + pd.Timedelta(hours=16)
+    years = (close - now) / pd.Timedelta(days=365)
+    return np.maximum(np.asarray(years, dtype=float), 1 / (365 * 24))
+
+
+def add_greeks(chain, spot, r=RISK_FREE_RATE, q=0.0, now=None):
+    # Mid-price IV and greeks for a long-format chain indexed by
+    # (expiry, type, strike), added as columns
+    chain = chain.copy()
+    if chain.empty:
+        return chain
+    # Without a spot price every column is NaN, but the schema stays the same
+    spot = np.nan if spot is None else float(spot)
+
+    strike = chain.index.get_level_values("strike").to_numpy(dtype=float)
+    is_call = chain.index.get_level_values("type").to_numpy() == "call"
+    T = years_to_expiry(chain.index.get_level_values("expiry"), now)
+
+    bid = chain["bid"].to_numpy(dtype=float)
+    ask = chain["ask"].to_numpy(dtype=float)
+    last = chain["lastPrice"].to_numpy(dtype=float)
+    # Fall back to the last trade when there is no two-sided market
+    mid = np.where((bid > 0) & (ask > 0), 0.5 * (bid + ask), last)
+
+    iv = implied_volatility(mid, spot, strike, T, r, is_call, q)
+    # Where the mid cannot be inverted, keep yfinance's own estimate
+    sigma = np.where(np.isfinite(iv), iv, chain["impliedVolatility"].to_numpy(dtype=float))
+    sigma = np.where(sigma > 0, sigma, np.nan)
+
+    chain["mid"] = mid
+    chain["iv"] = iv
+    for name, values in black_scholes_greeks(spot, strike, T, r, sigma, is_call, q).items():
+        chain[name] = values
+    return chain
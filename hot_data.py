@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import record_lookup
+from upstream import coalesce
+
+# Process-wide stale-while-revalidate cache for per-ticker upstream data
+# (quotes, history, news, option chains). A missing entry is loaded while
+# the caller waits; a stale one is returned at once and refreshed on a worker
+# pool. Pages report which ticker they show through touch(), and a scheduler
+# refreshes the entries of the most viewed tickers shortly before they
+# expire, so popular names are always served from memory.
+
+# Seconds between scheduler passes
+TICK = 10
+# Hot entries are refreshed once they are this far into their TTL
+REFRESH_AHEAD = 0.8
+# How many of the most requested tickers are kept warm
+HOT_TICKERS = 20
+# Request counts halve over this many seconds, so popularity follows the day
+POPULARITY_HALF_LIFE = 30 * 60
+# Decayed request count a ticker needs before it is kept warm
+MIN_REQUESTS = 2
+REFRESH_WORKERS = 4
+
+
+class Dataset:
+    def __init__(self, fetch, ttl, max_stale=None, max_entries=256):
+        self.fetch = fetch
+        self.ttl = ttl
+        # Entries older than this are not worth showing and block for a fetch
+        self.max_stale = max_stale if max_stale is not None else float("inf")
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+
+class HotDataCache:
+    def __init__(self, workers=REFRESH_WORKERS, tick=TICK, hot_tickers=HOT_TICKERS):
+        self.datasets = {}
+        self.refreshing = set()
+        self.popularity = {}
+        self.lock = threading.Lock()
+        self.background = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hot-refresh")
+        self.tick = tick
+        self.hot_tickers = hot_tickers
+        self.scheduler = None
+
+    def register(self, kind, fetch, ttl, max_stale=None, max_entries=256):
+        # fetch(tickerSymbol, *args) loads one entry of this kind
+        self.datasets[kind] = Dataset(fetch, ttl, max_stale, max_entries)
+
+    def get(self, kind, tickerSymbol, *args):
+        dataset = self.datasets[kind]
+        key = (tickerSymbol, *args)
+        self.start()
+
+        with self.lock:
+            cached = dataset.entries.get(key)
+            if cached is not None:
+                dataset.entries.move_to_end(key)
+
+        age = time.monotonic() - cached[0] if cached is not None else None
+        record_lookup(kind, age is not None and age <= dataset.max_stale)
+        if age is None or age > dataset.max_stale:
+            return self.refresh(kind, key)
+        if age > dataset.ttl:
+            self.refresh_in_background(kind, key)
+        return cached[1]
+
+    def refresh(self, kind, key):
+        # Sessions missing the same entry at once share one fetch
+        return coalesce(("hot", kind, key), self.load, kind, key)
+
+    def load(self, kind, key):
+        dataset = self.datasets[kind]
+        value = dataset.fetch(*key)
+        with self.lock:
+            dataset.entries[key] = (time.monotonic(), value)
+            dataset.entries.move_to_end(key)
+            while len(dataset.entries) > dataset.max_entries:
+                dataset.entries.popitem(last=False)
+        return value
+
+    def refresh_in_background(self, kind, key):
+        with self.lock:
+            if (kind, key) in self.refreshing:
+                return
+            self.refreshing.add((kind, key))
+
+        def run():
+            try:
+                self.refresh(kind, key)
+            except Exception:
+                # Keep serving the stale entry; a later pass will try again
+                pass
+            finally:
+                with self.lock:
+                    self.refreshing.discard((kind, key))
+
+        self.background.submit(run)
+
+    def touch(self, tickerSymbol):
+        # Exponentially decayed view count per ticker
+        now = time.monotonic()
+        with self.lock:
+            score, updated = self.popularity.get(tickerSymbol, (0.0, now))
+            self.popularity[tickerSymbol] = (score * 0.5 ** ((now - updated) / POPULARITY_HALF_LIFE) + 1, now)
+
+    def hot(self):
+        now = time.monotonic()
+        with self.lock:
+            scores = {
+                tickerSymbol: score * 0.5 ** ((now - updated) / POPULARITY_HALF_LIFE)
+                for tickerSymbol, (score, updated) in self.popularity.items()
+            }
+            # Forget tickers nobody asks for any more
+            for tickerSymbol, score in scores.items():
+                if score < 0.01:
+                    del self.popularity[tickerSymbol]
+        ranked = sorted((t for t, score in scores.items() if score >= MIN_REQUESTS), key=scores.get, reverse=True)
+        return set(ranked[:self.hot_tickers])
+
+    def refresh_hot(self):
+        # Queue a refresh for every entry of a hot ticker that is close to expiry
+        hot = self.hot()
+        now = time.monotonic()
+        with self.lock:
+            due = [
+                (kind, key)
+                for kind, dataset in self.datasets.items()
+                for key, (fetched_at, _) in dataset.entries.items()
+                if key[0] in hot and now - fetched_at > dataset.ttl * REFRESH_AHEAD
+            ]
+        for kind, key in due:
+            self.refresh_in_background(kind, key)
+        return due
+
+    def start(self):
+        with self.lock:
+            if self.scheduler is not None:
+                return
+            self.scheduler = threading.Thread(target=self.run_scheduler, name="hot-scheduler", daemon=True)
+        self.scheduler.start()
+
+    def run_scheduler(self):
+        while True:
+            time.sleep(self.tick)
+            try:
+                self.refresh_hot()
+            except Exception:
+                pass
@@ -0,0 +1,340 @@
+import math
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+# Technical indicators over OHLCV history. Every indicator has two forms that
+# give the same numbers:
+#   - vectorized functions over a whole series, or over a (date x ticker)
+#     frame for the screener and backtests
+#   - IndicatorState, which carries what each indicator needs from the bars
+#     so far and takes new bars in O(1), so a refreshed history never
+#     recomputes the bars before it
+# Moving averages follow pandas' recursive (adjust=False) EWM; RSI and ATR
+# use Wilder's smoothing (alpha = 1 / period).
+
+SETTINGS = {
+    "sma": 50,
+    "ema": 20,
+    "rsi": 14,
+    "macd": (12, 26, 9),
+    "bollinger": (20, 2.0),
+    "atr": 14,
+    "vwap": 20,
+}
+# Column names of compute()'s output
+COLUMNS = [
+    "sma", "ema", "rsi", "macd", "macdSignal", "macdHist",
+    "bollingerMid", "bollingerUpper", "bollingerLower", "atr", "vwap",
+]
+MAX_STATES = 256
+
+
+def sma(close, period):
+    return close.rolling(period, min_periods=period).mean()
+
+
+def ema(close, period):
+    return close.ewm(span=period, adjust=False, min_periods=period).mean()
+
+
+def wilder(values, period):
+    return values.ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+
+
+def rsi(close, period=SETTINGS["rsi"]):
+    change = close.diff()
+    gain = wilder(change.clip(lower=0), period)
+    loss = wilder(-change.clip(upper=0), period)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100 - 100 / (1 + gain / loss)
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    # MACD line, signal line and histogram
+    line = (close.ewm(span=fast, adjust=False).mean() - close.ewm(span=slow, adjust=False).mean())
+    line = line.where(close.notna().cumsum() >= slow)
+    signal_line = line.ewm(span=signal, adjust=False, min_periods=signal).mean()
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close, period=20, width=2.0):
+    # Middle, upper and lower bands; the deviation is the population one
+    mid = sma(close, period)
+    deviation = close.rolling(period, min_periods=period).std(ddof=0)
+    return mid, mid + width * deviation, mid - width * deviation
+
+
+def true_range(high, low, close):
+    previous = close.shift()
+    return np.maximum(high - low, np.maximum((high - previous).abs(), (low - previous).abs())).fillna(high - low)
+
+
+def atr(high, low, close, period=SETTINGS["atr"]):
+    return wilder(true_range(high, low, close), period)
+
+
+def vwap(high, low, close, volume, period=SETTINGS["vwap"]):
+    # Rolling volume-weighted average of the typical price
+    typical = (high + low + close) / 3
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (typical * volume).rolling(period, min_periods=period).sum() / volume.rolling(period, min_periods=period).sum()
+
+
+def compute(history, settings=SETTINGS):
+    # Every indicator for one OHLCV frame, indexed like it
+    high, low, close, volume = (history[column].astype(float) for column in ["High", "Low", "Close", "Volume"])
+    line, signal_line, hist = macd(close, *settings["macd"])
+    mid, upper, lower = bollinger(close, *settings["bollinger"])
+    return pd.DataFrame({
+        "sma": sma(close, settings["sma"]),
+        "ema": ema(close, settings["ema"]),
+        "rsi": rsi(close, settings["rsi"]),
+        "macd": line,
+        "macdSignal": signal_line,
+        "macdHist": hist,
+        "bollingerMid": mid,
+        "bollingerUpper": upper,
+        "bollingerLower": lower,
+        "atr": atr(high, low, close, settings["atr"]),
+        "vwap": vwap(high, low, close, volume, settings["vwap"]),
+    }, index=history.index)
+
+
+# Incremental building blocks. Each keeps committed state for every bar
+# before the latest one; peek() gives its output with the latest input and
+# commit() folds that input in once a newer bar arrives. Keeping the latest
+# bar out of the state lets it be revised (a partial bar re-fetched) for free.
+
+class Ewm:
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = math.nan
+        self.count = 0
+
+    def seed(self, values):
+        values = values.dropna()
+        if len(values):
+            self.value = float(values.ewm(alpha=self.alpha, adjust=False).mean().iloc[-1])
+            self.count = len(values)
+
+    def raw(self, x):
+        if math.isnan(x):
+            return self.value
+        return x if self.count == 0 else self.value + self.alpha * (x - self.value)
+
+    def peek(self, x):
+        count = self.count + (not math.isnan(x))
+        return self.raw(x) if count >= self.min_periods else math.nan
+
+    def commit(self, x):
+        if not math.isnan(x):
+            self.value = self.raw(x)
+            self.count += 1
+
+
+class Window:
+    # Sums of the last `size` inputs and of their squares
+    def __init__(self, size):
+        self.size = size
+        self.values = deque()
+        self.total = 0.0
+        self.squares = 0.0
+
+    def seed(self, values):
+        for x in values.to_numpy(dtype=float)[-(self.size - 1):] if self.size > 1 else []:
+            self.commit(x)
+
+    def peek(self, x):
+        # (sum, sum of squares) over the full window ending at x, or None
+        if len(self.values) < self.size - 1 or math.isnan(x):
+            return None
+        return self.total + x, self.squares + x * x
+
+    def commit(self, x):
+        if math.isnan(x):
+            self.values.clear()
+            self.total = self.squares = 0.0
+            return
+        self.values.append(x)
+        self.total += x
+        self.squares += x * x
+        if len(self.values) > self.size - 1:
+            old = self.values.popleft()
+            self.total -= old
+            self.squares -= old * old
+
+
+class IndicatorState:
+    # The indicators of compute() kept up to date one bar at a time
+    def __init__(self, history, settings=SETTINGS):
+        self.settings = settings
+        fast, slow, signal = settings["macd"]
+        self.sma = Window(settings["sma"])
+        self.ema = Ewm(2 / (settings["ema"] + 1), settings["ema"])
+        self.gain = Ewm(1 / settings["rsi"], settings["rsi"])
+        self.loss = Ewm(1 / settings["rsi"], settings["rsi"])
+        self.fast = Ewm(2 / (fast + 1), 1)
+        self.slow = Ewm(2 / (slow + 1), slow)
+        self.signal = Ewm(2 / (signal + 1), signal)
+        self.bollinger = Window(settings["bollinger"][0])
+        self.atr = Ewm(1 / settings["atr"], settings["atr"])
+        self.weighted = Window(settings["vwap"])
+        self.volume = Window(settings["vwap"])
+        self.previous_close = math.nan
+        self.time = None
+        self.bar = None
+        self.seed(history)
+
+    def seed(self, history):
+        # Committed state from every bar but the last, using the vectorized
+        # forms; the last bar becomes the pending one
+        if history.empty:
+            return
+        committed = history.iloc[:-1]
+        high, low, close, volume = (committed[column].astype(float) for column in ["High", "Low", "Close", "Volume"])
+        change = close.diff()
+        self.sma.seed(close)
+        self.ema.seed(close)
+        self.gain.seed(change.clip(lower=0))
+        self.loss.seed(-change.clip(upper=0))
+        self.fast.seed(close)
+        self.slow.seed(close)
+        self.signal.seed(macd(close, *self.settings["macd"])[0])
+        self.bollinger.seed(close)
+        self.atr.seed(true_range(high, low, close))
+        self.weighted.seed((high + low + close) / 3 * volume)
+        self.volume.seed(volume)
+        if len(committed):
+            self.previous_close = float(close.iloc[-1])
+        last = history.iloc[-1]
+        self.time = history.index[-1]
+        self.bar = {column: float(last[column]) for column in ["High", "Low", "Close", "Volume"]}
+
+    def update(self, time, bar):
+        # bar: dict with High, Low, Close and Volume. A bar with the latest
+        # bar's time replaces it; a newer one commits the latest first.
+        if self.time is not None and time != self.time:
+            self.commit()
+        self.time = time
+        self.bar = {column: float(bar[column]) for column in ["High", "Low", "Close", "Volume"]}
+        return self.values()
+
+    def inputs(self):
+        high, low, close, volume = (self.bar[column] for column in ["High", "Low", "Close", "Volume"])
+        change = close - self.previous_close
+        if math.isnan(self.previous_close):
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self.previous_close), abs(low - self.previous_close))
+        return {
+            "close": close,
+            "gain": max(change, 0.0) if not math.isnan(change) else math.nan,
+            "loss": max(-change, 0.0) if not math.isnan(change) else math.nan,
+            "tr": tr,
+            "weighted": (high + low + close) / 3 * volume,
+            "volume": volume,
+        }
+
+    def macd_line(self, close):
+        if self.slow.count + 1 < self.slow.min_periods:
+            return math.nan
+        return self.fast.raw(close) - self.slow.raw(close)
+
+    def commit(self):
+        x = self.inputs()
+        line = self.macd_line(x["close"])
+        self.sma.commit(x["close"])
+        self.ema.commit(x["close"])
+        self.gain.commit(x["gain"])
+        self.loss.commit(x["loss"])
+        self.fast.commit(x["close"])
+        self.slow.commit(x["close"])
+        self.signal.commit(line)
+        self.bollinger.commit(x["close"])
+        self.atr.commit(x["tr"])
+        self.weighted.commit(x["weighted"])
+        self.volume.commit(x["volume"])
+        self.previous_close = x["close"]
+
+    def values(self):
+        # Indicator values at the latest bar, keyed like compute()'s columns
+        x = self.inputs()
+        close = x["close"]
+        result = dict.fromkeys(COLUMNS, math.nan)
+
+        window = self.sma.peek(close)
+        if window is not None:
+            result["sma"] = window[0] / self.sma.size
+        result["ema"] = self.ema.peek(close)
+
+        gain, loss = self.gain.peek(x["gain"]), self.loss.peek(x["loss"])
+        if not (math.isnan(gain) or math.isnan(loss)):
+            result["rsi"] = 100 - 100 / (1 + gain / loss) if loss else (100.0 if gain else math.nan)
+
+        line = self.macd_line(close)
+        result["macd"] = line
+        result["macdSignal"] = self.signal.peek(line)
+        result["macdHist"] = line - result["macdSignal"]
+
+        window = self.bollinger.peek(close)
+        if window is not None:
+            period, width = self.settings["bollinger"]
+            mean = window[0] / period
+            deviation = math.sqrt(max(window[1] / period - mean * mean, 0.0))
+            result.update(bollingerMid=mean, bollingerUpper=mean + width * deviation, bollingerLower=mean - width * deviation)
+
+        result["atr"] = self.atr.peek(x["tr"])
+        weighted, volume = self.weighted.peek(x["weighted"]), self.volume.peek(x["volume"])
+        if weighted is not None and volume is not None and volume[0]:
+            result["vwap"] = weighted[0] / volume[0]
+        return result
+
+
+class IndicatorCache:
+    # Indicator frames per ticker and interval, shared by every session.
+    # When the history under a frame grows (or its last, partial bar is
+    # revised), only the new bars go through IndicatorState; anything else
+    # is recomputed in full.
+    def __init__(self, settings=SETTINGS, max_states=MAX_STATES):
+        self.settings = settings
+        self.max_states = max_states
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def indicators(self, key, history):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or not self.extends(entry[0], history):
+                frame = compute(history, self.settings)
+                state = IndicatorState(history, self.settings)
+            else:
+                frame, state = self.extend(entry, history)
+            self.entries[key] = (history, frame, state)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_states:
+                self.entries.popitem(last=False)
+            return frame
+
+    def extends(self, old, new):
+        # New history keeps every old bar but the last one unchanged
+        if old is new:
+            return True
+        if old.empty or len(new) < len(old):
+            return False
+        kept = len(old) - 1
+        old_index, new_index = old.index.asi8, new.index.asi8
+        return (np.array_equal(old_index, new_index[:len(old)])
+                and np.array_equal(old["Close"].to_numpy()[:kept], new["Close"].to_numpy()[:kept]))
+
+    def extend(self, entry, history):
+        old, frame, state = entry
+        if old is history:
+            return frame, state
+        start = len(old) - 1
+        rows = [state.update(time, bar) for time, bar in zip(history.index[start:], history.iloc[start:].to_dict("records"))]
+        fresh = pd.DataFrame(rows, index=history.index[start:], columns=COLUMNS)
+        return pd.concat([frame.iloc[:start], fresh]), state
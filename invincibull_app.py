@@ -1,36 +1,285 @@
+import os
 import streamlit as st
 import streamlit.components.v1 as components
-import yfinance as yf
-from datetime import datetime
-from datetime import timedelta
-import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
-from textblob import TextBlob
-import plotly.express as px
-from urllib.request import Request, urlopen
-from bs4 import BeautifulSoup
-import requests
-import matplotlib.pyplot as plt
-import matplotlib.style as style
+from concurrent.futures import ThreadPoolExecutor
+# Heavier libraries (pandas, plotly, yfinance, ...) are imported inside the
+# pages that use them, so a cold start or a Futures rerun never loads them
+from market_data import (
+    load_quote,
+    load_profile,
+    load_news,
+    load_news_sentiment,
+    load_holders,
+    load_recommendations,
+    load_sec_filings,
+    edgar_client,
+    load_option_chain,
+    load_iv_surface,
+    load_history,
+    load_screen,
+    load_shares,
+    load_symbol_directory,
+    fetch_concurrently,
+    load_news_page,
+    load_sentiment_returns,
+    load_backtest,
+    load_indicators,
+    load_chart,
+    load_futures,
+    load_chain_table,
+    record_view,
+)
+from symbols import normalize_symbol, non_sec_symbol
+from metrics import span, snapshot, to_json, to_prometheus, serve_from_env
 
 st.set_page_config(layout="wide", page_title="InvinciBull")
+# Prometheus/JSON scrape endpoint when METRICS_PORT is set
+serve_from_env()
 st.title("InvinciBull")
-tickerSymbol = st.text_input("Enter the stock symbol here...", value="AAPL", label_visibility="visible", placeholder="AAPL", max_chars=5).upper()
-st.session_state.tickerSymbol = tickerSymbol
-tickerData = yf.Ticker(tickerSymbol)
-main_info = tickerData.fast_info
-comp_info = tickerData.info
-news = tickerData.news
+
+# The ticker box takes a symbol (BRK-B, BRK.B) or a company name. Input is
+# checked against the local symbol directory: listed symbols are taken in
+# SEC's spelling, and symbols of a kind the SEC list never has (^GSPC,
+# BTC-USD, EURUSD=X, RY.TO) are tried as typed. Anything else, typos
+# included, only produces suggestions and never a network call; the pages
+# keep the last symbol. Without the directory, input is passed through.
+def pick_ticker(symbol):
+    st.session_state.tickerQuery = symbol
+
+
+def show_suggestions(suggestions):
+    for col, listing in zip(st.columns(max(len(suggestions), 1)), suggestions):
+        col.button(listing["ticker"], help=listing["name"], key=f"suggest_{listing['ticker']}", on_click=pick_ticker, args=(listing["ticker"],))
+
+
+st.session_state.setdefault("tickerQuery", "AAPL")
+st.session_state.setdefault("tickerSymbol", "AAPL")
+query = st.text_input("Enter the stock symbol or company name here...", key="tickerQuery", label_visibility="visible", placeholder="AAPL or Apple", max_chars=40)
+symbol = normalize_symbol(query)
+directory = load_symbol_directory()
+listing = directory.lookup(symbol) if symbol and directory is not None else None
+if listing is not None:
+    st.session_state.tickerSymbol = listing["ticker"]
+    st.caption(f"{listing['name']} · {listing['exchange']}" if listing["exchange"] else listing["name"])
+elif symbol and (directory is None or non_sec_symbol(symbol)):
+    st.session_state.tickerSymbol = symbol
+    if directory is not None:
+        st.caption(f"{symbol} is not a US listing, so it is loaded unverified.")
+elif symbol:
+    suggestions = directory.suggest(query)
+    st.warning(f"No listed symbol matches '{query}'. Still showing {st.session_state.tickerSymbol}." + (" Did you mean:" if suggestions else ""))
+    show_suggestions(suggestions)
+tickerSymbol = st.session_state.tickerSymbol
+
+# Streams LLM summaries into one placeholder per document as tokens arrive
+def render_summaries(labels, documents, prompt):
+    from summarize import stream_summaries
+
+    placeholders = []
+    for label in labels:
+        st.markdown(f"**{label}**")
+        placeholders.append(st.empty())
+
+    texts = [""] * len(documents)
+    for index, text in stream_summaries(documents, prompt):
+        texts[index] += text
+        placeholders[index].markdown(texts[index])
+
+
+# Analyst recommendation categories and their bar colors
+RATING_CATEGORIES = [
+    ('strongBuy', 'Strong Buy', 'green'),
+    ('buy', 'Buy', 'lightgreen'),
+    ('hold', 'Hold', 'yellow'),
+    ('sell', 'Sell', 'orange'),
+    ('strongSell', 'Strong Sell', 'red'),
+]
+
+
+# Grouped bars of analyst recommendations. The recommendations frame is
+# hashed as the cache key, so unchanged ratings reuse the built figure.
+@st.cache_data(max_entries=256, show_spinner=False)
+def ratings_figure(ratings):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(data=[
+        go.Bar(x=ratings['period'], y=ratings[column], name=label, marker_color=color)
+        for column, label, color in RATING_CATEGORIES
+    ])
+    fig.update_layout(
+        barmode='group',
+        template='plotly_dark',
+        title='Analyst Recommendations',
+        xaxis_title='Time Period',
+        yaxis_title='Number of Recommendations'
+    )
+    return fig
+
+
+# Shown in place of a Home page section whose data did not arrive
+def unavailable(errors, name, label):
+    if isinstance(errors.get(name), TimeoutError):
+        st.write(f"{label} did not load in time and will show after a refresh.")
+    else:
+        st.write(f"{label} could not be loaded right now.")
+
+
+# Indicator lines drawn over the price, and the panels that can go below it
+OVERLAYS = {
+    "SMA (50)": [("sma", "orange")],
+    "EMA (20)": [("ema", "deepskyblue")],
+    "Bollinger (20, 2)": [("bollingerUpper", "gray"), ("bollingerMid", "lightgray"), ("bollingerLower", "gray")],
+    "VWAP (20)": [("vwap", "violet")],
+}
+PANELS = ["RSI (14)", "MACD (12, 26, 9)", "ATR (14)"]
+
+
+# Native price chart with the indicators computed from the stored history.
+# Like the ratings figure, it is rebuilt only when the frame or the chosen
+# lines change.
+@st.cache_data(max_entries=64, show_spinner=False)
+def indicator_chart(frame, tickerSymbol, overlays, panels):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(rows=1 + len(panels), cols=1, shared_xaxes=True, vertical_spacing=0.03,
+                        row_heights=[3] + [1] * len(panels))
+    fig.add_trace(go.Candlestick(x=frame.index, open=frame['Open'], high=frame['High'], low=frame['Low'],
+                                 close=frame['Close'], name=tickerSymbol), row=1, col=1)
+    for overlay in overlays:
+        for column, color in OVERLAYS[overlay]:
+            fig.add_trace(go.Scatter(x=frame.index, y=frame[column], mode='lines', line=dict(color=color, width=1), name=column), row=1, col=1)
+
+    for row, panel in enumerate(panels, start=2):
+        if panel.startswith("RSI"):
+            fig.add_trace(go.Scatter(x=frame.index, y=frame['rsi'], mode='lines', line=dict(color='gold', width=1), name='rsi'), row=row, col=1)
+            for level in (30, 70):
+                fig.add_hline(y=level, line_dash='dot', line_color='gray', row=row, col=1)
+        elif panel.startswith("MACD"):
+            fig.add_trace(go.Bar(x=frame.index, y=frame['macdHist'], name='macdHist',
+                                 marker_color=['green' if value >= 0 else 'red' for value in frame['macdHist'].fillna(0)]), row=row, col=1)
+            fig.add_trace(go.Scatter(x=frame.index, y=frame['macd'], mode='lines', line=dict(color='deepskyblue', width=1), name='macd'), row=row, col=1)
+            fig.add_trace(go.Scatter(x=frame.index, y=frame['macdSignal'], mode='lines', line=dict(color='orange', width=1), name='macdSignal'), row=row, col=1)
+        else:
+            fig.add_trace(go.Scatter(x=frame.index, y=frame['atr'], mode='lines', line=dict(color='violet', width=1), name='atr'), row=row, col=1)
+        fig.update_yaxes(title_text=panel.split(" (")[0], row=row, col=1)
+
+    fig.update_layout(template='plotly_dark', height=420 + 160 * len(panels), showlegend=False,
+                      xaxis_rangeslider_visible=False, margin=dict(t=30, b=30))
+    return fig
+
+
+# Bar sizes the intraday chart offers
+INTRADAY_INTERVALS = ["1m", "2m", "5m", "15m", "30m", "60m"]
+
+
+# Price chart for a downsampled view: a WebGL line, or (bucketed) candles.
+# Dragging across it selects a range to zoom into.
+@st.cache_data(max_entries=64, show_spinner=False)
+def price_chart(view, tickerSymbol, candles):
+    import plotly.graph_objects as go
+
+    if candles:
+        trace = go.Candlestick(x=view.index, open=view['Open'], high=view['High'], low=view['Low'], close=view['Close'], name=tickerSymbol)
+    else:
+        trace = go.Scattergl(x=view.index, y=view, mode='lines', line=dict(width=1), name=tickerSymbol)
+    fig = go.Figure(data=trace)
+    fig.update_layout(template='plotly_dark', height=560, dragmode='select', selectdirection='h',
+                      xaxis_rangeslider_visible=False, margin=dict(t=30, b=30))
+    return fig
+
+
+# A box dragged across the chart becomes the visible range
+def zoom_to_selection(chart_key, range_key, bounds):
+    import pandas as pd
+
+    boxes = st.session_state[chart_key].selection.box
+    if not boxes:
+        return
+    times = [(pd.Timestamp(x, unit="ms") if isinstance(x, (int, float)) else pd.Timestamp(x)).floor("min") for x in boxes[0]["x"]]
+    start, end = max(min(times), bounds[0]), min(max(times), bounds[1])
+    if start < end:
+        st.session_state[range_key] = (start.to_pydatetime(), end.to_pydatetime())
+
+
+def reset_zoom(range_key):
+    st.session_state.pop(range_key, None)
+
+
+# Intraday history, however long, drawn from a few thousand points. Only the
+# visible range is cut from the full-resolution history and downsampled, so
+# zooming in (with the slider or by dragging across the chart) brings back
+# finer bars from the cache without another download.
+def intraday_chart(tickerSymbol):
+    from datetime import timedelta
+
+    col1, col2 = st.columns(2)
+    interval = col1.selectbox("Bar size", INTRADAY_INTERVALS, index=2)
+    candles = col2.radio("Style", ["Line", "Candles"], horizontal=True) == "Candles"
+
+    range_key = f"intraday_range_{tickerSymbol}_{interval}"
+    start, end = st.session_state.get(range_key, (None, None))
+    try:
+        view, bars, bounds = load_chart(tickerSymbol, interval, start, end, candles)
+    except Exception:
+        view, bounds = None, None
+    if bounds is None:
+        st.write("Intraday history could not be loaded right now.")
+        return
+
+    first, last = (bound.to_pydatetime() for bound in bounds)
+    if first == last:
+        st.write("Not enough intraday history to chart yet.")
+        return
+    if range_key in st.session_state and not first <= st.session_state[range_key][0] < st.session_state[range_key][1] <= last:
+        reset_zoom(range_key)
+    st.slider("Visible range", min_value=first, max_value=last, value=None if range_key in st.session_state else (first, last),
+              step=timedelta(minutes=1), format="YYYY-MM-DD HH:mm", key=range_key)
+
+    chart_key = f"intraday_chart_{tickerSymbol}_{interval}"
+    st.plotly_chart(price_chart(view, tickerSymbol, candles), key=chart_key, on_select=lambda: zoom_to_selection(chart_key, range_key, bounds),
+                    selection_mode="box")
+    col1, col2 = st.columns([4, 1])
+    col1.caption(f"{bars:,} {interval} bars in range, drawn as {len(view):,} {'candles' if candles else 'points'}. Drag across the chart to zoom in.")
+    col2.button("Reset zoom", on_click=reset_zoom, args=(range_key,), disabled=range_key not in st.session_state)
+
 
 # Home
+# Per-source wait limits (seconds); SEC is rate limited and can be slower
+HOME_TIMEOUTS = {"filings": 10}
+
+
+@span("page.home")
 def home_page():
+    import pandas as pd
+    import requests
+    from performance import PERFORMANCE_WINDOWS, get_price_percentages
+    from news_archive import PAGE_SIZE as NEWS_PAGE_SIZE
+    from summarize import NEWS_PROMPT, FILING_PROMPT
+
+    record_view("home", tickerSymbol)
+
+    # Every source the page shows is requested at once, so the page waits for
+    # the slowest one instead of all of them in turn. Each is cached per
+    # ticker, so other pages never pay for these.
+    results, errors = fetch_concurrently({
+        "profile": (load_profile, tickerSymbol),
+        "quote": (load_quote, tickerSymbol),
+        "history": (load_history, tickerSymbol),
+        "holders": (load_holders, tickerSymbol),
+        "filings": (load_sec_filings, tickerSymbol),
+        "news": (load_news, tickerSymbol),
+        "ratings": (load_recommendations, tickerSymbol),
+    }, HOME_TIMEOUTS)
+    comp_info = results.get("profile") or {}
+    main_info = results.get("quote")
+
     col1, col2, col3 = st.columns(3)
 
     # Column containing company name, hq, website, and employee count
     with col1:
+        if "profile" in errors:
+            unavailable(errors, "profile", "The company profile")
         company_name = comp_info.get("shortName")
         st.subheader(company_name)
         # HQ & WEBSITE
@@ -57,32 +306,36 @@ def home_page():
 
     # Column containing price, shares, market cap, and enterprise value
     with col2:
+        if main_info is None:
+            unavailable(errors, "quote", "The quote")
+        else:
+            # Format price as $ with 2 decimals
+            price = main_info["last_price"]
+            st.write("Price:", f"${price:,.2f}")
 
-        # Format price as $ with 2 decimals
-        price = main_info.last_price
-        st.write("Price:", f"${price:,.2f}")
+            # Format shares in millions or billions
+            shares = main_info["shares"]
+            if shares >= 1_000_000_000:  # Billions
+                st.write("Shares Out:", f"{shares / 1_000_000_000:.1f}B")
+            elif shares >= 1_000_000:  # Millions
+                st.write("Shares Out:", f"{shares / 1_000_000:.1f}M")
+            else:  # Less than a million
+                st.write("Shares Out:", f"{shares:,}")
 
-        # Format shares in millions or billions
-        shares = main_info.shares
-        if shares >= 1_000_000_000:  # Billions
-            st.write("Shares Out:", f"{shares / 1_000_000_000:.1f}B")
-        elif shares >= 1_000_000:  # Millions
-            st.write("Shares Out:", f"{shares / 1_000_000:.1f}M")
-        else:  # Less than a million
-            st.write("Shares Out:", f"{shares:,}")
-
-        # Format market cap in $ with millions or billions
-        market_cap = main_info.market_cap
-        if market_cap >= 1_000_000_000:  # Billions
-            st.write("Market Cap:", f"${market_cap / 1_000_000_000:.1f}B")
-        elif market_cap >= 1_000_000:  # Millions
-            st.write("Market Cap:", f"${market_cap / 1_000_000:.1f}M")
-        else:  # Less than a million
-            st.write("Market Cap:", f"${market_cap:,}")
+            # Format market cap in $ with millions or billions
+            market_cap = main_info["market_cap"]
+            if market_cap >= 1_000_000_000:  # Billions
+                st.write("Market Cap:", f"${market_cap / 1_000_000_000:.1f}B")
+            elif market_cap >= 1_000_000:  # Millions
+                st.write("Market Cap:", f"${market_cap / 1_000_000:.1f}M")
+            else:  # Less than a million
+                st.write("Market Cap:", f"${market_cap:,}")
 
         # Format EnterpriseValue in $ with millions or billions
         EV = comp_info.get("enterpriseValue")
-        if EV >= 1_000_000_000:  # Billions
+        if EV is None:
+            st.write("Enterprise Value: Not available")
+        elif EV >= 1_000_000_000:  # Billions
             st.write("Enterprise Value:", f"${EV / 1_000_000_000:.1f}B")
         elif EV >= 1_000_000:  # Millions
             st.write("Enterprise Value:", f"${EV / 1_000_000:.1f}M")
@@ -91,56 +344,12 @@ def home_page():
 
     # Column containing performance
     with col3:
-        def get_price_percentages(tickerData):
-            # Get today's date
-            today = datetime.now().date()
-            # Define the start of the year
-            start_of_year = datetime(today.year, 1, 1).date()
-            
-            # Define dates for 1 month, 6 months, and 1 year ago
-            three_months_ago = today - timedelta(days=90)
-            six_months_ago = today - timedelta(days=180)
-            one_year_ago = today - timedelta(days=365)
-            
-            # Fetch historical data for the required periods
-            data_3mo = tickerData.history(start=three_months_ago, end=today)
-            data_6mo = tickerData.history(start=six_months_ago, end=today)
-            data_ytd = tickerData.history(start=start_of_year, end=today)
-            data_1yr = tickerData.history(start=one_year_ago, end=today)
-            
-            # Current price
-            current_price = tickerData.history(period="1d")['Close'].iloc[0] if not tickerData.history(period="1d").empty else None
-            
-            # Calculate percentage changes
-            performances = {}
-            
-            if current_price is not None:
-                if not data_3mo.empty:
-                    performances["3mo"] = ((current_price - data_3mo['Close'].iloc[0]) / data_3mo['Close'].iloc[0]) * 100
-                else:
-                    performances["3mo"] = None
-                
-                if not data_6mo.empty:
-                    performances["6mo"] = ((current_price - data_6mo['Close'].iloc[0]) / data_6mo['Close'].iloc[0]) * 100
-                else:
-                    performances["6mo"] = None
-                
-                if not data_1yr.empty:
-                    performances["1yr"] = ((current_price - data_1yr['Close'].iloc[0]) / data_1yr['Close'].iloc[0]) * 100
-                else:
-                    performances["1yr"] = None
-                
-                # YTD performance
-                if not data_ytd.empty:
-                    performances["ytd"] = ((current_price - data_ytd['Close'].iloc[0]) / data_ytd['Close'].iloc[0]) * 100
-                else:
-                    performances["ytd"] = None
-            else:
-                performances = {"3mo": None, "6mo": None, "YTD": None, "1yr": None}
-            
-            return performances
-
-        percentages = get_price_percentages(tickerData)
+        # All windows are sliced from one cached 1y daily history
+        if "history" in results:
+            percentages = get_price_percentages(results["history"])
+        else:
+            unavailable(errors, "history", "Price history")
+            percentages = dict.fromkeys(PERFORMANCE_WINDOWS)
         st.write(f"3mo: {'{:.2f}%'.format(percentages['3mo']) if percentages['3mo'] is not None else 'Not available'}")
         st.write(f"6mo: {'{:.2f}%'.format(percentages['6mo']) if percentages['6mo'] is not None else 'Not available'}")
         st.write(f"YTD: {'{:.2f}%'.format(percentages['ytd']) if percentages['ytd'] is not None else 'Not available'}")
@@ -171,8 +380,25 @@ def home_page():
         </div>
         <!-- TradingView Widget END -->
         """
-    # Render the TradingView widget
-    st.components.v1.html(tradingview_widget, width=1000, height=620)
+    # The TradingView embed, a native chart of the stored history with
+    # indicators computed here, or the downsampled intraday chart
+    chart = st.radio("Chart", ["TradingView", "Indicators", "Intraday"], horizontal=True)
+    if chart == "TradingView":
+        st.components.v1.html(tradingview_widget, width=1000, height=620)
+    elif chart == "Intraday":
+        intraday_chart(tickerSymbol)
+    else:
+        col1, col2 = st.columns(2)
+        overlays = col1.multiselect("Overlays", list(OVERLAYS), default=["SMA (50)", "Bollinger (20, 2)"])
+        panels = col2.multiselect("Panels", PANELS, default=PANELS[:2])
+        try:
+            frame = load_indicators(tickerSymbol)
+        except Exception:
+            frame = None
+        if frame is None or frame.empty:
+            st.write("Price history could not be loaded right now.")
+        else:
+            st.plotly_chart(indicator_chart(frame, tickerSymbol, overlays, panels))
 
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "About",
@@ -202,168 +428,224 @@ def home_page():
     
     # Holders
     with tab2:
-        holders = tickerData.major_holders
+        holders = results.get("holders")
         # Plot the holders in a bar chart, but remove institutionsCount and make the y-axis a percentage value
-        if not holders.empty:
+        if holders is None:
+            unavailable(errors, "holders", "Holders information")
+        elif not holders.empty:
             st.bar_chart(holders.drop("institutionsCount", axis=0))
         else:
             st.write("No holders information available.")
 
     # SEC Filings
     with tab3:
-        def get_sec_filings(tickerSymbol):
-            # Construct the SEC URL for the ticker symbol
-            sec_url = f"https://www.sec.gov/cgi-bin/browse-edgar?action=getcompany&CIK={tickerSymbol}&type=&dateb=&owner=include&start=0&count=40"
-            headers = {'User-Agent': 'YourName (your.email@example.com)'}
-    
-            # Fetch the webpage
-            response = requests.get(sec_url, headers=headers)
-            soup = BeautifulSoup(response.content, 'html.parser')
-    
-            # Find the filings table
-            table = soup.find('table', {'class': 'tableFile2'})
-            rows = table.find_all('tr')
-    
-            # Extract data from the table rows
-            filings_data = []
-            for row in rows[1:]:  # Skip header row
-                cols = row.find_all('td')
-                if len(cols) > 3:
-                    filing_type = cols[0].text.strip()
-                    description = cols[2].text.strip()
-                    filing_date = cols[3].text.strip()
-                    document_link = "https://www.sec.gov" + cols[1].find('a')['href']
-    
-                    filings_data.append({
-                        'Filing Type': f'<a href="{document_link}" target="_blank">{filing_type}</a>',
-                        'Description': description,
-                        'Date': filing_date
-                    })
-    
-            return filings_data
-    
         if tickerSymbol:
-            # Get SEC filings
-            filings = get_sec_filings(tickerSymbol)
-    
-            # Convert to DataFrame
-            df = pd.DataFrame(filings)
-    
-            # Display the DataFrame as a table with hyperlinks in Filing Type column
-            st.write("Most Recent SEC Filings:")
-            st.write(df.to_html(escape=False, index=False), unsafe_allow_html=True)
+            filings = results.get("filings")
+
+            if filings:
+                df = pd.DataFrame({
+                    'Filing Type': [f'<a href="{f["url"]}" target="_blank">{f["form"]}</a>' for f in filings],
+                    'Description': [f["description"] for f in filings],
+                    'Date': [f["date"] for f in filings],
+                })
+
+                # Display the DataFrame as a table with hyperlinks in Filing Type column
+                st.write("Most Recent SEC Filings:")
+                st.write(df.to_html(escape=False, index=False), unsafe_allow_html=True)
 
-    # News
+                # Summarize up to five filings with the local Ollama model
+                choices = {f'{i + 1}. {f["form"]} ({f["date"]})': f["url"] for i, f in enumerate(filings)}
+                selected = st.multiselect("Filings to summarize", list(choices), max_selections=5)
+                if selected and st.button("Summarize selected filings"):
+                    try:
+                        with ThreadPoolExecutor(max_workers=len(selected)) as pool:
+                            documents = list(pool.map(edgar_client().document_text, [choices[label] for label in selected]))
+                    except requests.RequestException:
+                        st.write("Could not download the selected filings.")
+                    else:
+                        render_summaries(selected, documents, FILING_PROMPT.format(ticker=tickerSymbol))
+            elif filings is None:
+                unavailable(errors, "filings", "SEC filings")
+            else:
+                st.write("No SEC filings found for this symbol.")
+
+    # News, read from the local archive every fetch appends to, so months of
+    # headlines can be paged and searched without touching the network
     with tab4:
-        news = tickerData.news
-        
-        if news:
-            for article in news:
-                # Extract the required fields
-                # Assuming 'content' is the correct key for the nested dictionary
-                content = article.get('content', {})
-                
-                title = content.get('title', 'No title available')
-                summary = content.get('summary', 'No summary available')
-                pub_date = content.get('pubDate', 'No publication date available')
-                clickthrough_url = content.get('clickThroughUrl', 'URL not available')
-                
-                # Convert the publication date to a more readable format if it exists
-                if pub_date != 'No publication date available':
-                    pub_date_readable = datetime.strptime(pub_date, '%Y-%m-%dT%H:%M:%SZ').strftime('%Y-%m-%d %H:%M:%S')
-                else:
-                    pub_date_readable = pub_date
-                
+        if "news" in errors:
+            unavailable(errors, "news", "The latest news")
+
+        query = st.text_input("Search archived headlines", key=f"news_query_{tickerSymbol}", placeholder="earnings, lawsuit, guidance...")
+        # A new search starts again from its first page
+        page_key = f"news_page_{tickerSymbol}_{query}"
+        page = st.session_state.get(page_key, 1)
+        articles, total = load_news_page(tickerSymbol, query, page)
+
+        if articles:
+            # Summarize the articles on this page with the local Ollama model
+            if st.button("Summarize articles"):
+                render_summaries(
+                    [article['title'] or 'Untitled article' for article in articles],
+                    [f"{article['title'] or ''}\n\n{article['summary'] or ''}" for article in articles],
+                    NEWS_PROMPT.format(ticker=tickerSymbol),
+                )
+                st.write("---")
+
+            for article in articles:
+                published = article['published']
+                pub_date_readable = published.strftime('%Y-%m-%d %H:%M:%S') if published else 'No publication date available'
+                url = article['url'] or 'URL not available'
+
                 # Display the cleaned data in Streamlit
-                st.write(f"**Title:** {title}")
-                st.write(f"**Summary:** {summary}")
+                st.write(f"**Title:** {article['title']}")
+                st.write(f"**Summary:** {article['summary'] or 'No summary available'}")
                 st.write(f"**Date Published:** {pub_date_readable}")
-                st.write(f"**Clickthrough URL:** [{clickthrough_url}]({clickthrough_url})")
+                st.write(f"**Clickthrough URL:** [{url}]({url})")
                 st.write("---")  # Adds a separator between articles
+
+            pages = -(-total // NEWS_PAGE_SIZE)
+            st.caption(f"{total} archived articles" + (f" matching '{query}'" if query else "") + f" · page {page} of {pages}")
+            if pages > 1:
+                st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+        elif query:
+            st.write(f"No archived articles match '{query}'.")
         else:
             st.write("No news articles found.")
 
     # Ratings
     with tab5:
-        ratings = tickerData.recommendations
-        # Create a bar chart
+        ratings = results.get("ratings")
+
+        if ratings is not None and not ratings.empty:
+            st.plotly_chart(ratings_figure(ratings))
+        elif "ratings" in errors:
+            unavailable(errors, "ratings", "Analyst ratings")
+        else:
+            st.write("No analyst ratings available.")
 
-        # Set dark theme for matplotlib
-        style.use('dark_background')
-        fig, ax = plt.subplots(figsize=(10, 6), facecolor='none')
 
-        # Number of periods
-        num_periods = len(ratings)
+# Orderings the chain browser offers, largest first; None keeps the chain's
+# expiry, type and strike order
+GRID_SORTS = {"Expiry & strike": None, "Volume": "volume", "Open interest": "openInterest", "Implied volatility": "iv"}
+# Moneyness slider bounds
+MONEYNESS_RANGE = (0.5, 1.5)
 
-        # Width of each bar
-        bar_width = 0.15
 
-        # Positions of the bars on the x-axis
-        r1 = range(num_periods)
-        r2 = [x + bar_width for x in r1]
-        r3 = [x + 2*bar_width for x in r1]
-        r4 = [x + 3*bar_width for x in r1]
-        r5 = [x + 4*bar_width for x in r1]
+# A range slider's value as (low, high) filter bounds: the low handle at the
+# slider's minimum or the high one at its maximum means no bound. Each handle
+# is only compared with its own end, so (max, max) still filters.
+def unbounded(selected, limits):
+    low, high = selected
+    return (None if low <= limits[0] else low, None if high >= limits[1] else high)
 
-        # Plotting each category
-        ax.bar(r1, ratings['strongBuy'], color='green', width=bar_width, label='Strong Buy')
-        ax.bar(r2, ratings['buy'], color='lightgreen', width=bar_width, label='Buy')
-        ax.bar(r3, ratings['hold'], color='yellow', width=bar_width, label='Hold')
-        ax.bar(r4, ratings['sell'], color='orange', width=bar_width, label='Sell')
-        ax.bar(r5, ratings['strongSell'], color='red', width=bar_width, label='Strong Sell')
 
-        # Customizing the plot
-        ax.set_ylabel('Number of Recommendations')
-        ax.set_xlabel('Time Period')
-        ax.set_title('Analyst Recommendations')
-        ax.set_xticks([r + bar_width*2 for r in range(num_periods)])
-        ax.set_xticklabels(ratings['period'])
-        ax.legend()
+# Chain browser over an Arrow copy of the whole chain. Filters run on the
+# table's columns and only the page of rows on screen is converted and sent
+# to the browser, so even the widest chains stay quick.
+def options_grid(tickerSymbol, chain, exp_dates):
+    from options_chain import PAGE_SIZE, matching_rows, table_page
 
-        # Display the plot in Streamlit
-        st.pyplot(fig)
+    table = load_chain_table(tickerSymbol, chain.attrs.get("snapshot"), chain)
+    strikes = chain.index.get_level_values("strike")
+    low_strike, high_strike = float(strikes.min()), float(strikes.max())
+    spot = chain.attrs.get("underlying_price")
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    expiries = col1.multiselect("Expirations", exp_dates, default=exp_dates[:1])
+    types = col2.multiselect("Type", ["call", "put"], default=["call", "put"])
+    sort = col3.selectbox("Sort by", list(GRID_SORTS))
+    col1, col2, col3, col4 = st.columns(4)
+    strike_range = col1.slider("Strike", min_value=low_strike, max_value=high_strike, value=(low_strike, high_strike))
+    moneyness_range = col2.slider("Moneyness (K/S)", *MONEYNESS_RANGE, value=MONEYNESS_RANGE, step=0.05, disabled=not spot)
+    min_volume = col3.number_input("Min volume", min_value=0, value=0, step=10)
+    min_open_interest = col4.number_input("Min open interest", min_value=0, value=0, step=10)
+
+    strikes = unbounded(strike_range, (low_strike, high_strike))
+    moneyness = unbounded(moneyness_range, MONEYNESS_RANGE) if spot else None
+    filters = (tuple(expiries), tuple(types), strikes, moneyness, min_volume, min_open_interest, GRID_SORTS[sort])
+    rows = matching_rows(table, *filters)
+
+    if not len(rows):
+        st.write("No contracts match these filters.")
+        return
+    pages = -(-len(rows) // PAGE_SIZE)
+    # Changing any filter starts again from the first page, as does a
+    # refreshed chain with fewer pages than the one being read
+    page_key = f"options_page_{tickerSymbol}_{hash(filters)}"
+    if st.session_state.get(page_key, 1) > pages:
+        del st.session_state[page_key]
+    page = st.session_state.get(page_key, 1)
+    st.dataframe(table_page(table, rows, page), hide_index=True, column_config={
+        "moneyness": st.column_config.NumberColumn("K/S", format="%.3f"),
+        "percentChange": st.column_config.NumberColumn("% change", format="%.2f%%"),
+        "impliedVolatility": st.column_config.NumberColumn("IV (Yahoo)", format="%.4f"),
+        "iv": st.column_config.NumberColumn("IV (mid)", format="%.4f"),
+        "lastTradeDate": st.column_config.DatetimeColumn("Last trade"),
+    })
+    st.caption(f"{len(rows):,} of {table.num_rows:,} contracts · page {page} of {pages}")
+    if pages > 1:
+        st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
 
 
 # Options
+@span("page.options")
 def options_page():
+    import pandas as pd
+    import plotly.graph_objects as go
+    import plotly.express as px
+    from options_chain import chain_expiries, split_chain
+    from iv_surface import downsample_rows
+
     tickerSymbol = st.session_state.tickerSymbol
     if tickerSymbol:
-        tickerData = yf.Ticker(tickerSymbol)
-        options = tickerData.option_chain()
-        
-        if options.calls is not None and options.puts is not None:
+        record_view("options", tickerSymbol)
+        # Every expiry is loaded once, in parallel, and shared by both views
+        chain = load_option_chain(tickerSymbol)
+        exp_dates = chain_expiries(chain)
+
+        if exp_dates:
             st.write(f"Options for {tickerSymbol}")
             
             # Option to switch between DataFrame view and visualizations
             view_type = st.radio("Choose View Type", ["DataFrames", "Visualizations"])
             
             if view_type == "DataFrames":
-                st.dataframe(options.calls)
-                st.dataframe(options.puts)
+                # Nearest expiry first, as yfinance's default option_chain() returns
+                options_grid(tickerSymbol, chain, exp_dates)
             else:
-                # Fetch all expiration dates
-                exp_dates = tickerData.options
                 exp_date = st.selectbox("Select Expiration Date", exp_dates)
                 
-                # Fetch options data for the selected expiration date
-                calls, puts = fetch_options_data(tickerSymbol, exp_date)
+                # Options data for the selected expiration date, thinned out
+                # for very wide chains so the charts stay responsive
+                calls, puts = split_chain(chain, exp_date)
+                calls, puts = downsample_rows(calls), downsample_rows(puts)
                 
-                # Heatmap for Implied Volatility
-                st.subheader("Implied Volatility Heatmap")
-                fig_iv = go.Figure(data=go.Heatmap(
-                    z=calls['impliedVolatility'],
-                    x=calls['strike'],
-                    y=['Call Options'],
-                    colorscale='Viridis',
-                    colorbar=dict(title='Implied Volatility')
-                ))
-                fig_iv.update_layout(title=f'Implied Volatility for {tickerSymbol} - {exp_date}', xaxis_title='Strike Price', yaxis_title='Option Type')
-                st.plotly_chart(fig_iv)
+                # Implied volatility surface across every expiry, on a fixed moneyness grid
+                st.subheader("Implied Volatility Surface")
+                surface = load_iv_surface(tickerSymbol, chain.attrs.get("snapshot"), chain)
+                if surface["expiries"]:
+                    fig_iv = go.Figure(data=go.Surface(
+                        z=surface["iv"],
+                        x=surface["moneyness"],
+                        y=surface["days"],
+                        customdata=[[expiry] * len(surface["moneyness"]) for expiry in surface["expiries"]],
+                        hovertemplate='K/S %{x:.2f}<br>Expiry %{customdata}<br>IV %{z:.1%}<extra></extra>',
+                        colorscale='Viridis',
+                        colorbar=dict(title='Implied Volatility')
+                    ))
+                    fig_iv.update_layout(title=f'Implied Volatility Surface for {tickerSymbol}', height=600, scene=dict(
+                        xaxis_title='Moneyness (K/S)',
+                        yaxis_title='Days to Expiry',
+                        zaxis_title='Implied Volatility'
+                    ))
+                    st.plotly_chart(fig_iv)
+                else:
+                    st.write("Implied volatility surface not available.")
                 
                 # Scatter Plot for Options Pricing
                 st.subheader("Options Pricing Scatter Plot")
                 fig_price = px.scatter(calls, x='strike', y='lastPrice', color='impliedVolatility', 
-                                      hover_data=['contractSymbol', 'volume', 'openInterest'],
+                                      hover_data=['contractSymbol', 'volume', 'openInterest'], render_mode='webgl',
                                       title=f'Options Pricing for {tickerSymbol} - {exp_date}')
                 fig_price.update_xaxes(title='Strike Price')
                 fig_price.update_yaxes(title='Last Price')
@@ -382,7 +664,7 @@ def options_page():
                 # Volume vs. Open Interest for Calls and Puts
                 st.subheader("Volume vs. Open Interest")
                 fig_vol_oi = px.scatter(options_data, x='volume', y='openInterest', color='Type', 
-                                       size='impliedVolatility', hover_data=['strike', 'lastPrice'],
+                                       size='impliedVolatility', hover_data=['strike', 'lastPrice'], render_mode='webgl',
                                        title=f'Volume vs. Open Interest for {tickerSymbol} Options - {exp_date}')
                 fig_vol_oi.update_xaxes(title='Volume')
                 fig_vol_oi.update_yaxes(title='Open Interest')
@@ -392,20 +674,267 @@ def options_page():
     else:
         st.write("Please enter a ticker symbol to view options data.")
 
-def fetch_options_data(ticker, exp_date):
-    stock = yf.Ticker(ticker)
-    options = stock.option_chain(exp_date)
-    return options.calls, options.puts
-
-
 # Sentiment
+@span("page.sentiment")
 def sentiment_page():
+    import plotly.graph_objects as go
+    from sentiment import bucket_scores
+    from sentiment_returns import EVENT_DAYS, MIN_OBSERVATIONS, ROLLING_WINDOW
+
     tickerSymbol = st.session_state.tickerSymbol
-    st.write("Nothing to see here yet")
+    if not tickerSymbol:
+        st.write("Please enter a ticker symbol to view news sentiment.")
+        return
+    record_view("sentiment", tickerSymbol)
+
+    try:
+        scored = load_news_sentiment(tickerSymbol)
+    except LookupError:
+        st.write("The VADER sentiment lexicon could not be loaded.")
+        return
+
+    if scored.empty:
+        st.write("No news articles found.")
+        return
+
+    st.subheader(f"News Sentiment for {tickerSymbol}")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Average VADER score", f"{scored['compound'].mean():+.2f}")
+    col2.metric("Average polarity", f"{scored['polarity'].mean():+.2f}")
+    col3.metric("Archived articles", len(scored))
+
+    # Daily average sentiment, sized by how many articles fell in each day
+    buckets = bucket_scores(scored, "1D")
+    fig_sentiment = go.Figure(data=go.Bar(
+        x=buckets.index,
+        y=buckets['compound'],
+        marker_color=['green' if score >= 0 else 'red' for score in buckets['compound']],
+        customdata=buckets['articles'],
+        hovertemplate='%{x|%Y-%m-%d}<br>Score %{y:.2f}<br>%{customdata} articles<extra></extra>'
+    ))
+    fig_sentiment.update_layout(title=f'Daily News Sentiment for {tickerSymbol}', xaxis_title='Date', yaxis_title='Average VADER Score')
+    st.plotly_chart(fig_sentiment)
+
+    # Sentiment vs returns: each session's average score against its log
+    # return, using every archived article and the full price history
+    st.subheader("Sentiment vs Returns")
+    window = st.slider("Rolling window (trading days)", min_value=10, max_value=120, value=ROLLING_WINDOW, step=5)
+    try:
+        daily, rolling, lags, (events, event_counts) = load_sentiment_returns(tickerSymbol, window)
+    except Exception:
+        daily = None
+
+    if daily is None:
+        st.write("Price history could not be loaded right now.")
+    elif daily.empty:
+        st.write("None of the archived news falls within the price history yet; news published after the last close counts toward the next session.")
+    elif (daily["articles"] > 0).sum() < MIN_OBSERVATIONS:
+        st.write(f"At least {MIN_OBSERVATIONS} trading days with news are needed; the archive grows every time news is fetched.")
+    else:
+        fig_rolling = go.Figure(data=go.Scatter(x=rolling.index, y=rolling, mode='lines', connectgaps=False))
+        fig_rolling.update_layout(title=f'{window}-Day Rolling Correlation of Sentiment and Returns', xaxis_title='Date', yaxis_title='Correlation', yaxis_range=[-1, 1])
+        st.plotly_chart(fig_rolling)
 
+        col1, col2 = st.columns(2)
+        # Positive lags compare the news with the returns that followed it
+        fig_lags = go.Figure(data=go.Bar(
+            x=lags.index,
+            y=lags['correlation'],
+            marker_color=['green' if value >= 0 else 'red' for value in lags['correlation'].fillna(0)],
+            customdata=lags['days'],
+            hovertemplate='Lag %{x}<br>Correlation %{y:.2f}<br>%{customdata} days<extra></extra>'
+        ))
+        fig_lags.update_layout(title='Lead/Lag Correlation', xaxis_title='Sessions after the news', yaxis_title='Correlation')
+        col1.plotly_chart(fig_lags)
+
+        fig_events = go.Figure()
+        for name, color in [("positive", "green"), ("negative", "red")]:
+            fig_events.add_trace(go.Scatter(x=events.index, y=events[name], mode='lines+markers', line_color=color, name=f"{name.title()} news ({event_counts[name]} days)"))
+        fig_events.update_layout(title=f'Average Return Around Sentiment Events (±{EVENT_DAYS} sessions)', xaxis_title='Sessions from the news', yaxis_title='Cumulative return (%)')
+        col2.plotly_chart(fig_events)
+
+    st.dataframe(scored[["published", "title", "compound", "polarity", "subjectivity"]], hide_index=True)
+
+
+
+# Screener
+# Universes up to this size show market cap without being asked
+MARKET_CAP_TICKERS = 50
+
+
+@span("page.screener")
+def screener_page():
+    from performance import PERFORMANCE_WINDOWS
+    from screener import DEFAULT_WATCHLIST, parse_tickers
+
+    st.subheader("Watchlist Screener")
+    tickers = parse_tickers(st.text_area("Tickers (separated by spaces or commas)", value=" ".join(DEFAULT_WATCHLIST)))
+    if not tickers:
+        st.write("Enter some ticker symbols to screen.")
+        return
+
+    with st.spinner(f"Loading {len(tickers)} tickers..."):
+        table = load_screen(tuple(tickers))
+    if table.empty:
+        st.write("No price data available for these symbols.")
+        return
+
+    # Market cap costs a request per ticker, so large universes opt in
+    if st.toggle("Market cap", value=len(table) <= MARKET_CAP_TICKERS, help="Looks up shares outstanding for every ticker"):
+        with st.spinner(f"Loading shares outstanding for {len(table)} tickers..."):
+            table = table.assign(marketCap=table["price"] * load_shares(tuple(table.index)))
+
+    # Filters run on the cached table, so changing them costs no downloads
+    col1, col2, col3, col4 = st.columns(4)
+    min_cap = col1.number_input("Min market cap ($B)", min_value=0.0, value=0.0, disabled="marketCap" not in table)
+    min_dollar_volume = col2.number_input("Min avg dollar volume ($M)", min_value=0.0, value=0.0)
+    positive = col3.multiselect("Positive return over", PERFORMANCE_WINDOWS)
+    rsi_low, rsi_high = col4.slider("RSI (14)", min_value=0, max_value=100, value=(0, 100))
+
+    mask = table["dollarVolume"].fillna(0) >= min_dollar_volume * 1e6
+    if "marketCap" in table and min_cap:
+        mask &= table["marketCap"].fillna(0) >= min_cap * 1e9
+    for window in positive:
+        mask &= table[window] > 0
+    if (rsi_low, rsi_high) != (0, 100):
+        mask &= table["rsi"].between(rsi_low, rsi_high)
+    filtered = table[mask]
+
+    st.write(f"{len(filtered)} of {len(table)} tickers")
+    percent = st.column_config.NumberColumn(format="%.2f%%")
+    st.dataframe(filtered, column_config={
+        "price": st.column_config.NumberColumn("Price", format="dollar"),
+        "1d": st.column_config.NumberColumn("1d", format="%.2f%%"),
+        **{window: percent for window in PERFORMANCE_WINDOWS},
+        "volatility": st.column_config.NumberColumn("Volatility (20d)", format="%.1f%%"),
+        "dollarVolume": st.column_config.NumberColumn("Avg $ Volume (20d)", format="compact"),
+        "rsi": st.column_config.NumberColumn("RSI (14)", format="%.1f"),
+        "smaGap": st.column_config.NumberColumn("vs SMA (50d)", format="%.2f%%"),
+        "marketCap": st.column_config.NumberColumn("Market Cap", format="compact"),
+    })
+
+
+# Backtest
+@span("page.backtest")
+def backtest_page():
+    import plotly.graph_objects as go
+    from backtest import STRATEGIES, parameter_values
+    from screener import DEFAULT_WATCHLIST, parse_tickers
+
+    st.subheader("Strategy Backtester")
+    strategy = st.selectbox("Strategy", list(STRATEGIES))
+    parameters = STRATEGIES[strategy][1]
+
+    # Nothing reruns until the form is submitted, so dragging a slider
+    # never starts a sweep
+    with st.form("backtest"):
+        tickers = parse_tickers(st.text_area("Tickers (separated by spaces or commas)", value=" ".join(DEFAULT_WATCHLIST)))
+        col1, col2 = st.columns(2)
+        period = col1.selectbox("History", ["1y", "2y", "5y", "10y", "max"], index=2)
+        cost_bps = col2.number_input("Cost per trade (bps)", min_value=0.0, value=5.0, step=1.0)
+        ranges = {}
+        for column, (name, (low, high, default, step)) in zip(st.columns(len(parameters)), parameters.items()):
+            selected = column.slider(name.title(), min_value=low, max_value=high, value=default, step=step, key=f"backtest_{strategy}_{name}")
+            ranges[name] = parameter_values(*selected, step)
+        st.form_submit_button("Run backtest")
+
+    if not tickers:
+        st.write("Enter some ticker symbols to backtest.")
+        return
+
+    with st.spinner(f"Backtesting {len(tickers)} tickers..."):
+        stats, curves, missing, timed_out = load_backtest(tuple(tickers), period, strategy, ranges, cost_bps)
+    if missing:
+        st.warning(f"No price history for {', '.join(missing)}.")
+    if timed_out:
+        st.warning(f"Timed out loading {', '.join(timed_out)}; they are left out of this run and included once their histories have loaded.")
+    if stats.empty:
+        st.write("No parameter combinations to test for these settings.")
+        return
+
+    names = list(parameters)
+    st.write(f"{len(stats):,} ticker-parameter combinations over {len(curves)} sessions")
+
+    # Growth of $1 for the best combinations by Sharpe ratio
+    fig_equity = go.Figure()
+    for label in curves.columns:
+        fig_equity.add_trace(go.Scatter(x=curves.index, y=curves[label], mode='lines', name=label))
+    fig_equity.update_layout(title='Equity Curves of the Top Combinations', xaxis_title='Date', yaxis_title='Growth of $1')
+    st.plotly_chart(fig_equity)
+
+    # Median Sharpe ratio across tickers for every parameter pair
+    grid = stats.groupby(names)["sharpe"].median().unstack()
+    fig_grid = go.Figure(data=go.Heatmap(
+        z=grid.to_numpy(), x=grid.columns, y=grid.index, colorscale='RdYlGn', zmid=0,
+        hovertemplate=f'{names[0]} %{{y}}<br>{names[1]} %{{x}}<br>Median Sharpe %{{z:.2f}}<extra></extra>'
+    ))
+    fig_grid.update_layout(title='Median Sharpe Ratio by Parameters', xaxis_title=names[1].title(), yaxis_title=names[0].title())
+    st.plotly_chart(fig_grid)
+
+    st.dataframe(stats.sort_values("sharpe", ascending=False), hide_index=True, column_config={
+        "totalReturn": st.column_config.NumberColumn("Total return", format="%.2f%%"),
+        "cagr": st.column_config.NumberColumn("CAGR", format="%.2f%%"),
+        "volatility": st.column_config.NumberColumn("Volatility", format="%.1f%%"),
+        "sharpe": st.column_config.NumberColumn("Sharpe", format="%.2f"),
+        "maxDrawdown": st.column_config.NumberColumn("Max drawdown", format="%.2f%%"),
+        "trades": st.column_config.NumberColumn("Trades", format="%d"),
+        "exposure": st.column_config.NumberColumn("Exposure", format="%.0f%%"),
+        "buyHold": st.column_config.NumberColumn("Buy & hold", format="%.2f%%"),
+    })
+
+
+# Back-adjustment choices for the continuous series
+ADJUSTMENTS = {"Back-adjusted (difference)": "difference", "Back-adjusted (ratio)": "ratio"}
+
+
+# Term structure and roll-adjusted continuous series of one root, built from
+# its individual contract months. All roots come from one cached download,
+# so switching between them never waits on the network again.
+def futures_view(root):
+    import plotly.graph_objects as go
+
+    adjustment = st.radio("Continuous series", list(ADJUSTMENTS), horizontal=True)
+    try:
+        curve, series = load_futures(root, ADJUSTMENTS[adjustment])
+    except Exception:
+        curve, series = None, None
+    if curve is None or curve.empty:
+        st.write(f"No contract prices are available for {root} right now.")
+        return
+
+    front, back = curve.iloc[0], curve.iloc[-1]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Front month", front["month"], f"{front['price']:,.2f}", delta_color="off")
+    col2.metric(f"{back['month']} vs front", f"{back['spread']:+,.2f}", "Contango" if back['spread'] > 0 else "Backwardation", delta_color="off")
+    col3.metric("Annualized carry", f"{back['carry']:+.2f}%" if len(curve) > 1 else "n/a")
+
+    fig = go.Figure(go.Scatter(x=curve['lastTrade'], y=curve['price'], mode='lines+markers', text=curve['month'],
+                               hovertemplate='%{text}: %{y:,.2f}<extra></extra>'))
+    fig.update_layout(title='Term structure', template='plotly_dark', height=380, xaxis_title='Last trade', yaxis_title='Price',
+                      margin=dict(t=50, b=30))
+    st.plotly_chart(fig)
+    st.dataframe(curve, hide_index=True, column_config={
+        "lastTrade": st.column_config.DateColumn("Last trade"),
+        "daysToExpiry": st.column_config.NumberColumn("Days", format="%d"),
+        "price": st.column_config.NumberColumn("Price", format="%.2f"),
+        "volume": st.column_config.NumberColumn("Volume", format="%d"),
+        "spread": st.column_config.NumberColumn("Spread", format="%+.2f"),
+        "carry": st.column_config.NumberColumn("Carry", format="%+.2f%%"),
+    })
+
+    # Roll points are where the held contract changes
+    rolls = series[series['contract'] != series['contract'].shift()].iloc[1:]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=series.index, y=series['close'], mode='lines', name=adjustment))
+    fig.add_trace(go.Scatter(x=series.index, y=series['raw'], mode='lines', line=dict(width=1, dash='dot'), name='Front month (unadjusted)'))
+    fig.add_trace(go.Scatter(x=rolls.index, y=rolls['close'], mode='markers', marker=dict(symbol='diamond', size=7), text=rolls['contract'],
+                             hovertemplate='Roll to %{text}<extra></extra>', name='Roll'))
+    fig.update_layout(title=f'{root} continuous', template='plotly_dark', height=480, margin=dict(t=50, b=30))
+    st.plotly_chart(fig)
 
 
 # Futures
+@span("page.futures")
 def Futures_page():
     futuresSymbol = st.selectbox("Select Futures Symbol", [
         "MES1!",
@@ -446,13 +975,45 @@ def Futures_page():
         </div>
         <!-- TradingView Widget END -->
         """
-    # Render the TradingView widget
-    st.components.v1.html(futures_chart, width=1000, height=620)
+    # The TradingView widget, or the native term structure built from the
+    # root's contract months
+    chart = st.radio("Chart", ["TradingView", "Term structure"], horizontal=True)
+    if chart == "TradingView":
+        st.components.v1.html(futures_chart, width=1000, height=620)
+    else:
+        futures_view(futuresSymbol.removesuffix("1!"))
 
 
-pg = st.navigation([st.Page(home_page, title="Home", icon="📈"), st.Page(options_page, title="Options", icon="📊"), st.Page(sentiment_page, title="Sentiment", icon="😰"), st.Page(Futures_page, title="Futures", icon="🔮")], position="sidebar")
+pg = st.navigation([st.Page(home_page, title="Home", icon="📈"), st.Page(options_page, title="Options", icon="📊"), st.Page(sentiment_page, title="Sentiment", icon="😰"), st.Page(screener_page, title="Screener", icon="🔎"), st.Page(backtest_page, title="Backtest", icon="🧪"), st.Page(Futures_page, title="Futures", icon="🔮")], position="sidebar")
 pg.run()
 
+
+# Latency, error and cache counters for this server process, shown in the
+# sidebar with ?debug=1 in the URL or INVINCIBULL_DEBUG=1 in the environment
+def metrics_panel():
+    stats = snapshot()
+    with st.sidebar.expander("Debug metrics", expanded=True):
+        st.caption("Spans")
+        st.dataframe([
+            {"span": name, "count": s["count"], "errors": s["errors"], "mean ms": s["mean_ms"], "p50 ms": s["p50_ms"], "p95 ms": s["p95_ms"]}
+            for name, s in stats["spans"].items()
+        ], hide_index=True, column_config={c: st.column_config.NumberColumn(format="%.0f") for c in ("mean ms", "p50 ms", "p95 ms")})
+        st.caption("Caches")
+        st.dataframe([
+            {"cache": name, **c, "hit rate": c["hits"] / c["requests"] if c["requests"] else None}
+            for name, c in stats["caches"].items()
+        ], hide_index=True, column_config={"hit rate": st.column_config.NumberColumn(format="percent")})
+        if stats["counters"]:
+            st.caption("Events")
+            st.dataframe([{"event": name, "count": value} for name, value in stats["counters"].items()], hide_index=True)
+        col1, col2 = st.columns(2)
+        col1.download_button("JSON", to_json(), file_name="metrics.json", mime="application/json")
+        col2.download_button("Prometheus", to_prometheus(), file_name="metrics.prom", mime="text/plain")
+
+
+if st.query_params.get("debug") == "1" or os.environ.get("INVINCIBULL_DEBUG") == "1":
+    metrics_panel()
+
 # Calendar Widget in Sidebar
 tradingview_calendar_widget = f"""
     <!-- TradingView Widget BEGIN -->
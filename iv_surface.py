@@ -0,0 +1,46 @@
+import numpy as np
+
+from greeks import years_to_expiry
+
+# Moneyness (strike / spot) grid the surface is interpolated onto. Its size
+# bounds what is sent to the browser no matter how many strikes are listed.
+MONEYNESS_GRID = np.linspace(0.6, 1.4, 81)
+# Most points a single per-expiry chart should send to the browser
+MAX_PLOT_POINTS = 2000
+
+
+def build_surface(chain, spot, moneyness=MONEYNESS_GRID, now=None):
+    # Implied volatility on an (expiry x moneyness) grid from a long-format
+    # chain indexed by (expiry, type, strike)
+    surface = {"moneyness": moneyness, "expiries": [], "days": np.array([]), "iv": np.empty((0, len(moneyness)))}
+    if chain.empty or spot is None or not np.isfinite(spot):
+        return surface
+
+    frame = chain.reset_index()
+    vol = frame["iv"].fillna(frame["impliedVolatility"]).to_numpy(dtype=float)
+    m = frame["strike"].to_numpy(dtype=float) / spot
+
+    # Use the out-of-the-money side at each strike: puts below spot, calls above
+    otm = np.where(frame["type"].to_numpy() == "call", m >= 1, m < 1)
+    keep = otm & np.isfinite(vol) & (vol > 0)
+    points = frame.loc[keep, ["expiry"]].assign(m=m[keep], vol=vol[keep]).sort_values(["expiry", "m"])
+
+    expiries = list(points["expiry"].unique())
+    grid = np.full((len(expiries), len(moneyness)), np.nan)
+    for row, (expiry, smile) in enumerate(points.groupby("expiry", sort=True)):
+        if len(smile) >= 2:
+            # Interpolate within the quoted strikes only, never extrapolate
+            grid[row] = np.interp(moneyness, smile["m"], smile["vol"], left=np.nan, right=np.nan)
+
+    surface["expiries"] = expiries
+    surface["days"] = years_to_expiry(expiries, now) * 365
+    surface["iv"] = grid
+    return surface
+
+
+def downsample_rows(frame, max_points=MAX_PLOT_POINTS):
+    # Evenly spaced rows, so wide chains stay light in the browser
+    if len(frame) <= max_points:
+        return frame
+    positions = np.unique(np.linspace(0, len(frame) - 1, max_points).round().astype(int))
+    return frame.iloc[positions]
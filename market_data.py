@@ -0,0 +1,408 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from metrics import cached
+from upstream import upstream_call
+
+# Data access for every page. Heavy libraries (yfinance, pandas, pyarrow,
+# scipy, ...) are imported inside the loaders that need them, so importing
+# this module costs almost nothing and a page only loads what it uses.
+
+# How long a page waits for each loader it runs side by side, by default
+FETCH_TIMEOUT = 8
+# Universes can be hundreds of tickers, most of them cold the first time
+PRICE_MATRIX_TIMEOUT = 60
+PRICE_MATRIX_WORKERS = 4
+
+# How long each kind of upstream data stays fresh (seconds)
+QUOTE_TTL = 60
+NEWS_TTL = 15 * 60
+FILINGS_TTL = 15 * 60
+HISTORY_TTL = 15 * 60
+PROFILE_TTL = 24 * 60 * 60
+DIRECTORY_RETRY_TTL = 5 * 60
+CHAIN_TTL = 5 * 60
+# Number of tickers whose option chains are kept in memory
+MAX_CHAINS = 64
+
+
+def ticker(tickerSymbol):
+    import yfinance as yf
+
+    return yf.Ticker(tickerSymbol)
+
+
+def fetch_quote(tickerSymbol):
+    # fast_info is a lazy yfinance object; keep only the plain values we show
+    with upstream_call("yfinance.fast_info"):
+        fast_info = ticker(tickerSymbol).fast_info
+        return {
+            "last_price": fast_info.last_price,
+            "shares": fast_info.shares,
+            "market_cap": fast_info.market_cap,
+        }
+
+
+def fetch_news(tickerSymbol):
+    from news_archive import ingest
+
+    with upstream_call("yfinance.news"):
+        news = ticker(tickerSymbol).news
+    # Every fetch, background refreshes included, grows the local archive
+    ingest(tickerSymbol, news)
+    return news
+
+
+def fetch_history(tickerSymbol, interval):
+    from price_store import refresh_history
+
+    return refresh_history(tickerSymbol, interval)
+
+
+def fetch_option_chain(tickerSymbol):
+    from options_chain import fetch_chain
+
+    return fetch_chain(tickerSymbol)
+
+
+# Quotes, history, news and option chains, shared by every session. Stale
+# entries are served at once while they refresh in the background, and the
+# most requested tickers are refreshed before they expire. Values are shared,
+# so callers must not modify them.
+@st.cache_resource(show_spinner=False)
+def hot_data():
+    from hot_data import HotDataCache
+
+    cache = HotDataCache()
+    cache.register("quote", fetch_quote, QUOTE_TTL, max_stale=15 * 60)
+    cache.register("history", fetch_history, HISTORY_TTL, max_stale=24 * 60 * 60)
+    cache.register("news", fetch_news, NEWS_TTL, max_stale=24 * 60 * 60)
+    cache.register("options", fetch_option_chain, CHAIN_TTL, max_stale=60 * 60, max_entries=MAX_CHAINS)
+    return cache
+
+
+# Popularity counts page views, not loader calls: one touch each time a
+# session opens a page on a ticker, however many reruns and loaders the page
+# takes. Bulk loads (screener, backtest) never count.
+def record_view(page, tickerSymbol):
+    view = (page, tickerSymbol)
+    if st.session_state.get("lastView") != view:
+        st.session_state.lastView = view
+        hot_data().touch(tickerSymbol)
+
+
+# One shared OHLCV frame per ticker and interval, backed by the on-disk price
+# store. Refreshing only appends bars newer than what is stored, and every
+# window a page needs is sliced out of the same in-memory copy.
+def load_full_history(tickerSymbol, interval="1d"):
+    return hot_data().get("history", tickerSymbol, interval)
+
+
+def load_history(tickerSymbol, period="1y", interval="1d"):
+    from price_store import slice_period
+
+    return slice_period(load_full_history(tickerSymbol, interval), period)
+
+
+@st.cache_resource(show_spinner=False)
+def indicator_cache():
+    from indicators import IndicatorCache
+
+    return IndicatorCache()
+
+
+# OHLCV with every indicator, computed over the full stored history so long
+# averages are warmed up, then sliced like load_history. When the shared
+# history gains bars, only those bars are computed.
+def load_indicators(tickerSymbol, period="1y", interval="1d"):
+    from price_store import slice_period
+
+    history = load_full_history(tickerSymbol, interval)
+    indicators = indicator_cache().indicators((tickerSymbol, interval), history)
+    return slice_period(history.join(indicators), period)
+
+
+# A chart-sized view of a ticker's history between start and end (naive
+# exchange-local times): candles merged into buckets, or the close reduced
+# with LTTB. Zooming in cuts a narrower slice from the same full-resolution
+# history, so finer bars never cost a fetch. Returns the view, how many bars
+# the range holds and the first and last bar times of the whole history.
+def load_chart(tickerSymbol, interval, start=None, end=None, candles=False):
+    import pandas as pd
+    from downsample import line_points, ohlc_buckets, visible_slice
+
+    history = load_full_history(tickerSymbol, interval)
+    if history.empty:
+        return history, 0, None
+    tz = history.index.tz
+
+    def local(times):
+        return times if tz is None else times.tz_localize(None)
+
+    def exchange(moment):
+        if moment is None or tz is None:
+            return moment
+        return pd.Timestamp(moment).tz_localize(tz, ambiguous=True, nonexistent="shift_forward")
+
+    visible = visible_slice(history, exchange(start), exchange(end))
+    view = ohlc_buckets(visible) if candles else line_points(visible)
+    return view.set_axis(local(view.index)), len(visible), (local(history.index[0]), local(history.index[-1]))
+
+
+# Screener table for a whole universe from batched downloads only; filters
+# and sorting then work on the cached table without touching the network
+@cached("screen", st.cache_data(ttl=HISTORY_TTL, show_spinner=False))
+def load_screen(tickers):
+    from screener import download_prices, screen
+
+    close, volume = download_prices(list(tickers))
+    return screen(close, volume)
+
+
+# Shares outstanding for the screener's market cap column, one request per
+# ticker not seen in the last day
+@cached("shares", st.cache_data(ttl=HISTORY_TTL, show_spinner=False))
+def load_shares(tickers):
+    from screener import fetch_shares
+
+    return fetch_shares(list(tickers))
+
+
+# Aligned (date x ticker) close matrix read through the same per-ticker
+# history cache and price store as the Home page, on a pool of its own so a
+# large universe cannot hold up every other page's loaders. Returns the
+# matrix, which leaves out tickers without prices, and the tickers that were
+# still loading at PRICE_MATRIX_TIMEOUT.
+@st.cache_resource(show_spinner=False)
+def price_matrix_pool():
+    return ThreadPoolExecutor(max_workers=PRICE_MATRIX_WORKERS, thread_name_prefix="price-matrix")
+
+
+def load_price_matrix(tickers, period):
+    from backtest import price_matrix
+
+    calls = {tickerSymbol: (load_history, tickerSymbol, period) for tickerSymbol in tickers}
+    results, errors = fetch_concurrently(calls, timeout=PRICE_MATRIX_TIMEOUT, pool=price_matrix_pool())
+    timed_out = [tickerSymbol for tickerSymbol, exc in errors.items() if isinstance(exc, TimeoutError)]
+    return price_matrix(results), timed_out
+
+
+class Incomplete(Exception):
+    # Carries a result out of a cached loader without caching it: Streamlit
+    # keeps return values but not exceptions
+    def __init__(self, value):
+        super().__init__("incomplete result")
+        self.value = value
+
+
+@cached("backtest", st.cache_data(ttl=HISTORY_TTL, max_entries=16, show_spinner=False))
+def sweep_universe(tickers, period, strategy, ranges, cost_bps):
+    from backtest import TOP_CURVES, equity_curves, parameter_grid, sweep
+
+    prices, timed_out = load_price_matrix(tickers, period)
+    stats = sweep(prices, strategy, parameter_grid(strategy, ranges), cost_bps)
+    best = stats.sort_values("sharpe", ascending=False).head(TOP_CURVES)
+    missing = [tickerSymbol for tickerSymbol in tickers if tickerSymbol not in prices.columns and tickerSymbol not in timed_out]
+    result = stats, equity_curves(prices, strategy, best, cost_bps), missing, timed_out
+    if timed_out:
+        raise Incomplete(result)
+    return result
+
+
+# Parameter sweep of one strategy over a universe: stats for every parameter
+# set on every ticker, equity curves for the best rows, the tickers that had
+# no prices and those that timed out. Changing only how the results are
+# shown reuses the sweep; a sweep missing timed-out tickers is not kept, so
+# the next rerun picks them up once their histories have loaded.
+def load_backtest(tickers, period, strategy, ranges, cost_bps):
+    try:
+        return sweep_universe(tickers, period, strategy, ranges, cost_bps)
+    except Incomplete as exc:
+        return exc.value
+
+
+# Recently expired and listed contract months of every futures root from one
+# batched download, so switching roots only slices this
+@cached("futures_board", st.cache_data(ttl=HISTORY_TTL, show_spinner=False))
+def load_futures_board(period="2y"):
+    from futures import download_board
+
+    return download_board(period)
+
+
+# One root's term structure and back-adjusted continuous series
+@cached("futures", st.cache_data(ttl=HISTORY_TTL, max_entries=64, show_spinner=False))
+def load_futures(root, method="difference"):
+    from futures import continuous, term_structure
+
+    board, close, volume = load_futures_board()
+    board = board[board["root"] == root]
+    return term_structure(board, close, volume), continuous(board, close, method)
+
+
+# Everything below is fetched lazily: a page only pays for what it renders.
+def load_quote(tickerSymbol):
+    return hot_data().get("quote", tickerSymbol)
+
+
+@cached("profile", st.cache_data(ttl=PROFILE_TTL, show_spinner=False))
+def load_profile(tickerSymbol):
+    with upstream_call("yfinance.info"):
+        return ticker(tickerSymbol).info
+
+
+def load_news(tickerSymbol):
+    return hot_data().get("news", tickerSymbol)
+
+
+# A page of archived articles, optionally full-text searched. Indexed SQLite
+# queries take milliseconds, so nothing is cached in memory.
+def load_news_page(tickerSymbol, query="", page=1):
+    from news_archive import search
+
+    return search(tickerSymbol, query, page)
+
+
+# Every archived article for the ticker, scored. Scores themselves are cached
+# per article on disk; this only saves the lookup
+@cached("news_sentiment", st.cache_data(ttl=NEWS_TTL, show_spinner=False))
+def load_news_sentiment(tickerSymbol):
+    from news_archive import ticker_articles
+    from sentiment import score_articles
+
+    # Fetching appends the latest headlines to the archive; if that fails the
+    # page still scores everything archived so far
+    try:
+        load_news(tickerSymbol)
+    except Exception:
+        pass
+    return score_articles(ticker_articles(tickerSymbol))
+
+
+@st.cache_resource(show_spinner=False)
+def rolling_sentiment():
+    from sentiment_returns import RollingSentimentCache
+
+    return RollingSentimentCache()
+
+
+# Daily sentiment joined against daily returns, with its rolling correlation,
+# lead/lag correlations and event-window averages. The rolling series is kept
+# per ticker, so a rerun only recomputes the windows that saw new data.
+def load_sentiment_returns(tickerSymbol, window):
+    from sentiment_returns import daily_frame, event_windows, lead_lag
+
+    history = load_full_history(tickerSymbol)
+    if history is None or history.empty:
+        raise LookupError(f"no price history for {tickerSymbol}")
+    daily = daily_frame(load_news_sentiment(tickerSymbol), history)
+    return daily, rolling_sentiment().rolling(tickerSymbol, daily, window), lead_lag(daily), event_windows(daily)
+
+
+@cached("holders", st.cache_data(ttl=PROFILE_TTL, show_spinner=False))
+def load_holders(tickerSymbol):
+    with upstream_call("yfinance.major_holders"):
+        return ticker(tickerSymbol).major_holders
+
+
+@cached("recommendations", st.cache_data(ttl=PROFILE_TTL, show_spinner=False))
+def load_recommendations(tickerSymbol):
+    with upstream_call("yfinance.recommendations"):
+        return ticker(tickerSymbol).recommendations
+
+
+# One pooled, rate-limited EDGAR client shared by every session
+@st.cache_resource(show_spinner=False)
+def edgar_client():
+    from edgar import EdgarClient
+
+    return EdgarClient()
+
+
+# Every listed symbol, for autocomplete and for validating input before any
+# fetch. None when the SEC list has never been downloaded and cannot be now,
+# in which case input is passed through unchecked.
+@st.cache_resource(ttl=PROFILE_TTL, show_spinner=False)
+def symbol_directory():
+    from edgar import TICKERS_TTL
+    from symbols import load_directory
+
+    return load_directory(edgar_client(), TICKERS_TTL)
+
+
+# cache_resource does not keep exceptions, so without this every rerun would
+# wait on SEC again while it is down; a failure is remembered as None for a
+# few minutes and then retried
+@st.cache_resource(ttl=DIRECTORY_RETRY_TTL, show_spinner=False)
+def load_symbol_directory():
+    try:
+        return symbol_directory()
+    except Exception:
+        return None
+
+
+@cached("sec_filings", st.cache_data(ttl=FILINGS_TTL, show_spinner=False))
+def load_sec_filings(tickerSymbol):
+    return edgar_client().recent_filings(tickerSymbol)
+
+
+# Every expiry of a ticker's option chain, shared by all views and sessions
+def load_option_chain(tickerSymbol):
+    return hot_data().get("options", tickerSymbol)
+
+
+# Built once per chain snapshot; the chain itself is not hashed
+@cached("iv_surface", st.cache_data(max_entries=64, show_spinner=False))
+def load_iv_surface(tickerSymbol, snapshot, _chain):
+    from iv_surface import build_surface
+
+    return build_surface(_chain, _chain.attrs.get("underlying_price"))
+
+
+# The chain as one Arrow table for the chain browser, built once per snapshot
+# and shared as is; filtering and paging never copy it
+@cached("chain_table", st.cache_resource(max_entries=MAX_CHAINS, show_spinner=False))
+def load_chain_table(tickerSymbol, snapshot, _chain):
+    from options_chain import chain_table
+
+    return chain_table(_chain)
+
+
+def fetch_concurrently(calls, timeouts=None, timeout=FETCH_TIMEOUT, pool=None):
+    # Runs independent loaders at once so a page waits for the slowest one
+    # rather than for all of them in turn. calls maps a name to (loader, *args);
+    # returns (results, errors) keyed by name. A loader still running at its
+    # deadline is reported as a TimeoutError and left to finish in the
+    # background, where it fills the cache for the next rerun. Unless given a
+    # pool, each call gets a thread of its own for this page load, so its
+    # deadline never runs out while it queues behind other sessions' calls;
+    # the per-host caps in upstream bound what actually reaches the network.
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+
+    def run(loader, args):
+        # Cached loaders look up the session they run for
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return loader(*args)
+
+    own_pool = pool is None
+    if own_pool:
+        pool = ThreadPoolExecutor(max_workers=max(len(calls), 1), thread_name_prefix="fan-out")
+    start = time.monotonic()
+    futures = {name: pool.submit(run, loader, args) for name, (loader, *args) in calls.items()}
+    if own_pool:
+        # Loaders past their deadline keep running; the threads exit after
+        pool.shutdown(wait=False)
+
+    results, errors = {}, {}
+    for name, future in futures.items():
+        deadline = start + (timeouts or {}).get(name, timeout)
+        try:
+            results[name] = future.result(timeout=max(0, deadline - time.monotonic()))
+        except Exception as exc:
+            errors[name] = exc
+    return results, errors
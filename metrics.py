@@ -0,0 +1,217 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Process-wide instrumentation shared by every session: latency histograms
+# and error counts for spans (upstream calls and page renders) and hit/miss
+# counters for the data caches. Only the standard library is used, so
+# importing this module is free at startup.
+#
+# Set METRICS_PORT to serve /metrics (Prometheus text) and /metrics.json.
+METRICS_PORT = os.environ.get("METRICS_PORT")
+
+# Histogram bucket upper bounds (seconds)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, float("inf"))
+
+_lock = threading.Lock()
+_latency = defaultdict(lambda: [0] * len(BUCKETS))
+_latency_sum = defaultdict(float)
+_errors = defaultdict(int)
+_cache_requests = defaultdict(int)
+_cache_misses = defaultdict(int)
+_counters = defaultdict(int)
+_server = None
+
+
+def observe(name, seconds, failed=False):
+    with _lock:
+        counts = _latency[name]
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                counts[i] += 1
+                break
+        _latency_sum[name] += seconds
+        if failed:
+            _errors[name] += 1
+
+
+@contextmanager
+def span(name):
+    # Times a block (or, as a decorator, every call of a function) and counts
+    # it as an error if it raises. Streamlit's st.stop/st.rerun derive from
+    # BaseException and are not errors.
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except Exception:
+        failed = True
+        raise
+    finally:
+        observe(name, time.perf_counter() - start, failed)
+
+
+def count(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+def record_lookup(name, hit):
+    # For caches that are not Streamlit decorators
+    with _lock:
+        _cache_requests[name] += 1
+        if not hit:
+            _cache_misses[name] += 1
+
+
+def cached(name, cache):
+    # Wraps a function in a Streamlit cache decorator, counting every lookup
+    # and, from inside the cache, every call that had to run the function
+    def decorate(func):
+        @functools.wraps(func)
+        def on_miss(*args, **kwargs):
+            with _lock:
+                _cache_misses[name] += 1
+            return func(*args, **kwargs)
+
+        cached_func = cache(on_miss)
+
+        @functools.wraps(func)
+        def lookup(*args, **kwargs):
+            with _lock:
+                _cache_requests[name] += 1
+            return cached_func(*args, **kwargs)
+
+        lookup.clear = cached_func.clear
+        return lookup
+
+    return decorate
+
+
+def _copy():
+    with _lock:
+        return (
+            {name: list(counts) for name, counts in _latency.items()},
+            dict(_latency_sum),
+            dict(_errors),
+            dict(_cache_requests),
+            dict(_cache_misses),
+            dict(_counters),
+        )
+
+
+def quantile(counts, q):
+    # Estimated from the histogram, interpolating inside the bucket
+    total = sum(counts)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(counts):
+        if seen + count >= rank:
+            lower = BUCKETS[i - 1] if i else 0.0
+            upper = BUCKETS[i] if BUCKETS[i] != float("inf") else lower
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+    return BUCKETS[-2]
+
+
+def snapshot():
+    latency, latency_sum, errors, requests, misses, counters = _copy()
+
+    spans = {}
+    for name, counts in sorted(latency.items()):
+        total = sum(counts)
+        spans[name] = {
+            "count": total,
+            "errors": errors.get(name, 0),
+            "mean_ms": latency_sum[name] / total * 1000,
+            "p50_ms": quantile(counts, 0.5) * 1000,
+            "p95_ms": quantile(counts, 0.95) * 1000,
+            "buckets": dict(zip((str(bound) for bound in BUCKETS), counts)),
+        }
+    caches = {}
+    for name in sorted(requests):
+        caches[name] = {
+            "requests": requests[name],
+            "hits": requests[name] - misses.get(name, 0),
+            "misses": misses.get(name, 0),
+        }
+    return {"spans": spans, "caches": caches, "counters": dict(sorted(counters.items()))}
+
+
+def to_json():
+    return json.dumps(snapshot(), indent=2)
+
+
+def to_prometheus():
+    latency, latency_sum, errors, requests, misses, counters = _copy()
+
+    lines = [
+        "# HELP invincibull_span_seconds Latency of upstream calls and page renders.",
+        "# TYPE invincibull_span_seconds histogram",
+    ]
+    for name, counts in sorted(latency.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS, counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'invincibull_span_seconds_bucket{{span="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'invincibull_span_seconds_sum{{span="{name}"}} {latency_sum[name]}')
+        lines.append(f'invincibull_span_seconds_count{{span="{name}"}} {cumulative}')
+
+    lines += ["# HELP invincibull_span_errors_total Spans that raised.", "# TYPE invincibull_span_errors_total counter"]
+    lines += [f'invincibull_span_errors_total{{span="{name}"}} {errors.get(name, 0)}' for name in sorted(latency)]
+    lines += ["# HELP invincibull_cache_requests_total Cache lookups.", "# TYPE invincibull_cache_requests_total counter"]
+    lines += [f'invincibull_cache_requests_total{{cache="{name}"}} {count}' for name, count in sorted(requests.items())]
+    lines += ["# HELP invincibull_cache_misses_total Cache lookups that ran the function.", "# TYPE invincibull_cache_misses_total counter"]
+    lines += [f'invincibull_cache_misses_total{{cache="{name}"}} {misses.get(name, 0)}' for name in sorted(requests)]
+    lines += ["# HELP invincibull_events_total Other counted events.", "# TYPE invincibull_events_total counter"]
+    lines += [f'invincibull_events_total{{event="{name}"}} {value}' for name, value in sorted(counters.items())]
+    return "\n".join(lines) + "\n"
+
+
+def serve(port):
+    # Scrape endpoint on its own port, started once per process
+    global _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = to_prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = to_json(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            body = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer(("0.0.0.0", int(port)), Handler)
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+@functools.lru_cache(maxsize=None)
+def serve_from_env():
+    # Tried once per process; a taken port must not break every rerun
+    if METRICS_PORT:
+        try:
+            serve(METRICS_PORT)
+        except OSError:
+            # Shown under Events in the debug panel rather than on stdout
+            count("metrics.server_failed")
@@ -0,0 +1,156 @@
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timezone
+
+from config import DATA_DIR
+
+# Local archive of every news article seen for every ticker. Each fetch from
+# Yahoo is appended incrementally (articles already stored are skipped), and
+# titles and summaries are indexed with SQLite FTS5, so the News tab can page
+# and search months of headlines without touching the network.
+ARCHIVE_PATH = DATA_DIR / "news.db"
+PAGE_SIZE = 10
+
+WORD = re.compile(r"\w+")
+
+_db_lock = threading.Lock()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT UNIQUE NOT NULL,
+    title TEXT,
+    summary TEXT,
+    url TEXT,
+    provider TEXT,
+    published INTEGER
+);
+CREATE TABLE IF NOT EXISTS ticker_articles (
+    ticker TEXT NOT NULL,
+    article INTEGER NOT NULL REFERENCES articles(rowid),
+    published INTEGER,
+    PRIMARY KEY (ticker, article)
+);
+CREATE INDEX IF NOT EXISTS ticker_articles_by_date ON ticker_articles (ticker, published DESC);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, summary, content='articles', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS articles_indexed AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, summary) VALUES (new.rowid, new.title, new.summary);
+END;
+"""
+
+
+def connect():
+    ARCHIVE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(ARCHIVE_PATH, timeout=30)
+    # Readers (every session's News tab) never wait for the ingester
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def parse_article(article):
+    # Current yfinance articles nest everything under "content"; older ones are flat
+    content = article.get("content") or article
+    url = content.get("clickThroughUrl") or content.get("canonicalUrl") or content.get("link")
+    if isinstance(url, dict):
+        url = url.get("url")
+    provider = content.get("provider") or content.get("publisher")
+    if isinstance(provider, dict):
+        provider = provider.get("displayName")
+
+    published = content.get("pubDate") or content.get("providerPublishTime")
+    if isinstance(published, str):
+        try:
+            published = int(datetime.fromisoformat(published.replace("Z", "+00:00")).timestamp())
+        except ValueError:
+            published = None
+
+    article_id = article.get("id") or content.get("id") or content.get("uuid") or url
+    if not article_id or not content.get("title"):
+        return None
+    return {
+        "id": str(article_id),
+        "title": content.get("title"),
+        "summary": content.get("summary") or "",
+        "url": url,
+        "provider": provider,
+        "published": published,
+    }
+
+
+def ingest(tickerSymbol, articles):
+    # Appends the articles not archived yet; returns how many were new
+    rows = [row for row in map(parse_article, articles or []) if row is not None]
+    if not rows:
+        return 0
+    with _db_lock, closing(connect()) as conn, conn:
+        inserted = conn.executemany(
+            "INSERT OR IGNORE INTO articles (id, title, summary, url, provider, published) "
+            "VALUES (:id, :title, :summary, :url, :provider, :published)",
+            rows,
+        )
+        # rowcount leaves out the rows the trigger adds to the search index
+        new = inserted.rowcount
+        conn.executemany(
+            "INSERT OR IGNORE INTO ticker_articles (ticker, article, published) "
+            "SELECT ?, rowid, published FROM articles WHERE id = ?",
+            [(tickerSymbol, row["id"]) for row in rows],
+        )
+    return new
+
+
+def match_expression(query):
+    # Every word of the query must appear, as a word or a word prefix;
+    # FTS5 operators typed by the user are treated as plain text
+    words = WORD.findall(query)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search(tickerSymbol, query="", page=1, page_size=PAGE_SIZE):
+    # One page of a ticker's archived articles, newest first, and the total
+    # number of matches
+    expression = match_expression(query)
+    offset = (page - 1) * page_size
+    with closing(connect()) as conn:
+        if expression:
+            where = (
+                "FROM ticker_articles t JOIN articles a ON a.rowid = t.article "
+                "WHERE t.ticker = ? AND t.article IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)"
+            )
+            params = (tickerSymbol, expression)
+        else:
+            where = "FROM ticker_articles t JOIN articles a ON a.rowid = t.article WHERE t.ticker = ?"
+            params = (tickerSymbol,)
+        total = conn.execute(f"SELECT COUNT(*) {where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT a.id, a.title, a.summary, a.url, a.provider, a.published {where} "
+            "ORDER BY t.published DESC LIMIT ? OFFSET ?",
+            (*params, page_size, offset),
+        ).fetchall()
+
+    return to_articles(rows), total
+
+
+def ticker_articles(tickerSymbol):
+    # Every archived article for a ticker, newest first
+    with closing(connect()) as conn:
+        rows = conn.execute(
+            "SELECT a.id, a.title, a.summary, a.url, a.provider, a.published "
+            "FROM ticker_articles t JOIN articles a ON a.rowid = t.article "
+            "WHERE t.ticker = ? ORDER BY t.published DESC",
+            (tickerSymbol,),
+        ).fetchall()
+    return to_articles(rows)
+
+
+def to_articles(rows):
+    columns = ["id", "title", "summary", "url", "provider", "published"]
+    articles = [dict(zip(columns, row)) for row in rows]
+    for article in articles:
+        if article["published"] is not None:
+            article["published"] = datetime.fromtimestamp(article["published"], timezone.utc)
+    return articles
@@ -0,0 +1,122 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import yfinance as yf
+
+from greeks import add_greeks
+from upstream import upstream_call
+
+# Upper bound on concurrent option_chain requests for one ticker
+MAX_WORKERS = 8
+
+CHAIN_INDEX = ["expiry", "type", "strike"]
+# Rows the chain browser sends to the page at a time
+PAGE_SIZE = 100
+# Columns the chain browser shows, in order; others stay in the table
+GRID_COLUMNS = [
+    "contractSymbol", "expiry", "type", "strike", "moneyness", "lastPrice", "bid", "ask", "mid",
+    "change", "percentChange", "volume", "openInterest", "impliedVolatility", "iv",
+    "delta", "gamma", "theta", "vega", "inTheMoney", "lastTradeDate",
+]
+
+
+def fetch_chain(tickerSymbol, max_workers=MAX_WORKERS):
+    # Every expiry in one long-format frame indexed by (expiry, type, strike)
+    ticker = yf.Ticker(tickerSymbol)
+    with upstream_call("yfinance.options"):
+        expiries = ticker.options
+    if not expiries:
+        return pd.DataFrame()
+
+    def fetch(expiry):
+        with upstream_call("yfinance.option_chain"):
+            chain = ticker.option_chain(expiry)
+        frame = pd.concat([chain.calls.assign(type="call"), chain.puts.assign(type="put")], ignore_index=True)
+        return frame.assign(expiry=expiry), chain.underlying
+
+    # The shared Ticker already knows every expiry, so workers only fetch chains
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(expiries))) as pool:
+        results = list(pool.map(fetch, expiries))
+
+    chain = pd.concat([frame for frame, _ in results], ignore_index=True)
+    chain = chain.set_index(CHAIN_INDEX).sort_index()
+
+    underlying = results[0][1] or {}
+    spot = underlying.get("regularMarketPrice")
+    if spot is None:
+        with upstream_call("yfinance.fast_info"):
+            spot = ticker.fast_info.last_price
+
+    # Mid-price IV and greeks for every contract, computed once per snapshot
+    chain = add_greeks(chain, spot)
+    chain.attrs["underlying_price"] = spot
+    # Identifies this snapshot for caches derived from it
+    chain.attrs["snapshot"] = time.time()
+    return chain
+
+
+def chain_expiries(chain):
+    if chain.empty:
+        return []
+    return list(chain.index.unique("expiry"))
+
+
+def split_chain(chain, expiry):
+    # Calls and puts for one expiry, shaped like yfinance's option_chain frames
+    frame = chain.xs(expiry, level="expiry")
+    calls = frame.xs("call", level="type").reset_index()
+    puts = frame.xs("put", level="type").reset_index()
+    return calls, puts
+
+
+def chain_table(chain):
+    # The chain as one Arrow table, a row per contract with its expiry, type,
+    # strike and moneyness (strike / spot) as plain columns, in chain order
+    frame = chain.reset_index()
+    frame["moneyness"] = frame["strike"] / (chain.attrs.get("underlying_price") or float("nan"))
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    return table.select([column for column in GRID_COLUMNS if column in table.column_names])
+
+
+def matching_rows(table, expiries=None, types=None, strikes=None, moneyness=None,
+                  min_volume=0, min_open_interest=0, sort=None):
+    # Positions of the rows matching every given filter, worked out on the
+    # Arrow columns without copying any row; ranges are inclusive
+    # (low, high) with None for no bound. sort names a column to order the
+    # positions by, largest first.
+    conditions = []
+    if expiries:
+        conditions.append(pc.is_in(table["expiry"], value_set=pa.array(expiries)))
+    if types:
+        conditions.append(pc.is_in(table["type"], value_set=pa.array(types)))
+    for column, bounds in (("strike", strikes), ("moneyness", moneyness)):
+        low, high = bounds or (None, None)
+        if low is not None:
+            conditions.append(pc.greater_equal(table[column], low))
+        if high is not None:
+            conditions.append(pc.less_equal(table[column], high))
+    if min_volume:
+        conditions.append(pc.greater_equal(table["volume"], min_volume))
+    if min_open_interest:
+        conditions.append(pc.greater_equal(table["openInterest"], min_open_interest))
+
+    if conditions:
+        mask = conditions[0]
+        for condition in conditions[1:]:
+            mask = pc.and_(mask, condition)
+        rows = pc.indices_nonzero(pc.fill_null(mask, False))
+    else:
+        rows = pa.array(np.arange(table.num_rows, dtype=np.uint64))
+    if sort:
+        rows = rows.take(pc.array_sort_indices(table[sort].take(rows), order="descending"))
+    return rows
+
+
+def table_page(table, rows, page, page_size=PAGE_SIZE):
+    # One page of matching rows as a DataFrame; only these rows are copied
+    # out of the table and converted
+    return table.take(rows[(page - 1) * page_size:page * page_size]).to_pandas()
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+# Lookback windows shown in the Home page performance column
+PERFORMANCE_WINDOWS = ["3mo", "6mo", "ytd", "1yr"]
+
+
+def window_starts(index):
+    # Start timestamp of each performance window, in the index's timezone
+    today = pd.Timestamp.now(tz=index.tz).normalize()
+    return pd.DatetimeIndex([
+        today - pd.Timedelta(days=90),
+        today - pd.Timedelta(days=180),
+        pd.Timestamp(year=today.year, month=1, day=1, tz=index.tz),
+        today - pd.Timedelta(days=365),
+    ])
+
+
+def get_price_percentages(history):
+    performances = dict.fromkeys(PERFORMANCE_WINDOWS)
+    if history is None or history.empty:
+        return performances
+
+    close = history["Close"].to_numpy()
+    current_price = close[-1]
+
+    # First bar on or after each window start, all windows in one lookup
+    positions = history.index.searchsorted(window_starts(history.index))
+    valid = positions < len(close)
+    base = close[np.minimum(positions, len(close) - 1)]
+    changes = (current_price - base) / base * 100
+
+    for name, ok, change in zip(PERFORMANCE_WINDOWS, valid, changes):
+        performances[name] = float(change) if ok else None
+    return performances
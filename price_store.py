@@ -0,0 +1,230 @@
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import yfinance as yf
+
+from config import DATA_DIR
+from upstream import upstream_call
+
+# Local OHLCV store shared by every page and every session. Each ticker and
+# interval lives in its own uncompressed Arrow IPC file, which can be memory
+# mapped and handed to pandas without copying the price columns.
+STORE_DIR = DATA_DIR / "prices"
+
+# How far back the first download for an interval goes. yfinance only serves
+# a limited window of intraday bars.
+INITIAL_PERIODS = {
+    "1m": "7d",
+    "2m": "60d",
+    "5m": "60d",
+    "15m": "60d",
+    "30m": "60d",
+    "60m": "730d",
+    "1h": "730d",
+    "1d": "max",
+    "1wk": "max",
+    "1mo": "max",
+}
+
+# How far back yfinance serves bars of each intraday interval, and the
+# longest span one request may cover
+INTRADAY_LIMITS = {
+    "1m": (pd.Timedelta(days=29), pd.Timedelta(days=7)),
+    "2m": (pd.Timedelta(days=59), pd.Timedelta(days=59)),
+    "5m": (pd.Timedelta(days=59), pd.Timedelta(days=59)),
+    "15m": (pd.Timedelta(days=59), pd.Timedelta(days=59)),
+    "30m": (pd.Timedelta(days=59), pd.Timedelta(days=59)),
+    "90m": (pd.Timedelta(days=59), pd.Timedelta(days=59)),
+    "60m": (pd.Timedelta(days=729), pd.Timedelta(days=729)),
+    "1h": (pd.Timedelta(days=729), pd.Timedelta(days=729)),
+}
+
+# yfinance prices are split- and dividend-adjusted: any of these in newly
+# fetched bars, or an overlapping bar that moved by more than the tolerance,
+# means every stored bar is on an old basis. Daily and longer histories are
+# then downloaded again in full; intraday bars older than the upstream's
+# window cannot be, so they are rescaled instead.
+ACTION_COLUMNS = ["Dividends", "Stock Splits"]
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+ADJUSTMENT_TOLERANCE = 1e-4
+
+# Trailing windows callers can ask for, as offsets back from the last bar
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+    "max": None,
+}
+
+
+def store_path(tickerSymbol, interval="1d"):
+    return STORE_DIR / interval / f"{tickerSymbol.upper()}.arrow"
+
+
+def read_history(tickerSymbol, interval="1d"):
+    path = store_path(tickerSymbol, interval)
+    if not path.exists():
+        return pd.DataFrame()
+
+    # The mapped buffers stay alive for as long as the frame references them
+    source = pa.memory_map(str(path))
+    table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def write_history(tickerSymbol, history, interval="1d"):
+    path = store_path(tickerSymbol, interval)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(history, preserve_index=True)
+
+    # Write to a private temp file and swap it in, so readers in other
+    # sessions never see a half-written file
+    tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def fetch_bars(ticker, interval, start):
+    # Bars from start up to now, in requests no longer than yfinance allows
+    # for the interval
+    span = INTRADAY_LIMITS[interval][1] if interval in INTRADAY_LIMITS else None
+    now = pd.Timestamp.now(tz=start.tz)
+    frames = []
+    while span is not None and start + span < now:
+        with upstream_call("yfinance.history"):
+            frames.append(ticker.history(start=start, end=start + span, interval=interval))
+        start += span
+    with upstream_call("yfinance.history"):
+        frames.append(ticker.history(start=start, interval=interval))
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    fresh = pd.concat(frames)
+    return fresh[~fresh.index.duplicated(keep="last")]
+
+
+def out_of_window(start, interval):
+    # yfinance serves no bars for this interval as far back as start
+    if interval not in INTRADAY_LIMITS:
+        return False
+    return start < pd.Timestamp.now(tz=start.tz) - INTRADAY_LIMITS[interval][0]
+
+
+def rebased(stored, fresh, overlap):
+    # The upstream has re-adjusted prices since the stored bars were fetched:
+    # a new split or dividend after the overlapping bar, or that bar no
+    # longer matching the stored copy
+    newer = fresh[fresh.index > overlap]
+    for column in ACTION_COLUMNS:
+        if column not in newer:
+            continue
+        # Actions the stored bars already carry were priced in when stored
+        known = stored[column].reindex(newer.index).fillna(0) if column in stored else 0
+        if (newer[column].fillna(0) != known).any():
+            return True
+    if overlap not in fresh.index:
+        return True
+    before = stored.loc[overlap, PRICE_COLUMNS].to_numpy(dtype=float)
+    after = fresh.loc[overlap, PRICE_COLUMNS].to_numpy(dtype=float)
+    return not np.allclose(before, after, rtol=ADJUSTMENT_TOLERANCE, equal_nan=True)
+
+
+def window_start(interval, tz):
+    # Earliest bar yfinance still serves for an intraday interval
+    return pd.Timestamp.now(tz=tz) - INTRADAY_LIMITS[interval][0]
+
+
+def split_factor(fresh, after):
+    # Combined ratio of the splits in fresh bars newer than `after`
+    if "Stock Splits" not in fresh:
+        return 1.0
+    splits = fresh.loc[fresh.index > after, "Stock Splits"]
+    return float(splits[splits > 0].prod())
+
+
+def rescale(stored, ratio, split):
+    # Stored bars moved onto the upstream's current adjustment basis
+    adjusted = stored.copy()
+    adjusted[PRICE_COLUMNS] = adjusted[PRICE_COLUMNS] * ratio
+    if "Volume" in adjusted and split != 1.0:
+        adjusted["Volume"] = adjusted["Volume"] * split
+    return adjusted
+
+
+def joined(stored, fresh):
+    combined = pd.concat([stored[stored.index < fresh.index[0]], fresh])
+    return combined[~combined.index.duplicated(keep="last")]
+
+
+def updated_history(ticker, stored, interval):
+    # Stored bars extended with everything since, or None when the upstream
+    # has nothing new
+    overlap = stored.index[max(len(stored) - 2, 0)]
+    if out_of_window(overlap, interval):
+        # The bars after the stored ones are no longer served. Keep the
+        # stored ones and append what is, across the gap; only a split can
+        # be seen without an overlapping bar to compare.
+        fresh = fetch_bars(ticker, interval, window_start(interval, overlap.tz))
+        if fresh.empty:
+            return None
+        split = split_factor(fresh, stored.index[-1])
+        return joined(rescale(stored, 1 / split, split) if split != 1.0 else stored, fresh)
+
+    # Re-fetch from the last complete stored bar: it has to match what the
+    # upstream serves now, and the bar after it may have been partial
+    fresh = fetch_bars(ticker, interval, overlap)
+    if fresh.empty:
+        return None
+    if not rebased(stored, fresh, overlap):
+        return joined(stored, fresh)
+    if interval not in INTRADAY_LIMITS:
+        # A full download covers every stored bar, on the new basis
+        with upstream_call("yfinance.history"):
+            return ticker.history(period=INITIAL_PERIODS.get(interval, "max"), interval=interval)
+    # Older intraday bars cannot be downloaded again, so they are rescaled
+    # by how far the overlapping bar moved
+    split = split_factor(fresh, overlap)
+    if overlap in fresh.index and stored.loc[overlap, "Close"] > 0:
+        ratio = fresh.loc[overlap, "Close"] / stored.loc[overlap, "Close"]
+    else:
+        ratio = 1 / split
+    return joined(rescale(stored, ratio, split), fresh)
+
+
+def refresh_history(tickerSymbol, interval="1d"):
+    stored = read_history(tickerSymbol, interval)
+    ticker = yf.Ticker(tickerSymbol)
+
+    try:
+        if stored.empty:
+            with upstream_call("yfinance.history"):
+                combined = ticker.history(period=INITIAL_PERIODS.get(interval, "max"), interval=interval)
+        else:
+            combined = updated_history(ticker, stored, interval)
+    except Exception:
+        # Serve what we already have if the upstream call fails
+        return stored
+
+    if combined is None or combined.empty:
+        return stored
+
+    write_history(tickerSymbol, combined, interval)
+    return read_history(tickerSymbol, interval)
+
+
+def slice_period(history, period):
+    offset = PERIOD_OFFSETS[period]
+    if offset is None or history.empty:
+        return history
+    return history[history.index >= history.index[-1] - offset]
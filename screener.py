@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from indicators import SETTINGS, rsi, sma
+from performance import PERFORMANCE_WINDOWS, window_starts
+from upstream import upstream_call
+
+# Screener over a whole universe of tickers. Prices come from batched,
+# threaded yf.download calls and every column is computed for all tickers
+# at once on (date x ticker) matrices. Market cap needs one fast_info
+# request per ticker, so it is fetched separately and only when asked for.
+DEFAULT_WATCHLIST = [
+    "AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "BRK-B", "JPM", "V",
+    "UNH", "XOM", "JNJ", "WMT", "MA", "PG", "HD", "COST", "ABBV", "MRK",
+]
+# Tickers per yf.download request
+CHUNK_SIZE = 200
+# Concurrent fast_info lookups when fetching share counts
+MAX_WORKERS = 16
+# Share counts rarely change, so each ticker's is kept for a day, for at
+# most this many tickers
+SHARES_TTL = 24 * 60 * 60
+MAX_SHARES = 5000
+
+_shares = OrderedDict()
+_shares_lock = threading.Lock()
+
+
+def parse_tickers(text):
+    tickers = text.replace(",", " ").upper().split()
+    return list(dict.fromkeys(tickers))
+
+
+def download_prices(tickers, period="1y"):
+    # Close and Volume matrices (date x ticker) for the whole universe
+    closes, volumes = [], []
+    for start in range(0, len(tickers), CHUNK_SIZE):
+        chunk = tickers[start:start + CHUNK_SIZE]
+        with upstream_call("yfinance.download"):
+            data = yf.download(chunk, period=period, interval="1d", group_by="column",
+                               threads=True, progress=False, multi_level_index=True)
+        if data is None or data.empty:
+            continue
+        closes.append(data["Close"])
+        volumes.append(data["Volume"])
+
+    if not closes:
+        return pd.DataFrame(), pd.DataFrame()
+    close = pd.concat(closes, axis=1).sort_index()
+    volume = pd.concat(volumes, axis=1).sort_index()
+    # Drop tickers Yahoo returned nothing for
+    listed = close.columns[close.notna().any()]
+    return close[listed], volume[listed]
+
+
+def fetch_shares(tickers):
+    # Shares outstanding per ticker; only tickers without a fresh count are fetched
+    def shares(tickerSymbol):
+        try:
+            with upstream_call("yfinance.fast_info"):
+                return yf.Ticker(tickerSymbol).fast_info.shares
+        except Exception:
+            return None
+
+    now = time.monotonic()
+    with _shares_lock:
+        known = {t: _shares[t][1] for t in tickers if t in _shares and now - _shares[t][0] <= SHARES_TTL}
+        for t in known:
+            _shares.move_to_end(t)
+    missing = [t for t in tickers if t not in known]
+    if missing:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            counts = list(pool.map(shares, missing))
+        known.update(zip(missing, counts))
+        with _shares_lock:
+            for t, count in zip(missing, counts):
+                _shares[t] = (now, count)
+                _shares.move_to_end(t)
+            while len(_shares) > MAX_SHARES:
+                _shares.popitem(last=False)
+
+    return pd.Series([known[t] for t in tickers], index=tickers, dtype=float)
+
+
+def screen(close, volume, shares=None):
+    # One row per ticker with the Home page returns plus size and liquidity
+    if close.empty:
+        return pd.DataFrame()
+
+    # Carry each ticker's last close over dates it did not trade
+    filled = close.ffill()
+    last = filled.iloc[-1]
+
+    # Same windows as the Home page, looked up for every ticker at once
+    positions = filled.index.searchsorted(window_starts(filled.index))
+    base = filled.to_numpy()[np.minimum(positions, len(filled) - 1)]
+    base[positions >= len(filled)] = np.nan
+    returns = pd.DataFrame((last.to_numpy() / base - 1).T * 100, index=close.columns, columns=PERFORMANCE_WINDOWS)
+
+    daily = filled.pct_change(fill_method=None)
+    table = pd.DataFrame({
+        "price": last,
+        "1d": daily.iloc[-1] * 100,
+    })
+    table = table.join(returns)
+    table["volatility"] = daily.tail(20).std() * np.sqrt(252) * 100
+    table["dollarVolume"] = (close * volume).tail(20).mean()
+    # Indicators run down every ticker's column at once
+    table["rsi"] = rsi(filled, SETTINGS["rsi"]).iloc[-1]
+    table["smaGap"] = (last / sma(filled, SETTINGS["sma"]).iloc[-1] - 1) * 100
+    if shares is not None:
+        table["marketCap"] = last * shares.reindex(close.columns)
+    table.index.name = "ticker"
+    return table
@@ -0,0 +1,137 @@
+import hashlib
+import sqlite3
+import threading
+from contextlib import closing
+from functools import lru_cache
+
+import pandas as pd
+
+from config import DATA_DIR
+from workers import process_pool
+
+# News sentiment scoring. Articles are identified by a hash of their text,
+# each hash is scored at most once and the scores are kept on disk, so
+# reruns and other sessions never rescore the same headline.
+CACHE_PATH = DATA_DIR / "sentiment.db"
+SCORE_COLUMNS = ["compound", "polarity", "subjectivity"]
+
+# Backlogs at least this large are scored across the shared worker processes
+PROCESS_POOL_THRESHOLD = 200
+CHUNK_SIZE = 100
+
+_db_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_analyzer():
+    # Loaded once per process; the lexicon is downloaded on first use
+    import nltk
+    from nltk.sentiment import SentimentIntensityAnalyzer
+
+    try:
+        return SentimentIntensityAnalyzer()
+    except LookupError:
+        nltk.download("vader_lexicon", quiet=True)
+        return SentimentIntensityAnalyzer()
+
+
+def score_texts(texts):
+    from textblob import TextBlob
+
+    analyzer = get_analyzer()
+    scores = []
+    for text in texts:
+        blob = TextBlob(text).sentiment
+        scores.append((analyzer.polarity_scores(text)["compound"], blob.polarity, blob.subjectivity))
+    return scores
+
+
+def article_text(article):
+    return f"{article.get('title') or ''}. {article.get('summary') or ''}".strip()
+
+
+def article_hash(text):
+    # Case and whitespace differences do not make a new article
+    return hashlib.sha256(" ".join(text.lower().split()).encode()).hexdigest()
+
+
+def connect():
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS scores ("
+        "hash TEXT PRIMARY KEY, compound REAL, polarity REAL, subjectivity REAL)"
+    )
+    return conn
+
+
+def cached_scores(hashes):
+    if not hashes:
+        return {}
+    with _db_lock, closing(connect()) as conn, conn:
+        found = {}
+        hashes = list(hashes)
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(hashes), 500):
+            batch = hashes[start:start + 500]
+            rows = conn.execute(
+                f"SELECT hash, compound, polarity, subjectivity FROM scores WHERE hash IN ({','.join('?' * len(batch))})",
+                batch,
+            )
+            found.update((row[0], row[1:]) for row in rows)
+    return found
+
+
+def store_scores(scores):
+    with _db_lock, closing(connect()) as conn, conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)",
+            [(h, *values) for h, values in scores.items()],
+        )
+
+
+def score_many(texts):
+    if len(texts) < PROCESS_POOL_THRESHOLD:
+        return score_texts(texts)
+    chunks = [texts[i:i + CHUNK_SIZE] for i in range(0, len(texts), CHUNK_SIZE)]
+    return [score for chunk in process_pool().map(score_texts, chunks) for score in chunk]
+
+
+def score_articles(articles):
+    # One row per unique archived article with its publication time and scores
+    rows = {}
+    for article in articles or []:
+        text = article_text(article)
+        if text == ".":
+            continue
+        h = article_hash(text)
+        if h in rows:
+            continue
+        rows[h] = {
+            "hash": h,
+            "title": article.get("title"),
+            "published": article.get("published"),
+            "text": text,
+        }
+
+    scores = cached_scores(rows)
+    missing = [h for h in rows if h not in scores]
+    if missing:
+        fresh = dict(zip(missing, score_many([rows[h]["text"] for h in missing])))
+        store_scores(fresh)
+        scores.update(fresh)
+
+    frame = pd.DataFrame(list(rows.values()), columns=["hash", "title", "published", "text"])
+    frame["published"] = pd.to_datetime(frame["published"], utc=True, errors="coerce")
+    frame[SCORE_COLUMNS] = pd.DataFrame([scores[h] for h in frame["hash"]], columns=SCORE_COLUMNS, index=frame.index)
+    return frame.drop(columns="text").sort_values("published", ascending=False, ignore_index=True)
+
+
+def bucket_scores(scored, freq="1D"):
+    # Mean score and article count per time bucket
+    if scored.empty:
+        return pd.DataFrame(columns=SCORE_COLUMNS + ["articles"])
+    grouped = scored.dropna(subset=["published"]).set_index("published").resample(freq)
+    buckets = grouped[SCORE_COLUMNS].mean()
+    buckets["articles"] = grouped.size()
+    return buckets[buckets["articles"] > 0]
@@ -0,0 +1,200 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from metrics import count
+
+# Daily news sentiment joined against daily returns. Every statistic is a
+# NumPy operation over whole columns: rolling correlation from windowed
+# cumulative sums, lead/lag correlation and event windows from a sliding
+# view of the return series.
+
+# Trading days in the rolling correlation window
+ROLLING_WINDOW = 20
+# Days with news a window needs before its correlation is shown
+MIN_OBSERVATIONS = 5
+# Lead/lag correlations are shown for returns this many sessions either side
+MAX_LAG = 5
+# Sessions before and after a sentiment event in the event-window average
+EVENT_DAYS = 5
+# Days at or beyond this quantile of sentiment (either tail) are events
+EVENT_QUANTILE = 0.9
+# News published after the 16:00 close counts toward the next session
+AFTER_CLOSE_SHIFT = pd.Timedelta(hours=8)
+MAX_SERIES = 128
+
+COLUMNS = ["sentiment", "articles", "return"]
+
+
+def session_dates(index):
+    # Calendar date of each bar in the exchange's local time
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize()
+
+
+def daily_frame(scored, history):
+    # One row per trading session: mean VADER score of the articles assigned
+    # to it, how many there were, and the session's log return. Sessions
+    # start a little before the first article so lags and event windows
+    # have returns to look back on.
+    if history is None or history.empty or scored.empty:
+        return pd.DataFrame(columns=COLUMNS, dtype=float)
+
+    sessions = session_dates(history.index)
+    close = history["Close"].to_numpy(dtype=float)
+    returns = np.concatenate([[np.nan], np.diff(np.log(close))])
+
+    scored = scored.dropna(subset=["published"])
+    published = pd.DatetimeIndex(scored["published"])
+    if history.index.tz is not None:
+        published = published.tz_convert(history.index.tz)
+    published = published.tz_localize(None)
+
+    # Each article belongs to the first session on or after its (shifted)
+    # date; articles newer than the last bar wait for the next one
+    positions = sessions.searchsorted((published + AFTER_CLOSE_SHIFT).normalize())
+    kept = positions < len(sessions)
+    positions = positions[kept]
+    if not len(positions):
+        return pd.DataFrame(columns=COLUMNS, dtype=float)
+
+    compound = scored["compound"].to_numpy(dtype=float)[kept]
+    articles = np.bincount(positions, minlength=len(sessions))
+    totals = np.bincount(positions, weights=compound, minlength=len(sessions))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sentiment = np.where(articles > 0, totals / articles, np.nan)
+
+    frame = pd.DataFrame({"sentiment": sentiment, "articles": articles, "return": returns}, index=history.index)
+    start = max(positions.min() - max(MAX_LAG, EVENT_DAYS), 0)
+    return frame.iloc[start:]
+
+
+def window_sums(values, window):
+    # Sum of each trailing window (shorter at the start), from one cumsum
+    total = np.concatenate([[0.0], np.cumsum(values)])
+    ends = np.arange(1, len(values) + 1)
+    return total[ends] - total[np.maximum(ends - window, 0)]
+
+
+def rolling_corr(x, y, window, min_periods=MIN_OBSERVATIONS):
+    # Pearson correlation over each trailing window, using only the days
+    # where both series have a value
+    valid = ~(np.isnan(x) | np.isnan(y))
+    x = np.where(valid, x, 0.0)
+    y = np.where(valid, y, 0.0)
+    n = window_sums(valid.astype(float), window)
+    sx, sy = window_sums(x, window), window_sums(y, window)
+    sxx, syy, sxy = window_sums(x * x, window), window_sums(y * y, window), window_sums(x * y, window)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx * sx) * (n * syy - sy * sy)
+        corr = cov / np.sqrt(var)
+    corr[(n < min_periods) | ~(var > 0)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def first_change(old, new):
+    # Position of the first row where two (dates, sentiment, returns) column
+    # triples differ
+    if old is None:
+        return 0
+    n = min(len(old[0]), len(new[0]))
+    if not np.array_equal(old[0][:n], new[0][:n]):
+        return 0
+    differs = np.zeros(n, dtype=bool)
+    for a, b in zip(old[1:], new[1:]):
+        differs |= ~((a[:n] == b[:n]) | (np.isnan(a[:n]) & np.isnan(b[:n])))
+    changed = np.flatnonzero(differs)
+    return int(changed[0]) if len(changed) else n
+
+
+class RollingSentimentCache:
+    # Rolling correlation per ticker and window, kept between reruns and
+    # sessions. An update recomputes only the rows whose window contains a
+    # changed or new day, so a new session (or fresh headlines for today)
+    # costs one window of work instead of the whole series.
+    def __init__(self, max_series=MAX_SERIES):
+        self.series = OrderedDict()
+        self.max_series = max_series
+        self.lock = threading.Lock()
+
+    def rolling(self, tickerSymbol, daily, window=ROLLING_WINDOW):
+        key = (tickerSymbol, window)
+        if daily.empty:
+            # No session has both news and a price (the frame has no dates)
+            return pd.Series(dtype=float, name="correlation")
+        columns = (
+            daily.index.asi8,
+            daily["sentiment"].to_numpy(dtype=float),
+            daily["return"].to_numpy(dtype=float),
+        )
+        with self.lock:
+            old_columns, old_corr = self.series.get(key, (None, None))
+
+        start = first_change(old_columns, columns)
+        begin = max(start - window + 1, 0)
+        fresh = rolling_corr(columns[1][begin:], columns[2][begin:], window)[start - begin:]
+        corr = np.concatenate([old_corr[:start], fresh]) if start else fresh
+        count("sentiment.rolling_days", len(fresh))
+
+        with self.lock:
+            self.series[key] = (columns, corr)
+            self.series.move_to_end(key)
+            while len(self.series) > self.max_series:
+                self.series.popitem(last=False)
+        return pd.Series(corr, index=daily.index, name="correlation")
+
+
+def return_windows(returns, before, after):
+    # Row t holds the returns from t - before to t + after (NaN past the ends)
+    padded = np.concatenate([np.full(before, np.nan), returns, np.full(after, np.nan)])
+    return sliding_window_view(padded, before + after + 1)
+
+
+def lead_lag(daily, max_lag=MAX_LAG):
+    # Correlation of each day's sentiment with the return `lag` sessions
+    # later; negative lags look at the returns that preceded the news
+    if daily.empty:
+        return pd.DataFrame({"correlation": np.nan, "days": 0}, index=pd.RangeIndex(-max_lag, max_lag + 1, name="lag"))
+    sentiment = daily["sentiment"].to_numpy(dtype=float)[:, None]
+    returns = return_windows(daily["return"].to_numpy(dtype=float), max_lag, max_lag)
+    valid = ~(np.isnan(sentiment) | np.isnan(returns))
+    x = np.where(valid, sentiment, 0.0)
+    y = np.where(valid, returns, 0.0)
+
+    n = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mx = x.sum(axis=0) / n
+        my = y.sum(axis=0) / n
+        cov = (x * y).sum(axis=0) / n - mx * my
+        var = ((x * x).sum(axis=0) / n - mx * mx) * ((y * y).sum(axis=0) / n - my * my)
+        corr = np.where((n >= MIN_OBSERVATIONS) & (var > 0), cov / np.sqrt(var), np.nan)
+    return pd.DataFrame({"correlation": corr, "days": n}, index=pd.RangeIndex(-max_lag, max_lag + 1, name="lag"))
+
+
+def event_windows(daily, days=EVENT_DAYS, quantile=EVENT_QUANTILE):
+    # Average cumulative return around the most positive and most negative
+    # news days, measured from the close before the event session
+    sentiment = daily["sentiment"].to_numpy(dtype=float)
+    offsets = pd.RangeIndex(-days, days + 1, name="session")
+    result = pd.DataFrame(index=offsets, columns=["positive", "negative"], dtype=float)
+    events = {"positive": 0, "negative": 0}
+    scored = sentiment[~np.isnan(sentiment)]
+    if not len(scored):
+        return result, events
+
+    cumulative = np.cumsum(np.nan_to_num(return_windows(daily["return"].to_numpy(dtype=float), days, days)), axis=1)
+    cumulative -= cumulative[:, [days - 1]] if days else 0.0
+    high, low = np.quantile(scored, [quantile, 1 - quantile])
+    with np.errstate(invalid="ignore"):
+        masks = {"positive": (sentiment >= high) & (sentiment > 0), "negative": (sentiment <= low) & (sentiment < 0)}
+    for name, mask in masks.items():
+        events[name] = int(mask.sum())
+        if events[name]:
+            result[name] = np.expm1(cumulative[mask].mean(axis=0)) * 100
+    return result, events
@@ -0,0 +1,111 @@
+import asyncio
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import closing
+
+from config import DATA_DIR
+
+# LLM summaries of news articles and SEC filings from a local Ollama server.
+# Documents are summarized concurrently (bounded by a semaphore), tokens are
+# handed to the caller as they stream in, and finished answers are cached by
+# (model, prompt, document hash) so a document is only ever summarized once.
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434")
+OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "llama3.2")
+MAX_CONCURRENCY = 4
+# Seconds to wait on the server (connecting, or between streamed tokens)
+# before a document's summary is given up on
+REQUEST_TIMEOUT = 60
+# Long filings are cut to keep prompts within a small model's context
+MAX_DOCUMENT_CHARS = 12_000
+
+CACHE_PATH = DATA_DIR / "summaries.db"
+
+NEWS_PROMPT = "Summarize this news article about {ticker} in two sentences for an investor."
+FILING_PROMPT = "Summarize the key points of this SEC filing from {ticker} for an investor in a few short bullet points."
+
+_db_lock = threading.Lock()
+
+
+def cache_key(model, prompt, document):
+    document_hash = hashlib.sha256(document.encode()).hexdigest()
+    return hashlib.sha256(f"{model}\0{prompt}\0{document_hash}".encode()).hexdigest()
+
+
+def connect():
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH, timeout=30)
+    conn.execute("CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, summary TEXT)")
+    return conn
+
+
+def cached_summary(key):
+    with _db_lock, closing(connect()) as conn:
+        row = conn.execute("SELECT summary FROM summaries WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def store_summary(key, summary):
+    with _db_lock, closing(connect()) as conn, conn:
+        conn.execute("INSERT OR REPLACE INTO summaries VALUES (?, ?)", (key, summary))
+
+
+async def summarize_one(llm, semaphore, index, prompt, document, emit):
+    document = document[:MAX_DOCUMENT_CHARS]
+    key = cache_key(llm.model, prompt, document)
+    cached = await asyncio.to_thread(cached_summary, key)
+    if cached is not None:
+        emit(index, cached)
+        return cached
+
+    async with semaphore:
+        parts = []
+        try:
+            async for chunk in llm.astream([("system", prompt), ("human", document)]):
+                parts.append(chunk.content)
+                emit(index, chunk.content)
+        except Exception as exc:
+            # One failed document should not sink the rest of the batch
+            emit(index, f"Summary unavailable ({exc.__class__.__name__}).")
+            return None
+
+    summary = "".join(parts)
+    await asyncio.to_thread(store_summary, key, summary)
+    return summary
+
+
+async def summarize_all(documents, prompt, emit, model=OLLAMA_MODEL, base_url=OLLAMA_URL,
+                        concurrency=MAX_CONCURRENCY, timeout=REQUEST_TIMEOUT):
+    from langchain_ollama import ChatOllama
+
+    llm = ChatOllama(model=model, base_url=base_url, client_kwargs={"timeout": timeout})
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(
+        summarize_one(llm, semaphore, index, prompt, document, emit)
+        for index, document in enumerate(documents)
+    ))
+
+
+def stream_summaries(documents, prompt, **kwargs):
+    # Runs the batch on its own event loop in a worker thread and yields
+    # (document index, text chunk) pairs on the caller's thread, which is
+    # where Streamlit elements have to be updated from
+    events = queue.Queue()
+    finished = object()
+    errors = []
+
+    def run():
+        try:
+            asyncio.run(summarize_all(documents, prompt, lambda index, text: events.put((index, text)), **kwargs))
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            events.put(finished)
+
+    threading.Thread(target=run, daemon=True).start()
+    while (event := events.get()) is not finished:
+        yield event
+    if errors:
+        raise errors[0]
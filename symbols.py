@@ -0,0 +1,175 @@
+import bisect
+import re
+from collections import defaultdict
+
+# Local directory of listed symbols (ticker, company name, exchange) built
+# from SEC's company_tickers_exchange.json. Tickers are indexed by a prefix
+# trie and company names by word prefixes plus trigrams for typos, so
+# autocomplete and validation never touch the network.
+TICKERS_EXCHANGE_PATH = "/files/company_tickers_exchange.json"
+MAX_SUGGESTIONS = 8
+# Minimum trigram overlap (Jaccard) for a misspelled word to still match
+FUZZY_CUTOFF = 0.4
+
+WORD = re.compile(r"[a-z0-9]+")
+# Words that say nothing about which company is meant
+STOPWORDS = {
+    "inc", "corp", "corporation", "co", "company", "ltd", "limited", "plc", "the",
+    "holdings", "group", "sa", "nv", "ag", "se", "llc", "lp", "class", "of", "and",
+}
+
+
+# Yahoo suffixes of exchanges outside the US, which the SEC list never has
+EXCHANGE_SUFFIXES = {
+    "TO", "V", "NE", "CN", "L", "IL", "PA", "DE", "F", "AS", "BR", "MI", "MC",
+    "SW", "ST", "OL", "CO", "HE", "IR", "VI", "LS", "WA", "AT", "T", "HK", "SS",
+    "SZ", "TW", "TWO", "KS", "KQ", "AX", "NZ", "SI", "NS", "BO", "JK", "KL",
+    "BK", "SA", "MX", "JO", "TA",
+}
+# Symbol shapes the SEC list cannot contain: indexes (^GSPC), currencies and
+# futures (EURUSD=X, ES=F), crypto pairs (BTC-USD) and foreign listings
+# (RY.TO, 7203.T). Anything else missing from the list is treated as a typo.
+NON_SEC_SYMBOL = re.compile(
+    r"\^[A-Z0-9.\-]{1,10}"
+    r"|[A-Z0-9.\-]{1,12}=[XF]"
+    r"|[A-Z0-9]{2,10}-(USD|USDT|USDC|EUR|GBP|JPY|BTC|ETH)"
+    r"|[A-Z0-9][A-Z0-9\-]{0,9}\.(?P<suffix>[A-Z]{1,3})"
+)
+
+
+def normalize_symbol(text):
+    return text.strip().upper()
+
+
+def non_sec_symbol(symbol):
+    match = NON_SEC_SYMBOL.fullmatch(symbol)
+    return match is not None and match["suffix"] in (None, *EXCHANGE_SUFFIXES)
+
+
+def directory_key(symbol):
+    # Yahoo and SEC both write share classes with a dash (BRK-B); a dot or
+    # slash (BRK.B, BRK/B) only means the same thing for listed symbols
+    return normalize_symbol(symbol).replace(".", "-").replace("/", "-")
+
+
+def name_words(name):
+    words = WORD.findall(name.lower())
+    return [w for w in words if w not in STOPWORDS] or words
+
+
+def trigrams(word):
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrieNode:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children = {}
+        # Best completions below this node, in rank order
+        self.top = []
+
+
+class SymbolDirectory:
+    def __init__(self, entries, limit=MAX_SUGGESTIONS):
+        # entries: dicts with ticker, name and exchange, most relevant first
+        self.entries = []
+        self.by_ticker = {}
+        self.limit = limit
+        self.root = TrieNode()
+        words = defaultdict(list)
+
+        for entry in entries:
+            ticker = directory_key(entry["ticker"])
+            if not ticker or ticker in self.by_ticker:
+                continue
+            rank = len(self.entries)
+            self.entries.append({"ticker": ticker, "name": entry["name"], "exchange": entry.get("exchange") or ""})
+            self.by_ticker[ticker] = rank
+
+            node = self.root
+            for char in ticker:
+                node = node.children.setdefault(char, TrieNode())
+                if len(node.top) < limit:
+                    node.top.append(rank)
+
+            for word in set(name_words(entry["name"])):
+                words[word].append(rank)
+
+        self.words = dict(words)
+        self.vocabulary = sorted(self.words)
+        self.word_trigrams = defaultdict(list)
+        self.trigram_counts = {}
+        for word in self.vocabulary:
+            grams = trigrams(word)
+            self.trigram_counts[word] = len(grams)
+            for gram in grams:
+                self.word_trigrams[gram].append(word)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, symbol):
+        return directory_key(symbol) in self.by_ticker
+
+    def lookup(self, symbol):
+        rank = self.by_ticker.get(directory_key(symbol))
+        return None if rank is None else self.entries[rank]
+
+    def complete(self, prefix, limit=None):
+        # Tickers starting with prefix, most relevant first
+        node = self.root
+        for char in directory_key(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return [self.entries[rank] for rank in node.top[:limit or self.limit]]
+
+    def matching_words(self, word):
+        # Vocabulary words starting with `word`; longer words that match
+        # nothing fall back to close spellings
+        if len(word) < 2:
+            return [word] if word in self.words else []
+        start = bisect.bisect_left(self.vocabulary, word)
+        end = bisect.bisect_left(self.vocabulary, word + "\uffff")
+        if start < end or len(word) < 4:
+            return self.vocabulary[start:end]
+
+        grams = trigrams(word)
+        overlap = defaultdict(int)
+        for gram in grams:
+            for candidate in self.word_trigrams.get(gram, ()):
+                overlap[candidate] += 1
+        return [
+            candidate for candidate, shared in overlap.items()
+            if shared / (len(grams) + self.trigram_counts[candidate] - shared) >= FUZZY_CUTOFF
+        ]
+
+    def search_names(self, query, limit=None):
+        # Companies whose name matches every word of the query
+        ranks = None
+        for word in name_words(query):
+            matched = set()
+            for candidate in self.matching_words(word):
+                matched.update(self.words[candidate])
+            ranks = matched if ranks is None else ranks & matched
+            if not ranks:
+                return []
+        return [self.entries[rank] for rank in sorted(ranks or ())[:limit or self.limit]]
+
+    def suggest(self, query, limit=None):
+        # Ticker completions first, then company-name matches
+        limit = limit or self.limit
+        suggestions = {}
+        for entry in self.complete(query, limit) + self.search_names(query, limit):
+            suggestions.setdefault(entry["ticker"], entry)
+        return list(suggestions.values())[:limit]
+
+
+def load_directory(client, ttl):
+    # Rows come ordered roughly by company size, which doubles as the ranking
+    data = client.get_json(f"{client.www_url}{TICKERS_EXCHANGE_PATH}", ttl)
+    fields = data["fields"]
+    rows = (dict(zip(fields, row)) for row in data["data"])
+    return SymbolDirectory(row for row in rows if row.get("ticker") and row.get("name"))
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest
+from backtest import parameter_grid, sweep
+from workers import process_pool
+
+COST_BPS = 10.0
+
+
+def random_prices(seed=21, days=300):
+    # Random walks, one of them listing partway through
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0004, 0.015, (days, 3))
+    close = pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), columns=["AAA", "BBB", "CCC"],
+                         index=pd.bdate_range("2023-01-02", periods=days))
+    close.iloc[:60, 2] = np.nan
+    return close
+
+
+def ma_positions(close, fast, slow):
+    return (close.rolling(fast).mean() > close.rolling(slow).mean()).astype(float)
+
+
+def reversion_positions(close, lookback, entry):
+    z = (close - close.rolling(lookback).mean()) / close.rolling(lookback).std(ddof=0)
+    return (z < -entry).astype(float)
+
+
+def loop_stats(close, positions, cost_bps):
+    # One ticker at a time: hold yesterday's position through today's return
+    # and pay for every change in position
+    daily = close.pct_change().fillna(0).to_numpy()[1:]
+    weights = positions.to_numpy()
+    turnover = np.abs(np.diff(weights, prepend=0.0))[:-1]
+    returns = weights[:-1] * daily - turnover * cost_bps / 10_000
+    days = close.notna().to_numpy()[1:].sum()
+    equity = np.cumprod(1 + returns)
+    mean = returns.sum() / days
+    std = np.sqrt((returns * returns).sum() / days - mean * mean)
+    return {
+        "totalReturn": (equity[-1] - 1) * 100,
+        "sharpe": mean / std * np.sqrt(252),
+        "maxDrawdown": (equity / np.maximum.accumulate(equity) - 1).min() * 100,
+        "trades": (turnover > 0).sum(),
+        "exposure": (weights[:-1] != 0).sum() / days * 100,
+    }
+
+
+@pytest.mark.parametrize("strategy, positions, ranges", [
+    ("Moving-average crossover", ma_positions, {"fast": (5, 10, 20), "slow": (30, 50)}),
+    ("Mean reversion", reversion_positions, {"lookback": (10, 20), "entry": (1.0, 1.5)}),
+])
+@pytest.mark.parametrize("cost_bps", [0.0, COST_BPS])
+def test_sweep_matches_a_per_ticker_loop(strategy, positions, ranges, cost_bps):
+    prices = random_prices()
+    grid = parameter_grid(strategy, ranges)
+    stats = sweep(prices, strategy, grid, cost_bps)
+    assert len(stats) == len(grid) * prices.shape[1]
+
+    for row in stats.to_dict("records"):
+        params = {name: row[name] for name in ranges}
+        close = prices[row["ticker"]]
+        expected = loop_stats(close, positions(close, **params), cost_bps)
+        for column, value in expected.items():
+            assert row[column] == pytest.approx(value, rel=1e-9, abs=1e-9), (params, row["ticker"], column)
+
+
+def test_costs_lower_returns_by_the_traded_amount():
+    prices = random_prices(seed=5)
+    grid = parameter_grid("Moving-average crossover", {"fast": (10,), "slow": (40,)})
+    free = sweep(prices, "Moving-average crossover", grid, 0.0).set_index("ticker")
+    costly = sweep(prices, "Moving-average crossover", grid, COST_BPS).set_index("ticker")
+    assert (costly["trades"] == free["trades"]).all()
+    assert (costly.loc[free["trades"] > 0, "totalReturn"] < free.loc[free["trades"] > 0, "totalReturn"]).all()
+
+
+def test_worker_processes_match_in_process_sweeps(monkeypatch):
+    # Two different universes through the same long-lived pool: each sweep's
+    # matrix replaces the one the workers loaded before
+    grid = parameter_grid("Moving-average crossover", {"fast": (5, 10, 20), "slow": (30, 50, 100)})
+    expected = [sweep(random_prices(seed), "Moving-average crossover", grid, COST_BPS) for seed in (1, 2)]
+    monkeypatch.setattr(backtest, "PROCESS_POOL_THRESHOLD", 0)
+    monkeypatch.setattr(backtest, "CHUNK_SIZE", 2)
+    monkeypatch.setattr(backtest.os, "cpu_count", lambda: 2)
+
+    pool = process_pool()
+    for seed, stats in zip((1, 2), expected):
+        pd.testing.assert_frame_equal(sweep(random_prices(seed), "Moving-average crossover", grid, COST_BPS), stats)
+    assert process_pool() is pool
@@ -0,0 +1,117 @@
+import time
+
+import pytest
+import requests
+
+from edgar import EdgarClient
+
+COMPANIES = {"0": {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."}}
+
+
+@pytest.fixture
+def client(stand_in, tmp_path):
+    def make(**kwargs):
+        return EdgarClient(www_url=stand_in.url, data_url=stand_in.url, cache_dir=tmp_path / "edgar", **kwargs)
+
+    return make
+
+
+def test_fresh_disk_cache_is_served_without_a_request(stand_in, client):
+    stand_in.route("/files/company_tickers.json", lambda request: (200, {}, COMPANIES))
+
+    assert client().get_json(f"{stand_in.url}/files/company_tickers.json", ttl=60) == COMPANIES
+    # A new client (a new process) reads the same cache directory
+    assert client().get_json(f"{stand_in.url}/files/company_tickers.json", ttl=60) == COMPANIES
+    assert len(stand_in.hits("/files/company_tickers.json")) == 1
+
+
+def test_stale_entry_is_revalidated_with_its_etag(stand_in, client):
+    def companies(request):
+        if request["headers"].get("If-None-Match") == '"v1"':
+            return 304, {}, b""
+        return 200, {"ETag": '"v1"'}, COMPANIES
+
+    stand_in.route("/files/company_tickers.json", companies)
+    edgar = client()
+    url = f"{stand_in.url}/files/company_tickers.json"
+
+    assert edgar.get_json(url, ttl=0) == COMPANIES
+    assert edgar.get_json(url, ttl=0) == COMPANIES
+    hits = stand_in.hits("/files/company_tickers.json")
+    assert len(hits) == 2
+    assert hits[1]["headers"].get("If-None-Match") == '"v1"'
+
+
+def test_server_errors_are_retried_with_backoff(stand_in, client):
+    statuses = [503, 503, 200]
+    stand_in.route("/flaky", lambda request: (statuses.pop(0), {}, {"ok": True}))
+
+    start = time.monotonic()
+    assert client().get_json(f"{stand_in.url}/flaky", ttl=60) == {"ok": True}
+    assert len(stand_in.hits("/flaky")) == 3
+    # Retry(backoff_factor=0.5) sleeps before the second retry
+    assert time.monotonic() - start >= 0.5
+
+
+def test_exhausted_retries_fall_back_to_the_stale_copy(stand_in, client):
+    statuses = [200, 503, 503, 503, 503]
+    stand_in.route("/flaky", lambda request: (statuses.pop(0), {}, {"version": 1}))
+    edgar = client()
+
+    assert edgar.get_json(f"{stand_in.url}/flaky", ttl=0) == {"version": 1}
+    assert edgar.get_json(f"{stand_in.url}/flaky", ttl=0) == {"version": 1}
+    assert len(stand_in.hits("/flaky")) == 5
+
+
+def test_exhausted_retries_without_a_copy_raise(stand_in, client):
+    stand_in.route("/down", lambda request: (503, {}, b""))
+
+    with pytest.raises(requests.RequestException):
+        client().get_json(f"{stand_in.url}/down", ttl=60)
+
+
+def test_requests_are_rate_limited(stand_in, client):
+    stand_in.route("/files/company_tickers.json", lambda request: (200, {}, COMPANIES))
+    edgar = client(rate=20)
+
+    start = time.monotonic()
+    for i in range(30):
+        edgar.get_json(f"{stand_in.url}/files/company_tickers.json?page={i}", ttl=60)
+    # A burst of 20, then the remaining 10 at 20 per second
+    assert time.monotonic() - start >= 0.45
+    assert len(stand_in.hits("/files/company_tickers.json")) == 30
+
+
+def test_recent_filings_link_into_the_archive(stand_in, client):
+    stand_in.route("/files/company_tickers.json", lambda request: (200, {}, COMPANIES))
+    stand_in.route("/submissions/CIK0000320193.json", lambda request: (200, {}, {"filings": {"recent": {
+        "form": ["10-K"],
+        "accessionNumber": ["0000320193-25-000079"],
+        "primaryDocument": ["aapl-20250927.htm"],
+        "primaryDocDescription": ["Annual report"],
+        "filingDate": ["2025-10-31"],
+    }}}))
+
+    filings = client().recent_filings("aapl")
+    assert filings == [{
+        "form": "10-K",
+        "description": "Annual report",
+        "date": "2025-10-31",
+        "url": f"{stand_in.url}/Archives/edgar/data/320193/000032019325000079/aapl-20250927.htm",
+    }]
+    assert client().recent_filings("NOPE") == []
+
+
+def test_cik_index_follows_the_refreshed_tickers_file(stand_in, client, monkeypatch):
+    listed = dict(COMPANIES)
+    stand_in.route("/files/company_tickers.json", lambda request: (200, {}, listed))
+    monkeypatch.setattr("edgar.TICKERS_TTL", 0.3)
+    edgar = client()
+
+    assert edgar.lookup_cik("AAPL") == "0000320193"
+    # A company listed after the index was built shows up once the file expires
+    listed["1"] = {"cik_str": 2012383, "ticker": "NEWCO", "title": "NewCo Inc."}
+    assert edgar.lookup_cik("NEWCO") is None
+    time.sleep(0.35)
+    assert edgar.lookup_cik("NEWCO") == "0002012383"
+    assert len(stand_in.hits("/files/company_tickers.json")) == 2
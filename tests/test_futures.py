@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from futures import continuous, last_trade_dates
+
+
+# Published last trading days of contracts whose expiry is not moved by a
+# holiday (the rules run on a Monday-Friday calendar)
+@pytest.mark.parametrize("rule, month, expected", [
+    ("third_friday", "2024-12", "2024-12-20"),
+    ("third_friday", "2025-03", "2025-03-21"),
+    ("third_friday", "2025-06", "2025-06-20"),
+    ("nikkei", "2025-03", "2025-03-13"),
+    ("nikkei", "2025-06", "2025-06-12"),
+    ("vix", "2025-01", "2025-01-22"),
+    ("vix", "2025-02", "2025-02-19"),
+    # The 25th falls on a Saturday: three days before the Friday
+    ("crude", "2025-02", "2025-01-21"),
+    ("crude", "2025-03", "2025-02-20"),
+    ("metal", "2025-02", "2025-02-26"),
+    ("metal", "2025-03", "2025-03-27"),
+    ("hang_seng", "2025-03", "2025-03-28"),
+    ("hang_seng", "2025-06", "2025-06-27"),
+])
+def test_last_trade_dates(rule, month, expected):
+    dates = last_trade_dates(rule, np.array([month], dtype="datetime64[M]"))
+    assert dates[0] == np.datetime64(expected)
+
+
+def test_unknown_rule():
+    with pytest.raises(ValueError):
+        last_trade_dates("lunar", np.array(["2025-01"], dtype="datetime64[M]"))
+
+
+def board_and_close(seed=24):
+    # Three consecutive contracts in contango, each listed the whole time
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2025-01-02", periods=120)
+    symbols = ["CLH25.NYM", "CLM25.NYM", "CLU25.NYM"]
+    common = np.cumsum(rng.normal(0, 0.8, len(dates)))
+    close = pd.DataFrame({
+        symbol: 70 + 1.5 * i + common + np.cumsum(rng.normal(0, 0.2, len(dates)))
+        for i, symbol in enumerate(symbols)
+    }, index=dates)
+    board = pd.DataFrame({"roll": [dates[35], dates[80], dates[-1] + pd.Timedelta(days=90)]}, index=pd.Index(symbols, name="contract"))
+    return board, close
+
+
+def held_changes(close, series):
+    # Each day's change in the contract held from the previous close
+    held = series["contract"].to_numpy()[:-1]
+    rows = np.arange(1, len(series))
+    columns = close.columns.get_indexer(held)
+    values = close.to_numpy()
+    return values[rows, columns], values[rows - 1, columns]
+
+
+@pytest.mark.parametrize("method", ["difference", "ratio"])
+def test_continuous_changes_are_the_held_contracts(method):
+    board, close = board_and_close()
+    series = continuous(board, close, method)
+    assert list(series["contract"].unique()) == list(board.index)
+
+    today, yesterday = held_changes(close, series)
+    adjusted = series["close"].to_numpy()
+    if method == "difference":
+        np.testing.assert_allclose(np.diff(adjusted), today - yesterday, atol=1e-9)
+    else:
+        np.testing.assert_allclose(adjusted[1:] / adjusted[:-1], today / yesterday, rtol=1e-12)
+    # The last contract is not adjusted
+    last = series["contract"] == board.index[-1]
+    np.testing.assert_allclose(series.loc[last, "close"], series.loc[last, "raw"])
+
+
+def test_rolls_happen_on_the_roll_dates():
+    board, close = board_and_close()
+    series = continuous(board, close)
+    switches = series.index[1:][series["contract"].to_numpy()[1:] != series["contract"].to_numpy()[:-1]]
+    # Each date is on the first contract whose roll date is after it, so
+    # the next contract takes over on the roll date itself
+    assert list(switches) == list(board["roll"].iloc[:2])
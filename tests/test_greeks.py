@@ -0,0 +1,115 @@
+import math
+
+import numpy as np
+import pytest
+from scipy.optimize import brentq
+
+from greeks import MAX_VOL, MIN_VOL, black_scholes_greeks, black_scholes_price, implied_volatility
+
+R = 0.045
+Q = 0.01
+S = 100.0
+
+
+def norm_cdf(x):
+    return 0.5 * math.erfc(-x / math.sqrt(2))
+
+
+def norm_pdf(x):
+    return math.exp(-0.5 * x * x) / math.sqrt(2 * math.pi)
+
+
+def scalar_price(S, K, T, r, sigma, is_call, q):
+    # Textbook Black-Scholes, one contract at a time
+    d1 = (math.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
+    d2 = d1 - sigma * math.sqrt(T)
+    if is_call:
+        return S * math.exp(-q * T) * norm_cdf(d1) - K * math.exp(-r * T) * norm_cdf(d2)
+    return K * math.exp(-r * T) * norm_cdf(-d2) - S * math.exp(-q * T) * norm_cdf(-d1)
+
+
+def scalar_greeks(S, K, T, r, sigma, is_call, q):
+    d1 = (math.log(S / K) + (r - q + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
+    d2 = d1 - sigma * math.sqrt(T)
+    disc_q, disc_r = math.exp(-q * T), math.exp(-r * T)
+    if is_call:
+        delta = disc_q * norm_cdf(d1)
+        theta = -S * disc_q * norm_pdf(d1) * sigma / (2 * math.sqrt(T)) - r * K * disc_r * norm_cdf(d2) + q * S * disc_q * norm_cdf(d1)
+        rho = K * T * disc_r * norm_cdf(d2)
+    else:
+        delta = -disc_q * norm_cdf(-d1)
+        theta = -S * disc_q * norm_pdf(d1) * sigma / (2 * math.sqrt(T)) + r * K * disc_r * norm_cdf(-d2) - q * S * disc_q * norm_cdf(-d1)
+        rho = -K * T * disc_r * norm_cdf(-d2)
+    return {
+        "delta": delta,
+        "gamma": disc_q * norm_pdf(d1) / (S * sigma * math.sqrt(T)),
+        "vega": S * disc_q * norm_pdf(d1) * math.sqrt(T) / 100,
+        "theta": theta / 365,
+        "rho": rho / 100,
+    }
+
+
+@pytest.fixture
+def contracts():
+    rng = np.random.default_rng(6)
+    n = 2000
+    return (
+        rng.uniform(40, 200, n),       # strike
+        rng.uniform(1 / 365, 2, n),    # years to expiry
+        rng.uniform(0.05, 1.5, n),     # volatility
+        rng.random(n) < 0.5,           # call?
+    )
+
+
+def test_prices_and_greeks_match_scalar_reference(contracts):
+    K, T, sigma, is_call = contracts
+    prices = black_scholes_price(S, K, T, R, sigma, is_call, Q)
+    greeks = black_scholes_greeks(S, K, T, R, sigma, is_call, Q)
+
+    for i in range(len(K)):
+        args = (S, K[i], T[i], R, sigma[i], bool(is_call[i]), Q)
+        assert prices[i] == pytest.approx(scalar_price(*args), rel=1e-9, abs=1e-9)
+        for name, value in scalar_greeks(*args).items():
+            assert greeks[name][i] == pytest.approx(value, rel=1e-9, abs=1e-9), name
+
+
+def test_implied_volatility_matches_scalar_brent(contracts):
+    K, T, sigma, is_call = contracts
+    prices = black_scholes_price(S, K, T, R, sigma, is_call, Q)
+    vega = black_scholes_greeks(S, K, T, R, sigma, is_call, Q)["vega"] * 100
+    solved = implied_volatility(prices, S, K, T, R, is_call, Q)
+
+    # Contracts whose price still moves with volatility must all solve; the
+    # solver stops once the price is within 1e-6, so the volatility is
+    # within about 1e-6 / vega of the root
+    priced = vega > 1e-2
+    assert np.isfinite(solved[priced]).all()
+    for i in np.flatnonzero(priced):
+        reference = brentq(lambda s: scalar_price(S, K[i], T[i], R, s, bool(is_call[i]), Q) - prices[i],
+                           MIN_VOL, MAX_VOL, xtol=1e-14)
+        assert abs(solved[i] - reference) <= 2e-6 / vega[i] + 1e-9
+
+
+def test_low_vega_contracts_solve_to_a_repricing_vol_or_give_up(contracts):
+    K, T, sigma, is_call = contracts
+    prices = black_scholes_price(S, K, T, R, sigma, is_call, Q)
+    vega = black_scholes_greeks(S, K, T, R, sigma, is_call, Q)["vega"] * 100
+    solved = implied_volatility(prices, S, K, T, R, is_call, Q)
+
+    flat = vega <= 1e-2
+    assert flat.sum() > 0
+    # Where the price barely depends on volatility any vol that reprices
+    # is as good as another; the rest come back NaN rather than wrong
+    found = flat & np.isfinite(solved)
+    repriced = black_scholes_price(S, K[found], T[found], R, solved[found], is_call[found], Q)
+    assert (np.abs(repriced - prices[found]) < 1e-6).all()
+    assert np.isnan(solved[flat & ~found]).all()
+
+
+def test_prices_outside_no_arbitrage_bounds_have_no_volatility():
+    K = np.array([100.0, 100.0, 100.0, 100.0])
+    T = np.array([0.5, 0.5, 0.5, 0.0])
+    is_call = np.array([True, True, False, True])
+    # Below intrinsic, above the discounted spot, NaN, and expired
+    prices = np.array([0.0, 150.0, np.nan, 5.0])
+    assert np.isnan(implied_volatility(prices, S, K, T, R, is_call, Q)).all()
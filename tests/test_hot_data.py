@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from hot_data import HotDataCache
+
+TTL = 0.3
+MAX_STALE = 1.0
+
+
+class Upstream:
+    # Numbered responses; `gate` holds fetches back until it is set
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def fetch(self, tickerSymbol):
+        self.gate.wait(5)
+        self.calls.append(tickerSymbol)
+        return f"{tickerSymbol}#{len(self.calls)}"
+
+
+@pytest.fixture
+def cache():
+    upstream = Upstream()
+    # A scheduler that never wakes up during a test
+    cache = HotDataCache(tick=3600)
+    cache.register("quote", upstream.fetch, TTL, max_stale=MAX_STALE)
+    return cache, upstream
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_fresh_entry_is_served_from_memory(cache):
+    cache, upstream = cache
+    assert cache.get("quote", "AAPL") == "AAPL#1"
+    assert cache.get("quote", "AAPL") == "AAPL#1"
+    assert upstream.calls == ["AAPL"]
+
+
+def test_stale_entry_is_served_while_it_refreshes(cache):
+    cache, upstream = cache
+    cache.get("quote", "AAPL")
+    time.sleep(TTL + 0.05)
+
+    upstream.gate.clear()
+    start = time.monotonic()
+    assert cache.get("quote", "AAPL") == "AAPL#1"
+    assert time.monotonic() - start < 0.2
+    # Further reads during the refresh neither wait nor queue another one
+    assert cache.get("quote", "AAPL") == "AAPL#1"
+    upstream.gate.set()
+
+    wait_for(lambda: cache.get("quote", "AAPL") == "AAPL#2")
+    assert upstream.calls == ["AAPL", "AAPL"]
+
+
+def test_entry_past_max_stale_is_fetched_synchronously(cache):
+    cache, upstream = cache
+    cache.get("quote", "AAPL")
+    time.sleep(MAX_STALE + 0.05)
+
+    assert cache.get("quote", "AAPL") == "AAPL#2"
+    assert upstream.calls == ["AAPL", "AAPL"]
+
+
+def test_failed_background_refresh_keeps_the_stale_entry(cache):
+    cache, upstream = cache
+    cache.get("quote", "AAPL")
+    time.sleep(TTL + 0.05)
+
+    def down(tickerSymbol):
+        upstream.calls.append(tickerSymbol)
+        raise ConnectionError("upstream down")
+
+    cache.datasets["quote"].fetch = down
+    assert cache.get("quote", "AAPL") == "AAPL#1"
+    wait_for(lambda: not cache.refreshing)
+    assert cache.get("quote", "AAPL") == "AAPL#1"
+
+
+def test_only_viewed_tickers_are_kept_warm(cache):
+    cache, upstream = cache
+    for tickerSymbol in ["AAPL", "MSFT"]:
+        cache.get("quote", tickerSymbol)
+    # Loader calls alone do not make a ticker popular; page views do
+    assert cache.hot() == set()
+    for _ in range(3):
+        cache.touch("AAPL")
+    assert cache.hot() == {"AAPL"}
+
+    time.sleep(TTL)
+    assert cache.refresh_hot() == [("quote", ("AAPL",))]
+    wait_for(lambda: len(upstream.calls) == 3)
+    assert upstream.calls[-1] == "AAPL"
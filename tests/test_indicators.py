@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+from indicators import IndicatorCache, compute
+
+
+def random_history(seed=22, bars=400):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    spread = close * rng.uniform(0.001, 0.02, bars)
+    return pd.DataFrame({
+        "Open": close + rng.normal(0, 0.2, bars),
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(1_000, 100_000, bars).astype(float),
+    }, index=pd.date_range("2024-01-02 09:30", periods=bars, freq="5min", tz="America/New_York"))
+
+
+@pytest.fixture
+def full_computes(monkeypatch):
+    # Counts the cache's from-scratch computations
+    calls = []
+
+    def counted(history, settings=indicators.SETTINGS):
+        calls.append(len(history))
+        return compute(history, settings)
+
+    monkeypatch.setattr(indicators, "compute", counted)
+    return calls
+
+
+def check(frame, history):
+    pd.testing.assert_frame_equal(frame, compute(history), check_exact=False, rtol=1e-9, atol=1e-9, check_freq=False)
+
+
+def test_appended_bars_are_computed_incrementally(full_computes):
+    history = random_history()
+    cache = IndicatorCache()
+    check(cache.indicators("AAPL", history.iloc[:300]), history.iloc[:300])
+
+    for end in range(301, len(history) + 1, 7):
+        check(cache.indicators("AAPL", history.iloc[:end]), history.iloc[:end])
+    assert full_computes == [300]
+
+
+def test_revised_last_bar_replaces_it(full_computes):
+    history = random_history()
+    cache = IndicatorCache()
+    cache.indicators("AAPL", history.iloc[:300])
+
+    # The partial bar moves before it closes, then the next bars arrive
+    revised = history.iloc[:300].copy()
+    revised.iloc[-1, revised.columns.get_indexer(["High", "Close", "Volume"])] *= [1.01, 1.005, 1.5]
+    check(cache.indicators("AAPL", revised), revised)
+    grown = pd.concat([revised, history.iloc[300:320]])
+    check(cache.indicators("AAPL", grown), grown)
+    assert full_computes == [300]
+
+
+def test_rewritten_history_resets_the_state(full_computes):
+    history = random_history()
+    cache = IndicatorCache()
+    cache.indicators("AAPL", history)
+
+    # A split or dividend re-adjusts every earlier close
+    adjusted = history.copy()
+    adjusted[["Open", "High", "Low", "Close"]] *= 0.5
+    check(cache.indicators("AAPL", adjusted), adjusted)
+    # So does a history that lost bars
+    check(cache.indicators("AAPL", adjusted.iloc[:-10]), adjusted.iloc[:-10])
+    assert full_computes == [len(history), len(history), len(history) - 10]
@@ -0,0 +1,44 @@
+import threading
+import time
+
+from market_data import fetch_concurrently
+
+SESSIONS = 24
+
+
+def test_fast_loaders_do_not_time_out_behind_other_sessions():
+    # Every session waits on one slow source (SEC during a spike) and one
+    # fast one; the fast ones must never time out queued behind the slow
+    release = threading.Event()
+    outcomes = [None] * SESSIONS
+
+    def slow():
+        release.wait(5)
+        return "filings"
+
+    def page_load(i):
+        outcomes[i] = fetch_concurrently({"filings": (slow,), "quote": (lambda: "quote",)}, {"filings": 0.5}, timeout=0.3)
+
+    threads = [threading.Thread(target=page_load, args=(i,)) for i in range(SESSIONS)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join()
+    release.set()
+
+    for results, errors in outcomes:
+        assert results == {"quote": "quote"}
+        assert isinstance(errors["filings"], TimeoutError)
+
+
+def test_deadlines_run_from_the_start_of_the_page_load():
+    start = time.monotonic()
+    results, errors = fetch_concurrently({
+        "a": (time.sleep, 0.2),
+        "b": (time.sleep, 0.2),
+        "c": (time.sleep, 1),
+    }, timeout=0.5)
+    assert set(results) == {"a", "b"}
+    assert set(errors) == {"c"}
+    assert time.monotonic() - start < 0.8
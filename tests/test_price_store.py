@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import price_store
+from price_store import fetch_bars, out_of_window, read_history, rebased, refresh_history, write_history
+
+TZ = "America/New_York"
+
+
+def bars(index, start_price=100.0):
+    # Random-walk OHLCV with (empty) action columns, like Ticker.history
+    rng = np.random.default_rng(len(index))
+    close = start_price * np.exp(np.cumsum(rng.normal(0, 0.001, len(index))))
+    return pd.DataFrame({
+        "Open": close, "High": close * 1.001, "Low": close * 0.999, "Close": close,
+        "Volume": np.full(len(index), 1000.0), "Dividends": 0.0, "Stock Splits": 0.0,
+    }, index=index)
+
+
+class FakeTicker:
+    # Serves slices of one frame the way yfinance does, only as far back as
+    # the interval's window, and records every request
+    def __init__(self, frame, window=None):
+        self.frame = frame
+        self.window = window
+        self.requests = []
+
+    def history(self, start=None, end=None, period=None, interval="1d"):
+        self.requests.append({"start": start, "end": end, "period": period})
+        frame = self.frame
+        if self.window is not None:
+            frame = frame[frame.index >= pd.Timestamp.now(tz=TZ) - self.window - pd.Timedelta(days=1)]
+        if period is not None and period != "max":
+            frame = frame[frame.index >= frame.index[-1] - pd.Timedelta(days=int(period[:-1]))]
+        if start is not None:
+            frame = frame[frame.index >= start]
+        if end is not None:
+            frame = frame[frame.index < end]
+        return frame.copy()
+
+
+@pytest.fixture
+def upstream(monkeypatch, tmp_path):
+    monkeypatch.setattr(price_store, "STORE_DIR", tmp_path / "prices")
+    tickers = {}
+    monkeypatch.setattr(price_store.yf, "Ticker", lambda symbol: tickers[symbol])
+    return tickers
+
+
+def intraday(days, freq="30min"):
+    end = pd.Timestamp.now(tz=TZ).floor(freq)
+    return pd.date_range(end - pd.Timedelta(days=days), end, freq=freq)
+
+
+def test_fetch_bars_splits_requests_to_the_interval_limit():
+    frame = bars(intraday(20, "1min"))
+    ticker = FakeTicker(frame)
+    start = frame.index[0]
+
+    fresh = fetch_bars(ticker, "1m", start)
+    spans = [r["end"] - r["start"] for r in ticker.requests if r["end"] is not None]
+    assert len(ticker.requests) == 3
+    assert all(span <= pd.Timedelta(days=7) for span in spans)
+    pd.testing.assert_frame_equal(fresh, frame, check_freq=False)
+
+
+def test_fetch_bars_daily_is_one_request():
+    frame = bars(pd.date_range("2020-01-01", periods=1000, freq="D", tz=TZ))
+    ticker = FakeTicker(frame)
+    assert len(fetch_bars(ticker, "1d", frame.index[0])) == 1000
+    assert len(ticker.requests) == 1
+
+
+def test_out_of_window():
+    now = pd.Timestamp.now(tz=TZ)
+    assert out_of_window(now - pd.Timedelta(days=30), "1m")
+    assert not out_of_window(now - pd.Timedelta(days=6), "1m")
+    assert not out_of_window(now - pd.Timedelta(days=30), "5m")
+    assert out_of_window(now - pd.Timedelta(days=61), "5m")
+    assert not out_of_window(now - pd.Timedelta(days=20_000), "1d")
+
+
+def test_rebased():
+    stored = bars(pd.date_range("2024-01-01", periods=10, freq="D", tz=TZ))
+    overlap = stored.index[-2]
+    fresh = stored.iloc[-2:].copy()
+    assert not rebased(stored, fresh, overlap)
+
+    moved = fresh.copy()
+    moved.loc[overlap, "Close"] *= 0.98
+    assert rebased(stored, moved, overlap)
+
+    # A dividend in the new bars re-adjusts the old ones, but one the stored
+    # copy already carries does not
+    dividend = fresh.copy()
+    dividend.loc[stored.index[-1], "Dividends"] = 0.5
+    assert rebased(stored, dividend, overlap)
+    carried = stored.copy()
+    carried.loc[stored.index[-1], "Dividends"] = 0.5
+    assert not rebased(carried, dividend, overlap)
+
+    assert rebased(stored, fresh.iloc[1:], overlap)
+
+
+def test_intraday_gap_keeps_the_stored_bars(upstream):
+    frame = bars(intraday(120))
+    old = frame[frame.index < frame.index[-1] - pd.Timedelta(days=80)]
+    write_history("AAPL", old, "30m")
+    upstream["AAPL"] = FakeTicker(frame, window=pd.Timedelta(days=59))
+
+    history = refresh_history("AAPL", "30m")
+    assert history.index[0] == old.index[0]
+    assert history.index[-1] == frame.index[-1]
+    # Nothing before the window was asked for again
+    assert all(r["period"] is None for r in upstream["AAPL"].requests)
+
+
+def test_intraday_split_rescales_the_stored_bars(upstream):
+    frame = bars(intraday(50))
+    write_history("AAPL", frame.iloc[:-20], "30m")
+    split_at = frame.index[-10]
+    served = frame.copy()
+    served.loc[served.index < split_at, ["Open", "High", "Low", "Close"]] /= 4
+    served.loc[served.index < split_at, "Volume"] *= 4
+    served.loc[split_at, "Stock Splits"] = 4.0
+    upstream["AAPL"] = FakeTicker(served, window=pd.Timedelta(days=59))
+
+    history = refresh_history("AAPL", "30m")
+    assert len(history) == len(frame)
+    np.testing.assert_allclose(history["Close"].to_numpy(), served["Close"].to_numpy())
+    np.testing.assert_allclose(history["Volume"].to_numpy(), served["Volume"].to_numpy())
+    assert all(r["period"] is None for r in upstream["AAPL"].requests)
+
+
+def test_daily_rebase_downloads_the_full_history(upstream):
+    frame = bars(pd.date_range("2020-01-01", periods=500, freq="D", tz=TZ))
+    write_history("AAPL", frame.iloc[:-5], "1d")
+    served = frame.copy()
+    served.loc[served.index < served.index[-3], ["Open", "High", "Low", "Close"]] *= 0.99
+    served.loc[served.index[-3], "Dividends"] = 1.0
+    upstream["AAPL"] = FakeTicker(served)
+
+    history = refresh_history("AAPL", "1d")
+    assert upstream["AAPL"].requests[-1]["period"] == "max"
+    np.testing.assert_allclose(history["Close"].to_numpy(), served["Close"].to_numpy())
+    pd.testing.assert_frame_equal(read_history("AAPL", "1d"), history)
@@ -0,0 +1,45 @@
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+import screener
+from screener import fetch_shares
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    # Counts every fast_info request; each ticker has len(ticker) shares
+    calls = []
+
+    def ticker(tickerSymbol):
+        calls.append(tickerSymbol)
+        return SimpleNamespace(fast_info=SimpleNamespace(shares=len(tickerSymbol)))
+
+    monkeypatch.setattr(screener.yf, "Ticker", ticker)
+    monkeypatch.setattr(screener, "_shares", OrderedDict())
+    return calls
+
+
+def test_fresh_counts_are_not_fetched_again(lookups):
+    assert fetch_shares(["AAPL", "GE"]).to_dict() == {"AAPL": 4, "GE": 2}
+    assert fetch_shares(["GE", "MSFT"]).to_dict() == {"GE": 2, "MSFT": 4}
+    assert sorted(lookups) == ["AAPL", "GE", "MSFT"]
+
+
+def test_expired_counts_are_fetched_again(lookups, monkeypatch):
+    fetch_shares(["AAPL"])
+    monkeypatch.setattr(screener, "SHARES_TTL", -1)
+    fetch_shares(["AAPL"])
+    assert lookups == ["AAPL", "AAPL"]
+
+
+def test_least_recently_used_counts_are_evicted(lookups, monkeypatch):
+    monkeypatch.setattr(screener, "MAX_SHARES", 2)
+    fetch_shares(["A", "B"])
+    # Reading A makes B the oldest, so C pushes B out
+    fetch_shares(["A"])
+    fetch_shares(["C"])
+    assert list(screener._shares) == ["A", "C"]
+    fetch_shares(["B"])
+    assert lookups == ["A", "B", "C", "B"]
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from sentiment_returns import RollingSentimentCache, daily_frame, event_windows, lead_lag, rolling_corr
+
+HISTORY = pd.DataFrame(
+    {"Close": np.linspace(100.0, 130.0, 60)},
+    index=pd.bdate_range("2024-01-02", periods=60, tz="America/New_York"),
+)
+
+
+def articles(dates, scores):
+    return pd.DataFrame({"published": pd.to_datetime(dates, utc=True), "compound": scores})
+
+
+def check_empty(daily):
+    assert daily.empty
+    assert RollingSentimentCache().rolling("AAPL", daily).empty
+    assert lead_lag(daily)["days"].eq(0).all()
+    assert event_windows(daily)[1] == {"positive": 0, "negative": 0}
+
+
+def test_no_articles():
+    check_empty(daily_frame(articles([], []), HISTORY))
+
+
+def test_articles_newer_than_the_last_bar():
+    # Waiting for a session that has no bar yet, so nothing overlaps
+    check_empty(daily_frame(articles(["2024-06-03", "2024-06-04"], [0.4, -0.2]), HISTORY))
+
+
+def test_rolling_updates_match_a_full_recompute():
+    rng = np.random.default_rng(20)
+    dates = HISTORY.index[::2].tz_convert("UTC") + pd.Timedelta(hours=14)
+    scored = articles(dates, rng.uniform(-1, 1, len(dates)))
+    cache = RollingSentimentCache()
+
+    # Grow the history one bar at a time, as reruns on later days would
+    for end in range(40, len(HISTORY) + 1):
+        daily = daily_frame(scored, HISTORY.iloc[:end])
+        rolling = cache.rolling("AAPL", daily, window=10)
+        full = rolling_corr(daily["sentiment"].to_numpy(), daily["return"].to_numpy(), 10)
+        np.testing.assert_allclose(rolling.to_numpy(), full, equal_nan=True)
@@ -0,0 +1,75 @@
+import json
+import time
+
+import pytest
+
+import summarize
+from summarize import stream_summaries
+
+PROMPT = "Summarize this for an investor."
+
+
+def chat_stream(*words):
+    # Ollama's /api/chat streaming reply: one JSON object per line
+    lines = [{"model": "test", "created_at": "2026-01-01T00:00:00Z",
+              "message": {"role": "assistant", "content": word}, "done": False} for word in words]
+    lines.append({"model": "test", "created_at": "2026-01-01T00:00:00Z", "message": {"role": "assistant", "content": ""},
+                  "done": True, "done_reason": "stop"})
+    return "".join(json.dumps(line) + "\n" for line in lines)
+
+
+@pytest.fixture(autouse=True)
+def summary_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(summarize, "CACHE_PATH", tmp_path / "summaries.db")
+
+
+def summaries(stand_in, documents, **kwargs):
+    texts = [""] * len(documents)
+    for index, text in stream_summaries(documents, PROMPT, model="test", base_url=stand_in.url, **kwargs):
+        texts[index] += text
+    return texts
+
+
+def document_of(request):
+    return json.loads(request["body"])["messages"][-1]["content"]
+
+
+def test_summaries_stream_in_and_are_cached(stand_in):
+    stand_in.route("/api/chat", lambda request: (200, {"Content-Type": "application/x-ndjson"},
+                                                  chat_stream("Summary ", "of ", document_of(request))))
+
+    assert summaries(stand_in, ["first", "second"]) == ["Summary of first", "Summary of second"]
+    sent = stand_in.hits("/api/chat")
+    assert len(sent) == 2
+    assert json.loads(sent[0]["body"])["messages"][0] == {"role": "system", "content": PROMPT}
+
+    # Cached answers come back whole, without asking the server again
+    assert summaries(stand_in, ["second", "third"]) == ["Summary of second", "Summary of third"]
+    assert len(stand_in.hits("/api/chat")) == 3
+
+
+def test_a_failed_document_does_not_sink_the_batch(stand_in):
+    def chat(request):
+        if document_of(request) == "broken":
+            return 500, {}, {"error": "model crashed"}
+        return 200, {"Content-Type": "application/x-ndjson"}, chat_stream("ok")
+
+    stand_in.route("/api/chat", chat)
+    texts = summaries(stand_in, ["fine", "broken"])
+    assert texts[0] == "ok"
+    assert texts[1].startswith("Summary unavailable")
+    # Failures are not cached
+    summaries(stand_in, ["broken"])
+    assert len(stand_in.hits("/api/chat")) == 3
+
+
+def test_an_unresponsive_server_times_out(stand_in):
+    def hang(request):
+        time.sleep(3)
+        return 200, {"Content-Type": "application/x-ndjson"}, chat_stream("late")
+
+    stand_in.route("/api/chat", hang)
+    start = time.monotonic()
+    texts = summaries(stand_in, ["slow"], timeout=0.5)
+    assert texts == ["Summary unavailable (ReadTimeout)."]
+    assert time.monotonic() - start < 2.5
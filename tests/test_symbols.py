@@ -0,0 +1,33 @@
+import pytest
+
+from symbols import SymbolDirectory, non_sec_symbol, normalize_symbol
+
+DIRECTORY = SymbolDirectory([
+    {"ticker": "AAPL", "name": "Apple Inc.", "exchange": "Nasdaq"},
+    {"ticker": "MSFT", "name": "Microsoft Corp", "exchange": "Nasdaq"},
+    {"ticker": "BRK-B", "name": "Berkshire Hathaway Inc", "exchange": "NYSE"},
+    {"ticker": "RY", "name": "Royal Bank of Canada", "exchange": "NYSE"},
+])
+
+
+@pytest.mark.parametrize("symbol", ["^GSPC", "^N225", "EURUSD=X", "ES=F", "BTC-USD", "ETH-EUR", "RY.TO", "7203.T", "0700.HK", "SHEL.L"])
+def test_symbols_the_sec_list_cannot_have(symbol):
+    assert non_sec_symbol(symbol)
+    assert DIRECTORY.lookup(symbol) is None
+
+
+@pytest.mark.parametrize("text", ["APPL", "MICROSFT", "GOOGLEE", "XYZQ", "apple", "BRK-Z", "XYZ.B", "APPLE INC"])
+def test_typos_are_not_passed_through(text):
+    symbol = normalize_symbol(text)
+    assert DIRECTORY.lookup(symbol) is None
+    assert not non_sec_symbol(symbol)
+
+
+@pytest.mark.parametrize("text", ["brk.b", "BRK/B", " BRK-B "])
+def test_share_classes_resolve_to_the_listed_spelling(text):
+    assert DIRECTORY.lookup(normalize_symbol(text))["ticker"] == "BRK-B"
+
+
+def test_suggestions_for_a_typo():
+    assert DIRECTORY.suggest("APPL")[0]["ticker"] == "AAPL"
+    assert DIRECTORY.suggest("microsft")[0]["ticker"] == "MSFT"
@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from upstream import SingleFlight, upstream_call
+
+CALLERS = 8
+
+
+def run_together(target):
+    # Starts CALLERS threads at once and returns their outcomes in order
+    outcomes = [None] * CALLERS
+    barrier = threading.Barrier(CALLERS)
+
+    def run(i):
+        barrier.wait()
+        try:
+            outcomes[i] = ("ok", target())
+        except Exception as exc:
+            outcomes[i] = ("error", exc)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"price": 101.5}
+
+    threads, outcomes = run_together(lambda: flight.do("AAPL", fetch))
+    # Let every caller arrive while the first one is still fetching
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(outcome == ("ok", {"price": 101.5}) for outcome in outcomes)
+    # The key is free again once the call is done
+    assert flight.do("AAPL", lambda: "again") == "again"
+    assert not flight.calls
+
+
+def test_exception_reaches_every_caller():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        raise ConnectionError("upstream down")
+
+    threads, outcomes = run_together(lambda: flight.do("AAPL", fetch))
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(kind == "error" and isinstance(exc, ConnectionError) for kind, exc in outcomes)
+    assert not flight.calls
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    flight = SingleFlight()
+    release = threading.Event()
+    slow = threading.Thread(target=flight.do, args=("AAPL", release.wait, 5))
+    slow.start()
+    try:
+        assert flight.do("MSFT", lambda: "MSFT") == "MSFT"
+    finally:
+        release.set()
+        slow.join()
+
+
+def test_host_limit_caps_concurrent_calls(monkeypatch):
+    monkeypatch.setattr("upstream.HOST_LIMITS", {"capped": 3})
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def call():
+        with upstream_call("capped.quote"):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+    threads, outcomes = run_together(call)
+    for thread in threads:
+        thread.join()
+    assert all(kind == "ok" for kind, _ in outcomes)
+    assert peak[0] == 3
+
+
+@pytest.mark.parametrize("error", [ValueError, KeyboardInterrupt])
+def test_leader_error_is_raised_to_the_leader(error):
+    flight = SingleFlight()
+
+    def fail():
+        raise error()
+
+    with pytest.raises(error):
+        flight.do("AAPL", fail)
+    assert not flight.calls
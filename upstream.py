@@ -0,0 +1,77 @@
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from metrics import count, observe, span
+
+# Process-wide guards for calls to upstream services. Identical requests made
+# at the same time by different sessions share one in-flight call (single
+# flight), and each upstream host has a cap on concurrent requests so a
+# traffic spike queues here instead of hammering Yahoo or SEC.
+
+# Concurrent requests allowed per host; hosts are the first part of a call name
+HOST_LIMITS = {
+    "yfinance": 12,
+    "sec": 4,
+}
+DEFAULT_HOST_LIMIT = 8
+
+_slots = {}
+_slots_lock = threading.Lock()
+
+
+class SingleFlight:
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        # Runs fn once per key at a time; callers arriving meanwhile get the
+        # same result (or exception)
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = Future()
+
+        if not leader:
+            count("singleflight.coalesced")
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+
+flights = SingleFlight()
+
+
+def coalesce(key, fn, *args, **kwargs):
+    return flights.do(key, fn, *args, **kwargs)
+
+
+def host_slots(host):
+    with _slots_lock:
+        if host not in _slots:
+            _slots[host] = threading.BoundedSemaphore(HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT))
+        return _slots[host]
+
+
+@contextmanager
+def upstream_call(name):
+    # Waits for a free slot on the call's host, then times the call itself
+    slots = host_slots(name.split(".")[0])
+    start = time.perf_counter()
+    with slots:
+        observe(f"wait.{name.split('.')[0]}", time.perf_counter() - start)
+        with span(name):
+            yield
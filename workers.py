@@ -0,0 +1,22 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# One pool of worker processes per server process, shared by every CPU-bound
+# batch (sentiment scoring, backtest sweeps). Workers come from a forkserver
+# rather than being forked from the server, whose loader and refresh threads
+# may hold locks at that moment, and they stay up between batches so each
+# batch skips process start-up and imports.
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_pool = None
+_lock = threading.Lock()
+
+
+def process_pool():
+    global _pool
+    with _lock:
+        # A worker that died takes the whole pool down; start a new one
+        if _pool is None or _pool._broken:
+            _pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context(START_METHOD))
+        return _pool